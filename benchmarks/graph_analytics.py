@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+关注关系图分析的性能测试
+
+生成幂律分布的随机关注关系图（少数大V拥有大量粉丝），依次测量
+CSR 压缩、PageRank、k-core 和互关检测在不同边数下的耗时。
+
+用法：
+    python benchmarks/graph_analytics.py --edges 1000000 2000000 5000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from weibo_api_sdk.crawler.analytics import k_core, mutual_follows, pagerank
+from weibo_api_sdk.crawler.graph import CSRGraph
+
+
+def random_edges(num_edges, num_users, seed=0):
+    """关注者均匀分布，被关注者服从 Zipf 分布"""
+    rng = np.random.default_rng(seed)
+    src = rng.integers(0, num_users, size=num_edges, dtype=np.int64)
+    dst = (rng.zipf(1.5, size=num_edges).astype(np.int64) - 1) % num_users
+    # 模拟真实的微博用户 ID
+    offset = 1000000000
+    return np.stack((src + offset, dst + offset), axis=1)
+
+
+def timed(name, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print(f'  {name:<16}{time.perf_counter() - start:8.2f}s')
+    return result
+
+
+def run(num_edges, num_users):
+    print(f'edges={num_edges:,} users={num_users:,}')
+    with tempfile.TemporaryDirectory() as directory:
+        random_edges(num_edges, num_users).tofile(os.path.join(directory, 'edges.bin'))
+        graph = timed('build CSR', CSRGraph.build, directory)
+        graph = timed('load (mmap)', CSRGraph.load, directory)
+        print(f'  nodes={graph.num_nodes:,} unique edges={graph.num_edges:,}')
+        timed('pagerank', pagerank, graph)
+        timed('k-core', k_core, graph)
+        pairs = timed('mutual follows', mutual_follows, graph)
+        print(f'  mutual pairs={len(pairs):,}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--edges', type=int, nargs='+', default=[100000, 1000000, 3000000])
+    parser.add_argument('--users-per-edge', type=float, default=0.1,
+                        help='用户数与边数之比')
+    args = parser.parse_args()
+    for num_edges in args.edges:
+        run(num_edges, max(10, int(num_edges * args.users_per_edge)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+微博正文实体提取的性能测试
+
+生成包含 @用户、话题、短链、头条文章链接和表情的合成微博正文，
+测量 extract_entities_many 每秒处理的微博数。
+
+用法：
+    python benchmarks/status_entities.py --statuses 100000 500000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from weibo_api_sdk.utils.entities import extract_entities_many
+
+_FRAGMENTS = (
+    '今天天气不错，出去走走',
+    "<a href='/n/用户{n}'>@用户{n}</a> ",
+    '<a href="https://m.weibo.cn/u/{n}">@用户{n}</a>',
+    '<a  href="https://m.weibo.cn/search?containerid=231522type%3D1%26q%3D%23话题{n}%23" data-hide="">'
+    '<span class="surl-text">#话题{n}#</span></a>',
+    '<span class="url-icon"><img alt=[笑cry] src="https://h5.sinaimg.cn/m/emoticon/icon/default/'
+    'd_xiaoku-f2bd11b506.png" style="width:1em; height:1em;" /></span>',
+    '<a data-url="http://t.cn/A6{n}" href="https://weibo.cn/sinaurl?u=https%3A%2F%2Fexample.com%2F{n}" '
+    'data-hide=""><span class=\'url-icon\'><img src=\'https://h5.sinaimg.cn/upload/2015/09/25/3/'
+    'timeline_card_small_web_default.png\'></span><span class="surl-text">网页链接</span></a>',
+    '<a data-url="http://t.cn/B7{n}" href="https://weibo.com/ttarticle/p/show?id=230940{n:016d}" '
+    'data-hide=""><span class="surl-text">头条文章</span></a>',
+    '<br />',
+    '&quot;引用&quot; &amp; 转发',
+)
+
+
+def random_statuses(count, seed=0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(_FRAGMENTS).format(n=rng.randrange(10 ** 6))
+                    for _ in range(rng.randint(2, 8))) for _ in range(count)]
+
+
+def run(count):
+    texts = random_statuses(count)
+    size = sum(len(text) for text in texts)
+    start = time.perf_counter()
+    results = extract_entities_many(texts)
+    elapsed = time.perf_counter() - start
+    mentions = sum(len(r['mentions']) for r in results)
+    print(f'statuses={count:,} avg_len={size / count:.0f} mentions={mentions:,}')
+    print(f'  {elapsed:8.2f}s  {count / elapsed:12,.0f} statuses/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--statuses', type=int, nargs='+', default=[100000])
+    args = parser.parse_args()
+    for count in args.statuses:
+        run(count)
+
+
+if __name__ == '__main__':
+    main()
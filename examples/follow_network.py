@@ -16,67 +16,20 @@ import os
 import json
 import time
 import random
-from collections import deque
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from weibo_api_sdk import WeiboClient
+from weibo_api_sdk.crawler.frontier import CrawlFrontier
+from weibo_api_sdk.crawler.graph import FollowGraphWriter
+from weibo_api_sdk.crawler.ratelimit import is_throttle_signal
+from weibo_api_sdk.storage.jsonl import JsonlSink
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
 
-def parse_followers_count(followers_str):
-    """
-    解析粉丝数字符串，转换为整数
-    
-    :param followers_str: 粉丝数字符串，如 "262.6万", "1234", "1.2万"
-    :return: 粉丝数（整数）
-    """
-    if not followers_str:
-        return 0
-    
-    # 转换为字符串
-    followers_str = str(followers_str)
-    
-    # 如果已经是数字，直接返回
-    if followers_str.isdigit():
-        return int(followers_str)
-    
-    # 处理中文数字
-    if '万' in followers_str:
-        # 提取数字部分
-        num_str = followers_str.replace('万', '')
-        try:
-            num = float(num_str)
-            return int(num * 10000)
-        except ValueError:
-            return 0
-    elif '千' in followers_str:
-        # 提取数字部分
-        num_str = followers_str.replace('千', '')
-        try:
-            num = float(num_str)
-            return int(num * 1000)
-        except ValueError:
-            return 0
-    elif '亿' in followers_str:
-        # 提取数字部分
-        num_str = followers_str.replace('亿', '')
-        try:
-            num = float(num_str)
-            return int(num * 100000000)
-        except ValueError:
-            return 0
-    else:
-        # 尝试直接转换
-        try:
-            return int(float(followers_str))
-        except ValueError:
-            return 0
-
-
 def get_user_info(people):
     """
     提取用户关键信息
@@ -85,9 +38,9 @@ def get_user_info(people):
     :return: 用户信息字典
     """
     try:
-        # 解析粉丝数
-        followers_count = parse_followers_count(people.followers_count)
-        follow_count = parse_followers_count(people.follow_count)
+        # SDK 已把 "262.6万" 这类粉丝数转为整数
+        followers_count = people.followers_count or 0
+        follow_count = people.follow_count or 0
         
         return {
             'id': people.id,
@@ -147,7 +100,7 @@ def get_follows_list_with_retry(client, uid, max_pages=10, min_followers=1000, m
                     
                 except Exception as e:
                     print(f"      ⚠️  获取第 {page_num} 页失败: {e}")
-                    if "Only dict and list can be StreamingJSON" in str(e):
+                    if is_throttle_signal(e):
                         print(f"      🚫 检测到反爬虫限制，等待更长时间...")
                         time.sleep(random.uniform(5, 10))
                     break
@@ -173,19 +126,14 @@ def get_follows_list_with_retry(client, uid, max_pages=10, min_followers=1000, m
     return []
 
 
-def save_users_to_file(users, output_file):
+def save_users_to_file(users, sink):
     """
     保存用户数据到文件
     
     :param users: 用户列表
-    :param output_file: 输出文件名
+    :param sink: 输出文件的 JsonlSink，写入时会去掉 depth 字段（仅用于统计）
     """
-    with open(output_file, 'a+', encoding='utf-8') as f:
-        for user in users:
-            # 移除 depth 字段（仅用于统计）
-            user_copy = user.copy()
-            user_copy.pop('depth', None)
-            f.write(json.dumps(user_copy, ensure_ascii=False) + '\n')
+    sink.write_many(users)
 
 
 def crawl_follow_network(start_uid, max_depth=3, output_file='follow_network.jsonl'):
@@ -214,12 +162,10 @@ def crawl_follow_network(start_uid, max_depth=3, output_file='follow_network.jso
     print(f"输出文件: {output_file}")
     print(f"{'='*60}\n")
     
-    # 使用集合记录已访问的用户ID，避免重复
-    visited_ids = set()
-    
-    # 使用队列进行广度优先搜索
-    # 队列元素格式：(uid, depth)
-    queue = deque([(start_uid, 0)])
+    # 使用爬取边界进行广度优先搜索：已访问集合为紧凑的有序 int64 数组，
+    # 队列超出内存上限的部分会写入磁盘，用户入队时即标记为已访问，避免重复
+    frontier = CrawlFrontier()
+    frontier.push(start_uid, 0)
     
     # 统计信息
     stats = {
@@ -230,72 +176,75 @@ def crawl_follow_network(start_uid, max_depth=3, output_file='follow_network.jso
         'depth_3': 0,  # 第3层
     }
     
-    while queue:
-        current_uid, current_depth = queue.popleft()
-        
-        # 检查是否已访问
-        if current_uid in visited_ids:
-            continue
+    # 整个爬取过程只打开一次输出文件，记录缓冲后批量写盘
+    sink = JsonlSink(output_file, max_records=200, flush_interval=10.0, exclude=('depth',))
+    # 同时记录关注关系的边，爬取结束后压缩为 CSR 格式的图
+    graph_dir = os.path.splitext(output_file)[0] + '_graph'
+    graph = FollowGraphWriter(graph_dir)
+    with sink, graph:
+        while len(frontier):
+            current_uid, current_depth = frontier.pop()
         
-        # 检查深度
-        if current_depth > max_depth:
-            continue
+            # 检查深度
+            if current_depth > max_depth:
+                continue
         
-        # 标记为已访问
-        visited_ids.add(current_uid)
+            # 获取当前用户信息
+            print(f"\n📍 层级 {current_depth} | 正在处理用户 {current_uid}...")
         
-        # 获取当前用户信息
-        print(f"\n📍 层级 {current_depth} | 正在处理用户 {current_uid}...")
-        
-        try:
-            # 添加随机延迟，避免被检测
-            delay = random.uniform(0.5, 2.0)
-            time.sleep(delay)
+            try:
+                # 添加随机延迟，避免被检测
+                delay = random.uniform(0.5, 2.0)
+                time.sleep(delay)
             
-            people = client.people(current_uid)
-            user_info = get_user_info(people)
+                people = client.people(current_uid)
+                user_info = get_user_info(people)
             
-            if user_info:
-                user_info['depth'] = current_depth  # 记录层级
-                stats['total_users'] += 1
-                stats[f'depth_{current_depth}'] += 1
+                if user_info:
+                    user_info['depth'] = current_depth  # 记录层级
+                    stats['total_users'] += 1
+                    stats[f'depth_{current_depth}'] += 1
                 
-                print(f"  ✅ 用户: {user_info['name']}")
-                print(f"     简介: {user_info['description'][:50]}...")
-                print(f"     粉丝: {user_info['followers_count']:,} | 关注: {user_info['follow_count']:,}")
+                    print(f"  ✅ 用户: {user_info['name']}")
+                    print(f"     简介: {user_info['description'][:50]}...")
+                    print(f"     粉丝: {user_info['followers_count']:,} | 关注: {user_info['follow_count']:,}")
                 
-                # 保存当前用户信息到文件
-                save_users_to_file([user_info], output_file)
+                    # 保存当前用户信息到文件
+                    save_users_to_file([user_info], sink)
             
-            # 如果还没到最大深度，获取他的关注列表
-            if current_depth < max_depth:
-                print(f"  🔍 获取关注列表...")
+                # 如果还没到最大深度，获取他的关注列表
+                if current_depth < max_depth:
+                    print(f"  🔍 获取关注列表...")
                 
-                # 根据深度调整获取页数（方案2：减少每层页数）
-                # 第0层（起始用户）：获取5页
-                # 第1层：获取2页
-                # 第2层：获取1页
-                max_pages = {0: 5, 1: 2, 2: 1}.get(current_depth, 1)
+                    # 根据深度调整获取页数（方案2：减少每层页数）
+                    # 第0层（起始用户）：获取5页
+                    # 第1层：获取2页
+                    # 第2层：获取1页
+                    max_pages = {0: 5, 1: 2, 2: 1}.get(current_depth, 1)
                 
-                follows = get_follows_list_with_retry(client, current_uid, max_pages=max_pages, min_followers=1000)
-                print(f"  📊 找到 {len(follows)} 个关注用户，保存到文件：{output_file}")
-                save_users_to_file(follows, output_file)
+                    follows = get_follows_list_with_retry(client, current_uid, max_pages=max_pages, min_followers=1000)
+                    print(f"  📊 找到 {len(follows)} 个关注用户，保存到文件：{output_file}")
+                    save_users_to_file(follows, sink)
+                    graph.add_follows(current_uid, [follow_info['id'] for follow_info in follows])
                 
-                # 将关注的用户加入队列（但不立即标记为已访问）
-                for follow_info in follows:
-                    follow_uid = follow_info['id']
-                    # 只有未访问的用户才加入队列
-                    if follow_uid not in visited_ids:
-                        queue.append((follow_uid, current_depth + 1))
+                    # 将关注的用户加入队列，已访问的用户会被忽略
+                    for follow_info in follows:
+                        frontier.push(follow_info['id'], current_depth + 1)
             
-            # 添加随机延迟，避免请求过快
-            delay = random.uniform(2, 5)
-            time.sleep(delay)
+                # 添加随机延迟，避免请求过快
+                delay = random.uniform(2, 5)
+                time.sleep(delay)
             
-        except Exception as e:
-            print(f"  ❌ 处理用户 {current_uid} 时出错: {e}")
-            continue
+            except Exception as e:
+                print(f"  ❌ 处理用户 {current_uid} 时出错: {e}")
+                continue
     
+    try:
+        csr = graph.compact()
+        print(f"🕸️  关注关系图: {csr.num_nodes} 个用户, {csr.num_edges} 条边，保存到: {graph_dir}")
+    except ImportError as e:
+        print(f"⚠️  跳过关注关系图压缩: {e}")
+
     # 数据已在获取过程中实时保存，无需最终保存
     print(f"\n{'='*60}")
     print(f"✅ 数据已实时保存到: {output_file}")
@@ -0,0 +1,187 @@
+"""
+测试 Article 头条文章相关功能
+"""
+import json
+import threading
+from unittest.mock import Mock, patch
+from weibo_api_sdk.weibo.article import Article, Articles
+
+
+def article_list_response(article_ids):
+    """文章微博列表，每条微博的正文中链接一篇头条文章"""
+    cards = []
+    for i, aid in enumerate(article_ids):
+        cards.append({
+            "mblog": {
+                "id": "status_%d" % i,
+                "text": '<a data-url="http://t.cn/A%d" href="https://weibo.com/ttarticle/p/show?id=%s">'
+                        '<span class="surl-text">文章</span></a>' % (i, aid),
+                "created_at": "2024-01-01 12:00:00",
+                "user": {"id": 1815418641},
+            }
+        })
+    return {"ok": 1, "data": {"cards": cards, "cardlistInfo": {"total": len(cards)}}}
+
+
+def article_response(data):
+    """流式读取的文章详情响应"""
+    body = json.dumps(data).encode('utf-8')
+    return Mock(iter_content=Mock(return_value=iter([body])))
+
+
+class TestArticle:
+    """测试 Article 类"""
+
+    def test_article_build_url(self, client):
+        """测试文章详情 URL"""
+        article = Article("2309404178688362029907", None, client._session)
+        assert "2309404178688362029907" in article._build_url()
+
+    def test_article_config_from_cache(self, client):
+        """测试从缓存读取文章信息"""
+        cache = {"config": {"id": "2309404178688362029907", "title": "标题", "read_count": 10}}
+        article = Article("2309404178688362029907", cache, client._session)
+        assert article.title == "标题"
+        assert article.read_count == 10
+
+
+class TestArticles:
+    """测试 Articles 类"""
+
+    def test_page_records_article_ids(self, client):
+        """测试从文章微博中取出头条文章 ID"""
+        ids = ["2309404000000000000001", "2309404000000000000002"]
+        with patch('requests.Session.request') as mock_request:
+            mock_request.return_value = Mock(json=Mock(return_value=article_list_response(ids)))
+            statuses = list(Articles("1815418641", None, client._session).page(1))
+        assert [s.article_ids for s in statuses] == [[ids[0]], [ids[1]]]
+
+    def test_headlines_fetch_concurrently(self, client):
+        """测试并发获取头条文章详情，重复的文章只请求一次"""
+        ids = ["2309404000000000000001", "2309404000000000000002", "2309404000000000000001"]
+        requested = []
+        lock = threading.Lock()
+
+        def fake_request(method, url, **kwargs):
+            if 'article/contents' in url:
+                aid = url.rsplit('=', 1)[1]
+                with lock:
+                    requested.append(aid)
+                return article_response({"ok": 1, "data": {
+                    "config": {"id": aid, "title": "文章" + aid[-1]}, "content": "<p>正文</p>"}})
+            return Mock(json=Mock(return_value=article_list_response(ids)))
+
+        with patch('requests.Session.request', side_effect=fake_request):
+            articles = Articles("1815418641", None, client._session).headlines(1, workers=2)
+        assert sorted(requested) == ["2309404000000000000001", "2309404000000000000002"]
+        assert [a.title for a in articles] == ["文章1", "文章2"]
+        # 只读取了 config，没有加载正文
+        assert all(a._data is None for a in articles)
+
+    def test_headlines_skip_unavailable_articles(self, client):
+        """测试无法获取的文章被跳过并记录，不影响其他文章"""
+        from weibo_api_sdk.utils.exception import GetDataErrorException
+        ids = ["2309404000000000000001", "2309404000000000000002", "2309404000000000000003"]
+
+        def fake_request(method, url, **kwargs):
+            if 'article/contents' in url:
+                aid = url.rsplit('=', 1)[1]
+                if aid.endswith('2'):
+                    return article_response({"ok": 0, "msg": "文章已删除"})
+                return article_response({"ok": 1, "data": {"config": {"id": aid, "title": "文章" + aid[-1]}}})
+            return Mock(json=Mock(return_value=article_list_response(ids)))
+
+        articles = Articles("1815418641", None, client._session)
+        with patch('requests.Session.request', side_effect=fake_request):
+            result = articles.headlines(1, workers=3)
+        assert [a.title for a in result] == ["文章1", "文章3"]
+        assert [aid for aid, _ in articles.failed_articles] == ["2309404000000000000002"]
+        assert isinstance(articles.failed_articles[0][1], GetDataErrorException)
+
+
+def chunked(data, size):
+    """把响应切成很小的块，覆盖 key、转义序列和多字节字符被切开的情况"""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestArticleStreaming:
+    """测试流式读取文章正文"""
+
+    CONTENT = ('<div><p>第一段 &amp; <b>加粗</b></p><script>var x = "<p>";</script>'
+               '<p>第二段\U0001F600<br/>换行</p>' + '<p>长段落</p>' * 3 + '</div>')
+    RESPONSE = json.dumps({"ok": 1, "data": {
+        "config": {"id": "2309404178688362029907", "title": "标题 \"引号\" {括号}"},
+        "content": CONTENT}}).encode('utf-8')
+
+    def test_iter_text_streams_paragraphs(self, client):
+        """测试逐段输出纯文本"""
+        response = Mock(iter_content=Mock(return_value=chunked(self.RESPONSE, 7)))
+        with patch('requests.Session.request', return_value=response) as mock_request:
+            article = Article("2309404178688362029907", None, client._session)
+            paragraphs = list(article.iter_text())
+        assert mock_request.call_args.kwargs['stream'] is True
+        assert paragraphs == ['第一段 & 加粗', '第二段\U0001F600', '换行', '长段落', '长段落', '长段落']
+        response.close.assert_called_once()
+
+    def test_iter_text_from_loaded_data(self, client):
+        """测试已加载的正文直接转换"""
+        article = Article("2309404178688362029907", None, client._session)
+        article._data = {"content": self.CONTENT}
+        assert list(article.iter_text())[0] == '第一段 & 加粗'
+
+    def test_fetch_config_only(self, client):
+        """测试只读取 config，不继续读取正文"""
+        body = iter(chunked(self.RESPONSE, 16))
+        response = Mock(iter_content=Mock(return_value=body))
+        with patch('requests.Session.request', return_value=response):
+            article = Article("2309404178688362029907", None, client._session).fetch_config()
+        assert article.title == '标题 "引号" {括号}'
+        # 正文还没有被读取
+        assert len(list(body)) > 0
+        response.close.assert_called_once()
+
+    def test_streaming_goes_through_request_path(self, mock_cookie):
+        """测试流式读取同样识别反爬虫页面、限制响应大小，并计入请求统计"""
+        import io
+        import pytest
+        import requests
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.utils.accounting import FetchAccounting
+        from weibo_api_sdk.utils.exception import CaptchaRequiredException, ResponseTooLargeException
+        from weibo_api_sdk.utils.metrics import RequestMetrics
+
+        def make_response(body, content_type='application/json'):
+            res = requests.Response()
+            res.status_code = 200
+            res.headers['Content-Type'] = content_type
+            res.url = 'https://m.weibo.cn/api'
+            res.raw = io.BytesIO(body)
+            return res
+
+        metrics = RequestMetrics()
+        client = WeiboClient(cookie=mock_cookie, metrics=metrics, fetch_accounting=FetchAccounting(),
+                             max_response_bytes=len(self.RESPONSE))
+        with patch('requests.Session.request') as mock_request:
+            mock_request.return_value = make_response(self.RESPONSE)
+            article = Article("2309404178688362029907", None, client._session)
+            assert list(article.iter_text())[0] == '第一段 & 加粗'
+
+            mock_request.return_value = make_response('<html>验证码'.encode('utf-8'), 'text/html')
+            with pytest.raises(CaptchaRequiredException):
+                Article("2309404178688362029907", None, client._session).fetch_config()
+
+            mock_request.return_value = make_response(self.RESPONSE + b' ' * 10)
+            with pytest.raises(ResponseTooLargeException):
+                list(Article("2309404178688362029907", None, client._session).iter_text())
+        snapshot = metrics.snapshot()['article']
+        assert snapshot['requests'] == 3 and snapshot['errors'] == 0
+        by_attribute = dict(client.fetch_accounting.snapshot()['by_attribute'])
+        assert by_attribute == {'Article.iter_text': 2, 'Article.fetch_config': 1}
+
+    def test_iter_json_string_escapes(self):
+        """测试跨块的转义序列"""
+        from weibo_api_sdk.utils.htmltext import iter_json_string
+        raw = json.dumps({"a": 1, "content": "x\\\"y\n中\U0001F600", "b": 2}, ensure_ascii=True)
+        for size in (1, 2, 5):
+            assert ''.join(iter_json_string(chunked(raw, size), 'content')) == "x\\\"y\n中\U0001F600"
+        assert list(iter_json_string(['{"a": 1}'], 'content')) == []
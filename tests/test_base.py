@@ -1,10 +1,21 @@
 """
 测试 Base 基类
 """
+import io
+
 import pytest
+import requests
 from unittest.mock import Mock, patch, MagicMock
 from weibo_api_sdk.weibo.base import Base
-from weibo_api_sdk.utils.exception import GetDataErrorException
+from weibo_api_sdk.utils.exception import (
+    MAX_ERROR_BODY,
+    CaptchaRequiredException,
+    GetDataErrorException,
+    JSONDecodeError,
+    LoginRequiredException,
+    ResponseTooLargeException,
+    ThrottledException,
+)
 
 
 class ConcreteBase(Base):
@@ -164,3 +175,325 @@ class TestBase:
         mock_get_data.assert_called_once()
         assert pure["data"] == {"fetched": "value"}
 
+
+
+class TestRequestMetrics:
+    """测试请求统计"""
+
+    @patch('requests.Session.request')
+    def test_get_data_records_metrics(self, mock_request, mock_cookie):
+        """测试 _get_data 记录耗时、字节数和状态码"""
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.utils.metrics import RequestMetrics
+        from weibo_api_sdk.weibo.people import Peoples
+
+        client = WeiboClient(cookie=mock_cookie, metrics=RequestMetrics())
+        mock_request.return_value = Mock(status_code=200, content=b'{"ok": 1}',
+                                         json=Mock(return_value={"ok": 1, "data": {}}))
+        ConcreteBase("1", None, client._session)._get_data()
+        Peoples("1", None, client._session, utype='follow')._get_data()
+        mock_request.return_value = Mock(status_code=418, content=b'<html>',
+                                         json=Mock(side_effect=JSONDecodeError('', '', 0)))
+        with pytest.raises(GetDataErrorException):
+            ConcreteBase("2", None, client._session)._get_data()
+        mock_request.side_effect = ConnectionError
+        with pytest.raises(ConnectionError):
+            ConcreteBase("3", None, client._session)._get_data()
+
+        snapshot = client.metrics.snapshot()
+        assert set(snapshot) == {'concretebase', 'follows'}
+        base = snapshot['concretebase']
+        assert base['requests'] == 3 and base['errors'] == 1
+        assert base['status_codes'] == {200: 1, 418: 1}
+        assert base['bytes'] == len(b'{"ok": 1}') + len(b'<html>')
+        assert base['decode_time']['count'] == 2
+        assert base['latency']['p50'] >= 0
+
+        text = client.metrics.to_prometheus()
+        assert 'weibo_request_duration_seconds_count{endpoint="follows"} 1' in text
+        assert 'weibo_responses_total{endpoint="concretebase",code="418"} 1' in text
+
+    def test_metrics_disabled(self, client):
+        """测试默认不记录"""
+        assert client.metrics is None
+
+    def test_histogram_quantiles(self):
+        """测试直方图分位数估计"""
+        from weibo_api_sdk.utils.metrics import Histogram
+        h = Histogram(buckets=(0.01, 0.1, 1.0))
+        for _ in range(90):
+            h.observe(0.005)
+        for _ in range(10):
+            h.observe(0.5)
+        summary = h.summary()
+        assert summary['count'] == 100
+        assert summary['p50'] <= 0.01
+        assert 0.1 < summary['p99'] <= 0.5
+        assert Histogram().quantile(0.5) is None
+
+
+class TestRequestHooks:
+    """测试请求生命周期钩子"""
+
+    @patch('requests.Session.request')
+    def test_hooks_fired_in_order(self, mock_request, client):
+        """测试钩子的调用顺序和事件内容"""
+        calls = []
+
+        def record(name):
+            return lambda event: calls.append((name, event.object_type, event.endpoint, event.size))
+
+        for name in ('before_request', 'after_response', 'on_decode', 'on_error'):
+            client.add_hook(name, record(name))
+        mock_request.return_value = Mock(status_code=200, content=b'{"data": {}}',
+                                         json=Mock(return_value={"data": {}}))
+        ConcreteBase("1", None, client._session)._get_data()
+        assert calls == [
+            ('before_request', 'ConcreteBase', 'concretebase', None),
+            ('after_response', 'ConcreteBase', 'concretebase', 12),
+            ('on_decode', 'ConcreteBase', 'concretebase', 12),
+        ]
+
+        calls.clear()
+        mock_request.return_value = Mock(status_code=200, content=b'',
+                                         json=Mock(side_effect=JSONDecodeError('', '', 0)))
+        with pytest.raises(GetDataErrorException):
+            ConcreteBase("2", None, client._session)._get_data()
+        assert [c[0] for c in calls] == ['before_request', 'after_response', 'on_error']
+
+    @patch('requests.Session.request')
+    def test_after_response_can_reject(self, mock_request, mock_cookie):
+        """测试 after_response 抛出异常时关闭响应、触发 on_error 并计入请求异常"""
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.utils.metrics import RequestMetrics
+        from weibo_api_sdk.weibo.article import Article
+
+        client = WeiboClient(cookie=mock_cookie, metrics=RequestMetrics())
+        errors = []
+
+        def reject(event):
+            raise RuntimeError('rejected')
+
+        client.add_hook('after_response', reject)
+        client.add_hook('on_error', lambda event: errors.append(event.error))
+        client.add_hook('on_decode', lambda event: errors.append('decoded'))
+
+        response = Mock(status_code=200, json=Mock(return_value={"data": {}}))
+        mock_request.return_value = response
+        with pytest.raises(RuntimeError):
+            ConcreteBase("1", None, client._session)._get_data()
+        response.close.assert_called_once()
+        assert not response.json.called
+
+        # 流式读取的响应同样被关闭
+        response = Mock(status_code=200)
+        mock_request.return_value = response
+        with pytest.raises(RuntimeError):
+            Article("2309404178688362029907", None, client._session).fetch_config()
+        response.close.assert_called_once()
+        assert not response.iter_content.called
+
+        assert [str(e) for e in errors] == ['rejected', 'rejected']
+        snapshot = client.metrics.snapshot()
+        assert snapshot['concretebase']['errors'] == 1 and snapshot['concretebase']['requests'] == 1
+        assert snapshot['article']['errors'] == 1
+
+    @patch('requests.Session.request')
+    def test_before_request_can_cancel(self, mock_request, client):
+        """测试 before_request 抛出异常时不发出请求"""
+        def enforce_budget(event):
+            raise RuntimeError('budget exhausted')
+
+        client.add_hook('before_request', enforce_budget)
+        with pytest.raises(RuntimeError):
+            ConcreteBase("1", None, client._session)._get_data()
+        assert not mock_request.called
+
+        client.remove_hook('before_request', enforce_budget)
+        assert not client.hooks
+        with pytest.raises(ValueError):
+            client.add_hook('after_request', enforce_budget)
+
+
+class CountingBody(io.BytesIO):
+    """记录读取了多少字节的响应内容"""
+
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def make_response(body, status_code=200, content_type='application/json', url='https://m.weibo.cn/api',
+                  headers=None):
+    res = requests.Response()
+    res.status_code = status_code
+    res.headers['Content-Type'] = content_type
+    res.headers.update(headers or {})
+    res.url = url
+    res.raw = CountingBody(body)
+    return res
+
+
+class TestResponseSniffing:
+    """测试流式读取响应并提前识别反爬虫页面"""
+
+    @patch('requests.Session.request')
+    def test_json_response(self, mock_request, client):
+        """测试正常的 JSON 响应"""
+        body = b'{"ok": 1, "data": {"name": "\\u6d4b\\u8bd5"}}'
+        res = make_response(body)
+        mock_request.return_value = res
+        base = ConcreteBase("1", None, client._session)
+        base._get_data()
+        assert base._data == {"name": "测试"}
+        assert mock_request.call_args.kwargs['stream'] is True
+        assert res.raw.bytes_read == len(body)
+
+    @pytest.mark.parametrize('body, status_code, url, expected', [
+        (b'<html><title>\xe9\xaa\x8c\xe8\xaf\x81\xe7\xa0\x81</title>', 200, 'https://m.weibo.cn/api',
+         CaptchaRequiredException),
+        (b'<html>login', 200, 'https://passport.weibo.com/visitor', LoginRequiredException),
+        (b'<html>', 418, 'https://m.weibo.cn/api', ThrottledException),
+        (b'{"ok": 0}', 429, 'https://m.weibo.cn/api', ThrottledException),
+        (b'<html>502 Bad Gateway</html>', 502, 'https://m.weibo.cn/api', GetDataErrorException),
+    ])
+    @patch('requests.Session.request')
+    def test_anti_crawl_pages(self, mock_request, client, body, status_code, url, expected):
+        """测试按页面内容映射为不同的异常，只读取页面开头"""
+        from weibo_api_sdk.utils.response import SNIFF_BYTES
+        res = make_response(body + b' ' * (1 << 20), status_code, 'text/html', url)
+        mock_request.return_value = res
+        with pytest.raises(expected) as info:
+            ConcreteBase("1", None, client._session)._get_data()
+        assert type(info.value) is expected
+        assert res.raw.bytes_read <= SNIFF_BYTES
+        assert len(info.value.body) <= MAX_ERROR_BODY
+        assert info.value.status_code == status_code
+        assert not hasattr(info.value, 'res')
+
+    @patch('requests.Session.request')
+    def test_oversized_response(self, mock_request, mock_cookie):
+        """测试超过大小限制时停止读取"""
+        from weibo_api_sdk import WeiboClient
+        client = WeiboClient(cookie=mock_cookie, max_response_bytes=100 << 10)
+        body = b'[' + b'1,' * (1 << 20) + b'1]'
+
+        res = make_response(body, headers={'Content-Length': str(len(body))})
+        mock_request.return_value = res
+        with pytest.raises(ResponseTooLargeException) as info:
+            ConcreteBase("1", None, client._session)._get_data()
+        assert info.value.size == len(body) and res.raw.bytes_read == 0
+
+        # 没有 Content-Length 时读到超过限制为止
+        res = make_response(body)
+        mock_request.return_value = res
+        with pytest.raises(ResponseTooLargeException):
+            ConcreteBase("1", None, client._session)._get_data()
+        assert res.raw.bytes_read < 200 << 10
+
+
+class TestRequestDispatcher:
+    """测试按优先级分配并发请求名额"""
+
+    def test_priority_order(self):
+        """测试名额空出时先给优先级高的请求，bulk 不能占满所有名额"""
+        import threading
+        import time
+        from weibo_api_sdk.utils.dispatch import RequestDispatcher
+        from weibo_api_sdk.utils.exception import DeadlineExceededException
+        dispatcher = RequestDispatcher(max_concurrency=2, limits={'bulk': 1})
+        dispatcher.acquire('bulk')
+        with pytest.raises(DeadlineExceededException):
+            dispatcher.acquire('bulk', timeout=0.01)
+        dispatcher.acquire('normal')
+
+        order = []
+
+        def worker(priority):
+            dispatcher.acquire(priority)
+            order.append(priority)
+
+        threads = [threading.Thread(target=worker, args=(p,)) for p in ('bulk', 'normal', 'interactive')]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.02)
+        assert dispatcher.stats()['interactive']['waiting'] == 1
+        # 空出的 normal 名额依次给 interactive 和 normal，bulk 仍受 limits 限制
+        dispatcher.release('normal')
+        threads[2].join(1)
+        assert order == ['interactive']
+        dispatcher.release('interactive')
+        threads[1].join(1)
+        assert order == ['interactive', 'normal']
+        dispatcher.release('bulk')
+        threads[0].join(1)
+        assert order == ['interactive', 'normal', 'bulk']
+        stats = dispatcher.stats()
+        assert stats['bulk']['in_flight'] == 1 and stats['normal']['in_flight'] == 1
+        assert stats['bulk']['waiting'] == 0 and stats['bulk']['completed'] == 1
+
+        with pytest.raises(ValueError):
+            dispatcher.acquire('urgent')
+
+    @patch('requests.Session.request')
+    def test_client_with_priority(self, mock_request, mock_cookie):
+        """测试 with_priority 得到的 client 共享 Session，请求带有对应的优先级"""
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.utils.dispatch import RequestDispatcher
+        dispatcher = RequestDispatcher(max_concurrency=4)
+        client = WeiboClient(cookie=mock_cookie, dispatcher=dispatcher)
+        bulk = client.with_priority('bulk')
+        assert client.priority == 'normal' and bulk.priority == 'bulk'
+        assert bulk.dispatcher is dispatcher
+        assert bulk.with_priority('interactive')._session._session is client._session
+        # 设置项写入共享的 Session
+        bulk.timeout = 3
+        assert client.timeout == 3
+
+        mock_request.return_value = Mock(status_code=200, json=Mock(return_value={"data": {"userInfo": {}}}))
+        ConcreteBase("1", None, bulk._session)._get_data()
+        ConcreteBase("1", None, client._session)._get_data()
+        stats = dispatcher.stats()
+        assert stats['bulk']['completed'] == 1 and stats['normal']['completed'] == 1
+        assert stats['bulk']['in_flight'] == 0
+
+        with pytest.raises(ValueError):
+            client.with_priority('urgent')
+
+    @patch('requests.Session.request')
+    def test_priority_with_concurrency_limiter(self, mock_request, mock_cookie):
+        """测试与接口并发限制一起使用时，排队中的 bulk 请求不占用接口名额"""
+        import threading
+        import time
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.crawler.ratelimit import AdaptiveConcurrencyLimiter
+        from weibo_api_sdk.utils.dispatch import RequestDispatcher
+        dispatcher = RequestDispatcher(max_concurrency=1)
+        client = WeiboClient(cookie=mock_cookie, dispatcher=dispatcher,
+                             concurrency_limiter=AdaptiveConcurrencyLimiter(initial=1, max_limit=1))
+        bulk = client.with_priority('bulk')
+        interactive = client.with_priority('interactive')
+        sent = []
+        gate = threading.Event()
+
+        def request(method, url, **kwargs):
+            sent.append(url.rsplit('=', 1)[1])
+            if sent[-1] == 'first':
+                gate.wait(1)
+            return Mock(status_code=200, json=Mock(return_value={"data": {}}))
+
+        mock_request.side_effect = request
+        threads = [
+            threading.Thread(target=ConcreteBase(uid, None, c._session)._get_data)
+            for uid, c in (('first', bulk), ('bulk', bulk), ('interactive', interactive))
+        ]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        gate.set()
+        for thread in threads:
+            thread.join(1)
+        assert sent == ['first', 'interactive', 'bulk']
@@ -0,0 +1,809 @@
+"""
+测试 crawler 爬取组件
+"""
+import pytest
+from weibo_api_sdk.crawler.frontier import (
+    SortedIdSet,
+    BloomFilter,
+    ScalableBloomFilter,
+    DiskQueue,
+    CrawlFrontier,
+)
+
+
+class TestVisitedSets:
+    """测试已访问集合"""
+
+    def test_sorted_id_set(self):
+        """测试有序数组加缓冲区的集合"""
+        ids = SortedIdSet(max_delta=4)
+        assert ids.add(5) is True
+        assert ids.add("3") is True
+        assert ids.add(5) is False
+        for uid in (9, 1, 7, 2):
+            ids.add(uid)
+        assert len(ids) == 6
+        assert 3 in ids and "7" in ids
+        assert 4 not in ids
+        assert list(ids) == [1, 2, 3, 5, 7, 9]
+        assert ids.nbytes > 0
+
+    def test_sorted_id_set_without_numpy(self, monkeypatch):
+        """测试没有 numpy 时退化为标准库 array"""
+        from weibo_api_sdk.crawler import frontier
+        monkeypatch.setattr(frontier, 'np', None)
+        ids = frontier.SortedIdSet(max_delta=2)
+        for uid in (3, 1, 2, 3):
+            ids.add(uid)
+        assert list(ids) == [1, 2, 3]
+        assert 2 in ids and 4 not in ids
+
+    def test_bloom_filter_no_false_negative(self):
+        """测试布隆过滤器没有漏判，且误判率在预期范围内"""
+        bloom = BloomFilter(10000, error_rate=0.01)
+        for uid in range(10000):
+            bloom.add(uid)
+        assert all(uid in bloom for uid in range(10000))
+        false_positives = sum(uid in bloom for uid in range(10000, 30000))
+        assert false_positives / 20000 < 0.03
+
+    def test_scalable_bloom_filter_grows(self):
+        """测试可扩容布隆过滤器"""
+        bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+        for uid in range(1000):
+            bloom.add(uid)
+        assert len(bloom._filters) > 1
+        assert all(uid in bloom for uid in range(1000))
+
+    def test_bloom_filter_invalid_error_rate(self):
+        """测试误判率参数校验"""
+        with pytest.raises(ValueError):
+            BloomFilter(100, error_rate=0)
+
+
+class TestFrontier:
+    """测试爬取边界"""
+
+    def test_disk_queue_spills_in_order(self, tmp_path):
+        """测试溢出到磁盘后仍保持先进先出"""
+        queue = DiskQueue(max_memory_items=3, spill_dir=str(tmp_path))
+        for uid in range(10):
+            queue.push(uid, uid % 3)
+        assert len(queue) == 10
+        assert len(queue._memory) == 3
+        popped = [queue.pop() for _ in range(5)]
+        queue.push(10, 1)
+        popped += [queue.pop() for _ in range(6)]
+        assert [uid for uid, _ in popped] == list(range(11))
+        assert popped[4] == (4, 1)
+        assert queue.pop() is None
+        queue.close()
+
+    def test_crawl_frontier_dedup(self):
+        """测试同一用户只入队一次"""
+        frontier = CrawlFrontier(max_memory_items=2)
+        assert frontier.push("1815418641", 0) is True
+        assert frontier.push(2, 1) is True
+        assert frontier.push(1815418641, 1) is False
+        frontier.push(3, 1)
+        assert len(frontier) == 3
+        assert frontier.pop() == (1815418641, 0)
+        assert frontier.push(2, 2) is False
+        assert [frontier.pop(), frontier.pop(), frontier.pop()] == [(2, 1), (3, 1), None]
+        frontier.close()
+
+    def test_crawl_frontier_with_bloom_filter(self):
+        """测试使用布隆过滤器作为已访问集合"""
+        frontier = CrawlFrontier(visited=ScalableBloomFilter(initial_capacity=10))
+        for uid in (1, 2, 1, 3):
+            frontier.push(uid, 0)
+        assert len(frontier) == 3
+
+
+class TestFollowGraph:
+    """测试 CSR 关注关系图"""
+
+    def build_graph(self, directory):
+        from weibo_api_sdk.crawler.graph import FollowGraphWriter
+        with FollowGraphWriter(str(directory), buffer_edges=2) as writer:
+            writer.add_follows(1, [2, 3, 4])
+            writer.add_follows("2", [1, 3])
+            writer.add_followers(3, [5])
+            writer.add_edge(1, 2)  # 重复边
+            return writer.compact()
+
+    def test_compact_and_query(self, tmp_path):
+        """测试压缩后的邻居查询"""
+        pytest.importorskip('numpy')
+        graph = self.build_graph(tmp_path)
+        assert graph.num_nodes == 5
+        assert graph.num_edges == 6
+        assert list(graph.follows(1)) == [2, 3, 4]
+        assert list(graph.followers(3)) == [1, 2, 5]
+        assert list(graph.follows(999)) == []
+        assert graph.out_degree(2) == 2
+        assert graph.in_degree(1) == 1
+        assert graph.index_of(999) is None
+
+    def test_load_memory_mapped(self, tmp_path):
+        """测试以内存映射方式加载"""
+        np = pytest.importorskip('numpy')
+        from weibo_api_sdk.crawler.graph import CSRGraph
+        self.build_graph(tmp_path)
+        graph = CSRGraph.load(str(tmp_path))
+        assert isinstance(graph.out_neighbors, np.memmap)
+        assert list(graph.followers(2)) == [1]
+
+    def test_writer_accepts_people(self, client, tmp_path):
+        """测试直接记录 People 对象"""
+        pytest.importorskip('numpy')
+        from weibo_api_sdk.weibo.people import People
+        from weibo_api_sdk.crawler.graph import FollowGraphWriter
+        with FollowGraphWriter(str(tmp_path)) as writer:
+            writer.add_follows(People("1", None, client._session),
+                               [People(2, None, client._session)])
+            graph = writer.compact()
+        assert list(graph.follows(1)) == [2]
+
+
+class TestGraphAnalytics:
+    """测试关注关系图分析"""
+
+    def build_graph(self, directory, edges):
+        from weibo_api_sdk.crawler.graph import FollowGraphWriter
+        with FollowGraphWriter(str(directory)) as writer:
+            for src, dst in edges:
+                writer.add_edge(src, dst)
+            return writer.compact()
+
+    def test_degrees_and_pagerank(self, tmp_path):
+        """测试度数和 PageRank"""
+        np = pytest.importorskip('numpy')
+        pytest.importorskip('scipy')
+        from weibo_api_sdk.crawler.analytics import in_degree, pagerank, top_users
+
+        # 10, 20, 30 都关注 100，100 只关注 10
+        graph = self.build_graph(tmp_path, [(10, 100), (20, 100), (30, 100), (100, 10)])
+        assert list(in_degree(graph)) == [1, 0, 0, 3]
+        rank = pagerank(graph)
+        assert rank.sum() == pytest.approx(1.0)
+        assert top_users(graph, rank, n=2)[0][0] == 100
+        assert top_users(graph, rank, n=2)[1][0] == 10
+        assert np.argmax(rank) == graph.index_of(100)
+
+    def test_k_core(self, tmp_path):
+        """测试核数：三角形为 2-core，挂在外面的节点为 1-core"""
+        pytest.importorskip('scipy')
+        from weibo_api_sdk.crawler.analytics import k_core
+
+        graph = self.build_graph(tmp_path, [(1, 2), (2, 3), (3, 1), (2, 1), (3, 4), (5, 5)])
+        core = dict(zip(graph.nodes.tolist(), k_core(graph).tolist()))
+        assert core == {1: 2, 2: 2, 3: 2, 4: 1, 5: 0}
+
+    def test_mutual_follows(self, tmp_path):
+        """测试互相关注检测"""
+        pytest.importorskip('numpy')
+        from weibo_api_sdk.crawler.analytics import mutual_follows, mutual_follows_of
+
+        graph = self.build_graph(tmp_path, [(1, 2), (2, 1), (1, 3), (3, 1), (2, 3), (4, 1)])
+        assert mutual_follows(graph).tolist() == [[1, 2], [1, 3]]
+        assert mutual_follows_of(graph, 1).tolist() == [2, 3]
+        assert mutual_follows_of(graph, 4).tolist() == []
+
+
+class TestPriorityCrawl:
+    """测试按优先级爬取"""
+
+    def test_priority_frontier_order(self):
+        """测试按分数出队，重复入队保留最高分"""
+        from weibo_api_sdk.crawler.frontier import PriorityFrontier
+        frontier = PriorityFrontier()
+        frontier.push(1, 1, 1.0)
+        frontier.push(2, 1, 5.0)
+        frontier.push(3, 1, 3.0)
+        frontier.push(1, 1, 9.0)
+        assert len(frontier) == 3
+        assert frontier.pop() == (1, 1, 1, 9.0)
+        assert frontier.push(1, 2, 10.0) is False  # 已访问
+        assert frontier.push(1, 1, 0.5, page=2) is True  # 后续页面
+        assert [frontier.pop()[0] for _ in range(3)] == [2, 3, 1]
+        assert frontier.pop() is None
+
+    def test_request_budget(self):
+        """测试请求预算"""
+        from weibo_api_sdk.crawler.engine import RequestBudget
+        budget = RequestBudget(2)
+        assert budget.try_spend() and budget.try_spend()
+        assert budget.try_spend() is False
+        assert budget.remaining == 0
+
+    def test_influence_score(self):
+        """测试默认分数随粉丝数增加、随层级衰减"""
+        from weibo_api_sdk.crawler.engine import influence_score
+        assert influence_score("262.6万", 1) > influence_score(1000, 1)
+        assert influence_score(1000, 1) > influence_score(1000, 2)
+        assert influence_score(1000, 1, last_active=0, now=86400 * 30) == pytest.approx(
+            influence_score(1000, 1) / 2)
+
+    def test_default_score_uses_last_active(self, client):
+        """测试默认分数按用户最新一条微博的时间衰减"""
+        import time
+        from unittest.mock import patch, Mock
+        from weibo_api_sdk.weibo.people import People
+        from weibo_api_sdk.crawler.engine import FollowCrawler, RequestBudget
+
+        crawler = FollowCrawler(client)
+        active = People(1, {'userInfo': {'followers_count': 1000, 'status': {'created_at': '刚刚'}}},
+                        client._session)
+        idle = People(2, {'userInfo': {'followers_count': 1000, 'status': {'created_at': '2020-01-01'}}},
+                      client._session)
+        unknown = People(3, {'userInfo': {'followers_count': 1000}}, client._session)
+        assert crawler._score(active, 1) > crawler._score(idle, 1)
+        assert crawler._score(unknown, 1) == pytest.approx(crawler._score(active, 1))
+
+        # 关注列表中没有附带微博时请求第一页微博，计入预算和限速，每个用户只请求一次
+        crawler = FollowCrawler(client, budget=RequestBudget(1), fetch_last_active=True,
+                                rate_limits={'statuses': 100.0})
+        old = time.strftime('%Y-%m-%d', time.localtime(time.time() - 90 * 86400))
+        page = {"ok": 1, "data": {"cards": [
+            {"mblog": {"id": "1", "text": "", "created_at": "2019-01-01", "user": {"id": 3}}},
+            {"mblog": {"id": "2", "text": "", "created_at": old, "user": {"id": 3}}},
+        ], "cardlistInfo": {"total": 2}}}
+        response = Mock(json=Mock(return_value=page))
+        limiter = crawler.rate_limiter.limiter('statuses')
+        with patch('requests.Session.request', return_value=response) as mock_request, \
+                patch.object(limiter, 'acquire', wraps=limiter.acquire) as acquire:
+            score = crawler._score(unknown, 1)
+            assert crawler._score(unknown, 1) == pytest.approx(score)
+            # 预算已耗尽，其他用户不再请求
+            other = People(4, {'userInfo': {'followers_count': 1000}}, client._session)
+            assert crawler._score(other, 1) == pytest.approx(crawler._score(active, 1))
+        assert mock_request.call_count == 1 and acquire.call_count == 1
+        assert crawler.budget.remaining == 0
+        assert score == pytest.approx(crawler._score(active, 1) / 8, rel=0.05)
+
+    def test_rediscovered_user_keeps_best_score(self, client):
+        """测试用户展开前再次被发现时按更高的分数（更浅的层级）重新入队，且只写入一次"""
+        from weibo_api_sdk.weibo.people import People
+        from weibo_api_sdk.crawler.engine import FollowCrawler
+
+        def people(uid):
+            return People(uid, {'userInfo': {'id': uid, 'followers_count': 1000}}, client._session)
+
+        written = []
+        crawler = FollowCrawler(client, max_depth=4, max_pages=1)
+        crawler.sinks = [type('Sink', (), {'write': lambda self, obj: written.append(obj._id)})()]
+        deep = crawler._handle(1, 2, 1, 1.0, [people(5)])
+        shallow = crawler._handle(2, 0, 2, 1.0, [people(5)])
+        assert deep == [(5, 3, crawler._score(people(5), 3))]
+        assert shallow == [(5, 1, crawler._score(people(5), 1))]
+        assert written == [5]
+        for args in deep + shallow:
+            crawler.frontier.push(*args)
+        assert crawler.frontier.pop()[:3] == (5, 1, 1)
+        # 展开后不再入队
+        assert crawler.frontier.push(*shallow[0]) is False
+
+    def test_follow_crawler_spends_budget_on_influential_users(self, client):
+        """测试在预算内优先展开粉丝多的用户"""
+        from weibo_api_sdk.weibo.people import People
+        from weibo_api_sdk.crawler.engine import FollowCrawler, RequestBudget
+
+        followers = {1: 0, 2: 100, 3: 1000000, 4: 10, 5: 50, 6: 60}
+        follows = {1: [2, 3], 2: [4], 3: [5, 6]}
+
+        def people(uid):
+            return People(uid, {'userInfo': {'id': uid, 'followers_count': followers[uid]}},
+                          client._session)
+
+        class Recorder:
+            def __init__(self):
+                self.records = []
+
+            def write(self, obj):
+                self.records.append(obj._id)
+
+        recorder = Recorder()
+        crawler = FollowCrawler(client, budget=RequestBudget(3), max_pages=1, sinks=[recorder])
+        fetched = []
+
+        def fake_fetch(uid, page):
+            fetched.append((uid, page))
+            return [people(f) for f in follows.get(uid, [])]
+
+        crawler._fetch = fake_fetch
+        crawler._fetch_profile = people
+        stats = crawler.run([1])
+        assert fetched == [(1, 1), (3, 1)]
+        # 展开起始用户时请求了它的资料
+        assert stats['requests'] == 3
+        assert recorder.records == [1, 2, 3, 5, 6]
+
+
+def fake_network(client, fanout=3, levels=4):
+    """生成一个树状关注网络：用户 u 关注 u*10+1 ... u*10+fanout"""
+    from weibo_api_sdk.weibo.people import People
+
+    def fetch(uid, page):
+        if page > 1 or uid >= 10 ** levels:
+            return []
+        return [People(uid * 10 + i, {'userInfo': {'id': uid * 10 + i, 'followers_count': 100}},
+                       client._session) for i in range(1, fanout + 1)]
+    return fetch
+
+
+class TestCrawlerEngine:
+    """测试多线程爬取引擎"""
+
+    def test_rate_limiter(self):
+        """测试令牌桶限速"""
+        import time
+        from weibo_api_sdk.crawler.ratelimit import RateLimiter, EndpointRateLimiter
+        limiter = RateLimiter(rate=50, burst=2)
+        assert limiter.try_acquire() and limiter.try_acquire()
+        assert limiter.try_acquire() is False
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        assert time.monotonic() - start >= 0.08
+        endpoints = EndpointRateLimiter({'follows': 10})
+        assert endpoints.limiter('follows') is not None
+        assert endpoints.limiter('people') is None
+        with pytest.raises(ValueError):
+            RateLimiter(0)
+
+    def test_workers_do_not_fetch_twice(self, client):
+        """测试多线程共享爬取边界，每个页面只请求一次"""
+        import threading
+        from weibo_api_sdk.crawler.engine import FollowCrawler
+
+        fetch = fake_network(client)
+        fetched = []
+        lock = threading.Lock()
+
+        def recording_fetch(uid, page):
+            with lock:
+                fetched.append((uid, page))
+            return fetch(uid, page)
+
+        crawler = FollowCrawler(client, max_depth=3, max_pages=2, workers=4)
+        crawler._fetch = recording_fetch
+        stats = crawler.run([1])
+        assert len(fetched) == len(set(fetched))
+        # 第 0~2 层共 1 + 3 + 9 个用户，每人 2 页
+        assert len(fetched) == 26
+        assert stats['users'] == 3 + 9 + 27
+        assert stats['in_flight'] == 0
+
+    def test_retry_on_error(self, client):
+        """测试请求失败后重试"""
+        from weibo_api_sdk.crawler.engine import FollowCrawler
+        calls = []
+
+        def flaky_fetch(uid, page):
+            calls.append(uid)
+            if len(calls) == 1:
+                raise TypeError('Only dict and list can be StreamingJSON.')
+            return []
+
+        crawler = FollowCrawler(client, max_retries=1)
+        crawler._fetch = flaky_fetch
+        stats = crawler.run([1])
+        assert calls == [1, 1]
+        assert stats['errors'] == 1 and stats['retries'] == 1
+
+    def test_stop_and_resume(self, client, tmp_path):
+        """测试停止后从断点继续"""
+        from weibo_api_sdk.crawler.engine import FollowCrawler, RequestBudget
+
+        checkpoint = str(tmp_path / "crawl.ckpt")
+        fetch = fake_network(client)
+        first = FollowCrawler(client, max_depth=3, max_pages=1, checkpoint_path=checkpoint)
+        fetched = []
+
+        def stopping_fetch(uid, page):
+            fetched.append(uid)
+            if len(fetched) == 3:
+                first.stop()
+            return fetch(uid, page)
+
+        first._fetch = stopping_fetch
+        assert first.run([1])['requests'] == 3
+
+        second = FollowCrawler(client, max_depth=3, max_pages=1, checkpoint_path=checkpoint)
+        second._fetch = lambda uid, page: fetched.append(uid) or fetch(uid, page)
+        stats = second.run([1])
+        assert len(fetched) == len(set(fetched)) == 13
+        assert stats['requests'] == 13
+
+    def test_checkpoint_keeps_in_flight_tasks(self, client, tmp_path):
+        """测试断点保存在途请求和失败次数，恢复后重新入队"""
+        import threading
+        from weibo_api_sdk.crawler.engine import FollowCrawler
+
+        checkpoint = str(tmp_path / "crawl.ckpt")
+        fetch = fake_network(client)
+        first = FollowCrawler(client, max_depth=2, max_pages=1, checkpoint_path=checkpoint)
+        first.add_seed(1)
+        task = first._next_task()
+        first._failures[(9, 1)] = 1
+        first.save_state(checkpoint)
+        assert first.progress()['in_flight'] == 1
+
+        second = FollowCrawler(client, max_depth=2, max_pages=1, checkpoint_path=checkpoint)
+        assert second._failures == {(9, 1): 1}
+        assert second.budget.used == 0
+        fetched = []
+        second._fetch = lambda uid, page: fetched.append(uid) or fetch(uid, page)
+        stats = second.run()
+        assert task[0] == 1 and fetched[0] == 1
+        assert stats['requests'] == 4
+
+        # 多个线程同时保存断点不会互相覆盖临时文件
+        threads = [threading.Thread(target=second.save_state, args=(checkpoint,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert FollowCrawler(client, checkpoint_path=checkpoint).stats.requests == 4
+
+    def test_run_async(self, client):
+        """测试 asyncio 模式"""
+        import asyncio
+        from weibo_api_sdk.crawler.engine import FollowCrawler
+
+        crawler = FollowCrawler(client, max_depth=2, max_pages=1, workers=3)
+        crawler._fetch = fake_network(client)
+        stats = asyncio.run(crawler.run_async([1]))
+        assert stats['requests'] == 4
+        assert stats['users'] == 12
+
+    def test_progress_callback(self, client):
+        """测试进度回调"""
+        from weibo_api_sdk.crawler.engine import FollowCrawler
+        snapshots = []
+        crawler = FollowCrawler(client, max_depth=2, max_pages=1,
+                                on_progress=snapshots.append, progress_interval=0)
+        crawler._fetch = fake_network(client)
+        crawler.run([1])
+        assert snapshots and {'requests', 'queued', 'requests_per_sec'} <= set(snapshots[-1])
+
+
+class TestShardedCrawl:
+    """测试多进程共享的爬取边界"""
+
+    def test_sqlite_frontier(self, tmp_path):
+        """测试按分片领取任务、确认和恢复"""
+        from weibo_api_sdk.crawler.sharded import SQLiteFrontier
+
+        db = str(tmp_path / "frontier.db")
+        even, odd = SQLiteFrontier(db, 0, 2), SQLiteFrontier(db, 1, 2)
+        assert even.push(2, 0, 1.0) and even.push(4, 0, 5.0) and even.push(3, 0, float('inf'))
+        # 同一请求再次加入时只保留较高的分数
+        assert even.push(2, 0, 9.0) and not even.push(2, 0, 0.5)
+        assert odd.pop() == (3, 0, 1, float('inf'))
+        assert odd.pop() is None
+        assert even.pop() == (2, 0, 1, 9.0)
+        # 已访问用户的第一页不再入队
+        assert not odd.push(2, 1, 100.0)
+        assert even.recover() == 2
+        assert even.pop()[0] == 2
+        even.task_done(2, 1)
+        assert even.pop()[0] == 4
+        assert len(even) == 2
+        even.task_done(4, 1)
+        assert odd.pop()[0] == 3
+        odd.task_done(3, 1)
+        assert len(even) == len(odd) == 0
+        # 退出的分片剩下的任务不再计入其他分片
+        odd.push(5, 1, 1.0)
+        assert len(even) == 1
+        odd.close()
+        assert len(even) == 0
+        even.close()
+
+    def test_seeding_does_not_finish_shard(self, client, tmp_path):
+        """测试加入起始用户后，先启动的其他分片仍然计入起始用户所在分片的任务"""
+        from weibo_api_sdk.crawler.engine import FollowCrawler
+        from weibo_api_sdk.crawler.sharded import SQLiteFrontier, _seed, run_sharded
+
+        db = str(tmp_path / "crawl.db")
+        _seed(db, 2, [2])
+        odd = SQLiteFrontier(db, 1, 2)
+        assert len(odd) == 1
+        odd.close()
+
+        with pytest.raises(ValueError):
+            run_sharded([2], db, processes=2, checkpoint_path=str(tmp_path / "crawl.ckpt"))
+        with pytest.raises(ValueError):
+            FollowCrawler(client, frontier=SQLiteFrontier(db, 0, 2), checkpoint_path=str(tmp_path / "crawl.ckpt"))
+
+    def test_sharded_budget_split(self, tmp_path):
+        """测试总请求预算全部分给各进程，预算少于进程数时减少进程数"""
+        from unittest.mock import MagicMock, patch
+        from weibo_api_sdk.crawler import sharded
+
+        def run(max_requests, processes):
+            ctx = MagicMock()
+            pool = ctx.Pool.return_value.__enter__.return_value
+            with patch.object(sharded.multiprocessing, 'get_context', return_value=ctx):
+                sharded.run_sharded([2], str(tmp_path / "crawl.db"), processes=processes,
+                                    max_requests=max_requests)
+            return [args[4] for args in pool.starmap.call_args.args[1]]
+
+        assert run(10, 4) == [3, 3, 2, 2]
+        assert run(2, 4) == [1, 1]
+        assert run(None, 2) == [None, None]
+        with pytest.raises(ValueError):
+            sharded.run_sharded([2], str(tmp_path / "crawl.db"), processes=2, max_requests=0)
+
+    def test_shards_do_not_fetch_twice(self, client, tmp_path):
+        """测试多个分片共享数据库，每个页面只请求一次"""
+        import threading
+        from weibo_api_sdk.crawler.engine import FollowCrawler
+        from weibo_api_sdk.crawler.sharded import SQLiteFrontier, SQLiteSeenSet
+
+        db = str(tmp_path / "crawl.db")
+        fetch = fake_network(client)
+        fetched = []
+        lock = threading.Lock()
+
+        def recording_fetch(uid, page):
+            with lock:
+                fetched.append((uid, page))
+            return fetch(uid, page)
+
+        crawlers = []
+        for shard in range(2):
+            crawler = FollowCrawler(client, max_depth=3, max_pages=1,
+                                    frontier=SQLiteFrontier(db, shard, 2), seen=SQLiteSeenSet(db))
+            crawler._fetch = recording_fetch
+            crawlers.append(crawler)
+        crawlers[0].add_seed(1)
+        results = [None, None]
+
+        def run(i):
+            results[i] = crawlers[i].run()
+            crawlers[i].frontier.close()
+            crawlers[i]._seen.close()
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(fetched) == len(set(fetched)) == 1 + 3 + 9
+        assert sum(r['requests'] for r in results) == 13
+        assert sum(r['users'] for r in results) == 3 + 9 + 27
+        # 两个分片都领取到了任务
+        assert all(r['requests'] for r in results)
+
+
+class FakeMediaResponse:
+    """支持 Range 请求的假响应，可以在指定字节后中断"""
+
+    def __init__(self, data, headers, fail_after=None):
+        start = 0
+        if headers and 'Range' in headers:
+            start = int(headers['Range'][len('bytes='):-1])
+        self.status_code = 206 if start else 200
+        if start >= len(data) and start:
+            self.status_code = 416
+        self._data = data[start:]
+        self._fail_after = fail_after
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self._data), chunk_size):
+            if self._fail_after is not None and i >= self._fail_after:
+                raise ConnectionError('connection reset')
+            yield self._data[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class TestMediaDownloader:
+    """测试图片、视频下载"""
+
+    def test_download_resume_and_dedup(self, client, tmp_path):
+        """测试断点续传、按 URL 跳过和按内容去重"""
+        from unittest.mock import patch
+        from weibo_api_sdk.crawler.media import MediaDownloader
+        from weibo_api_sdk.weibo.pic import Pic
+
+        data = bytes(range(256)) * 40
+        calls = []
+
+        def fake_request(method, url, headers=None, **kwargs):
+            calls.append(headers)
+            # 第一次请求在 4096 字节后中断
+            return FakeMediaResponse(data, headers, fail_after=4096 if len(calls) == 1 else None)
+
+        with patch('requests.Session.request', side_effect=fake_request):
+            downloader = MediaDownloader(client._session, str(tmp_path), chunk_size=1024)
+            pic = Pic("https://wx1.sinaimg.cn/large/006abc.jpg", None, client._session)
+            result = downloader.download(pic)
+            assert result['status'] == 'downloaded' and result['bytes'] == len(data)
+            assert calls == [None, {'Range': 'bytes=4096-'}]
+            assert (tmp_path / "large" / "006abc.jpg").read_bytes() == data
+
+            # 同一张图片的另一个地址，内容相同只保留一份
+            results = downloader.download_many([
+                "https://wx2.sinaimg.cn/mw2000/006abc.jpg",
+                "https://wx1.sinaimg.cn/large/006abc.jpg",
+                "https://wx2.sinaimg.cn/mw2000/006abc.jpg",
+            ])
+        assert [r['status'] for r in results] == ['duplicate', 'skipped', 'duplicate']
+        assert results[0]['path'] == result['path']
+        assert not (tmp_path / "mw2000" / "006abc.jpg").exists()
+        assert len(calls) == 3
+
+        # 重新创建下载器时从索引恢复
+        reloaded = MediaDownloader(client._session, str(tmp_path))
+        assert reloaded.download(pic)['status'] == 'skipped'
+
+    def test_same_path_on_different_hosts(self, client, tmp_path):
+        """测试不同域名上的同一张图片只下载一次，不会同时写入同一个 .part 文件"""
+        import threading
+        import time
+        from unittest.mock import patch
+        from weibo_api_sdk.crawler.media import MediaDownloader
+
+        data = bytes(range(256)) * 40
+        calls = []
+        lock = threading.Lock()
+
+        def fake_request(method, url, headers=None, **kwargs):
+            with lock:
+                calls.append(url)
+            time.sleep(0.02)
+            return FakeMediaResponse(data, headers)
+
+        urls = ["https://wx%d.sinaimg.cn/large/006abc.jpg" % i for i in range(1, 5)]
+        with patch('requests.Session.request', side_effect=fake_request):
+            downloader = MediaDownloader(client._session, str(tmp_path), workers=4, chunk_size=1024)
+            results = downloader.download_many(urls)
+            # 直接并发调用 download 时按路径加锁，依次写入
+            threads = [threading.Thread(target=downloader.download, args=(url,)) for url in urls[1:]]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert len(calls) == 1 + 3
+        assert {r['path'] for r in results} == {"large/006abc.jpg"}
+        assert (tmp_path / "large" / "006abc.jpg").read_bytes() == data
+        assert not (tmp_path / "large" / "006abc.jpg.part").exists()
+
+    def test_status_media(self, client):
+        """测试微博列表中的图片和视频"""
+        from unittest.mock import patch, Mock
+        from weibo_api_sdk.weibo.status import Statuses
+        response = {"ok": 1, "data": {"cards": [{"mblog": {
+            "id": "1", "text": "", "user": {"id": 1},
+            "pics": [{"url": "https://wx1.sinaimg.cn/orj360/006abc.jpg",
+                      "large": {"url": "https://wx1.sinaimg.cn/large/006abc.jpg"}}],
+            "page_info": {"type": "video", "media_info": {
+                "stream_url": "https://f.video.weibocdn.com/o0/v.mp4?label=mp4_ld"}},
+        }}], "cardlistInfo": {"total": 1}}}
+        with patch('requests.Session.request', return_value=Mock(json=Mock(return_value=response))):
+            status = next(Statuses("1", None, client._session).page(1))
+        assert [p.url for p in status.pics] == ["https://wx1.sinaimg.cn/orj360/006abc.jpg"]
+        assert status.pics[0].filename == "orj360/006abc.jpg"
+        assert status.video.filename == "o0/v.mp4"
+
+
+class TestMediaPolicy:
+    """测试图片尺寸选择"""
+
+    PIC = {"url": "https://wx1.sinaimg.cn/orj360/006abc.jpg",
+           "large": {"url": "https://wx1.sinaimg.cn/large/006abc.jpg", "geo": {"width": "800"}}}
+
+    def test_select_by_width(self, client):
+        """测试按最小宽度选择尺寸"""
+        from weibo_api_sdk.weibo.pic import Pic, MediaPolicy
+        pic = Pic(self.PIC['url'], self.PIC, client._session)
+        assert pic.width == 800
+        assert pic.variant('mw2000') == "https://wx1.sinaimg.cn/mw2000/006abc.jpg"
+        assert MediaPolicy(min_width=400).select(pic).url == "https://wx1.sinaimg.cn/bmiddle/006abc.jpg"
+        # 原图只有 800 宽，mw1024 已经是原图大小
+        assert MediaPolicy(min_width=1500).select(pic).url == "https://wx1.sinaimg.cn/mw1024/006abc.jpg"
+        assert pic.select() is pic
+
+    def test_select_by_bytes(self, mock_cookie):
+        """测试按字节预算选择尺寸，并统计节省的流量"""
+        from unittest.mock import patch, Mock
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.weibo.pic import Pic, MediaPolicy
+        sizes = {'large': 900000, 'mw2000': 900000, 'mw1024': 400000, 'mw690': 150000,
+                 'bmiddle': 90000, 'orj360': 50000, 'thumbnail': 10000}
+
+        def fake_request(method, url, **kwargs):
+            assert method == 'HEAD'
+            return Mock(headers={'Content-Length': str(sizes[url.split('/')[3]])})
+
+        policy = MediaPolicy(max_bytes=200000)
+        client = WeiboClient(cookie=mock_cookie, media_policy=policy)
+        assert client.media_policy is policy
+        pic = Pic(self.PIC['url'], self.PIC, client._session)
+        with patch('requests.Session.request', side_effect=fake_request) as mock_request:
+            selected = pic.select()
+            assert selected.url == "https://wx1.sinaimg.cn/mw690/006abc.jpg"
+            # 探测结果按图片 ID 缓存，换一个域名也不再请求
+            Pic(self.PIC['url'].replace('wx1', 'wx3'), self.PIC, client._session).select()
+        # large 超出后在其余尺寸中二分查找
+        assert [c.kwargs['url'].split('/')[3] for c in mock_request.call_args_list] == [
+            'large', 'mw690', 'mw1024']
+        assert policy.stats == {'selected': {'mw690': 2}, 'probes': 3, 'bytes_saved': 1500000}
+
+        # 只按宽度选择时不探测，已知原图和选中尺寸的大小时仍计入节省的字节数
+        width_policy = MediaPolicy(min_width=600)
+        with patch('requests.Session.request', side_effect=fake_request) as mock_request:
+            assert width_policy.select(pic).url == "https://wx1.sinaimg.cn/mw690/006abc.jpg"
+            assert not mock_request.called
+            width_policy.probe(client._session, pic.variant('large'))
+            width_policy.probe(client._session, pic.variant('mw690'))
+            width_policy.select(pic)
+        assert width_policy.stats['bytes_saved'] == 750000
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """测试自适应并发限制"""
+
+    def test_aimd(self):
+        """测试正常时加性增加，限流时乘性减少且同一批请求只减少一次"""
+        from weibo_api_sdk.crawler.ratelimit import AdaptiveConcurrencyLimiter
+        from weibo_api_sdk.utils.exception import DeadlineExceededException
+        limiter = AdaptiveConcurrencyLimiter(initial=2, max_limit=4)
+        a = limiter.acquire('follows')
+        b = limiter.acquire('follows')
+        with pytest.raises(DeadlineExceededException):
+            limiter.acquire('follows', timeout=0.01)
+        limiter.release('follows', a)
+        limiter.release('follows', b)
+        assert limiter.limit('follows') == 2
+        for _ in range(4):
+            slots = [limiter.acquire('follows') for _ in range(limiter.limit('follows'))]
+            for slot in slots:
+                limiter.release('follows', slot)
+        assert limiter.limit('follows') == 4
+
+        slots = [limiter.acquire('follows') for _ in range(4)]
+        for slot in slots:
+            limiter.release('follows', slot, throttled=True)
+        assert limiter.limit('follows') == 2
+        assert limiter.stats['throttles'] == 4 and limiter.stats['decreases'] == 1
+        assert limiter.limits() == {'follows': {'limit': 2, 'in_flight': 0}}
+        # 其他接口类型不受影响
+        assert limiter.limit('people') == 2
+
+    def test_throttle_signals_from_requests(self, mock_cookie):
+        """测试请求被限流时下调对应接口类型的上限"""
+        from unittest.mock import patch, Mock
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.crawler.ratelimit import AdaptiveConcurrencyLimiter
+        from weibo_api_sdk.utils.exception import ThrottledException
+        limiter = AdaptiveConcurrencyLimiter(initial=8)
+        client = WeiboClient(cookie=mock_cookie, concurrency_limiter=limiter)
+        patcher = patch('requests.Session.request')
+        mock_request = patcher.start()
+
+        mock_request.return_value = Mock(status_code=418)
+        with pytest.raises(ThrottledException):
+            list(client.follow("1").page(1))
+        assert limiter.limit('follows') == 4
+
+        mock_request.return_value = Mock(status_code=200, json=Mock(return_value={"ok": 0}))
+        with pytest.raises(TypeError):
+            list(client.follow("1").page(1))
+        assert limiter.limit('follows') == 2
+
+        mock_request.side_effect = ConnectionError
+        with pytest.raises(ConnectionError):
+            client.people("1").name
+        patcher.stop()
+        assert limiter.limit('people') == 8
+        assert limiter.limits()['follows']['in_flight'] == 0
+        assert limiter.limits()['people']['in_flight'] == 0
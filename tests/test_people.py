@@ -71,6 +71,13 @@ class TestPeople:
         people = People("1815418641", cache, client._session)
         assert people._cache == cache
 
+    def test_people_counts_are_parsed(self, client):
+        """测试粉丝数缩写被转为整数"""
+        cache = {"userInfo": {"id": 1815418641, "followers_count": "262.6万", "follow_count": 500}}
+        people = People("1815418641", cache, client._session)
+        assert people.followers_count == 2626000
+        assert people.follow_count == 500
+
 
 class TestPeoples:
     """测试 Peoples 类（粉丝/关注列表）"""
@@ -114,3 +121,144 @@ class TestPeoples:
         peoples._page_num = 2
         assert peoples._page_num == 2
 
+
+
+class TestFetchAccounting:
+    """测试属性读取触发的请求统计"""
+
+    @patch('requests.Session.request')
+    def test_lazy_fetch_attribution(self, mock_request, mock_cookie, sample_user_response):
+        """测试按类、属性和调用位置统计请求"""
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.utils.accounting import FetchAccounting
+
+        client = WeiboClient(cookie=mock_cookie, fetch_accounting=FetchAccounting())
+        mock_request.return_value = Mock(json=Mock(return_value=sample_user_response))
+        names = [client.people(uid).name for uid in ("1", "2", "3")]
+        people = client.people("4")
+        people.name
+        people.name  # 已有数据，不再请求
+
+        assert mock_request.call_count == 4 and len(set(names)) == 1
+        snapshot = client.fetch_accounting.snapshot()
+        assert snapshot['total'] == 4
+        assert snapshot['by_class'] == [('People', 4)]
+        assert snapshot['by_attribute'] == [('People.name (People.userInfo)', 4)]
+        (key, site), count = snapshot['by_call_site'][0]
+        assert count == 3 and site.startswith(__file__)
+        assert 'lazy fetches: 4' in client.fetch_accounting.report()
+
+    @patch('requests.Session.request')
+    def test_accounting_disabled(self, mock_request, client, sample_user_response):
+        """测试默认不统计"""
+        mock_request.return_value = Mock(json=Mock(return_value=sample_user_response))
+        client.people("1").name
+        assert client.fetch_accounting is None
+
+
+class TestHedgePolicy:
+    """测试对冲请求"""
+
+    @patch('requests.Session.request')
+    def test_slow_request_is_hedged(self, mock_request, mock_cookie, sample_user_response):
+        """测试原请求过慢时采用对冲请求的结果"""
+        import threading
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.utils.hedge import HedgePolicy
+
+        release = threading.Event()
+        slow = Mock(json=Mock(return_value={"data": {"userInfo": {"screen_name": "slow"}}}))
+        fast = Mock(json=Mock(return_value=sample_user_response))
+        calls = []
+
+        def fake_request(**kwargs):
+            calls.append(kwargs['url'])
+            if len(calls) == 1:
+                release.wait(5)
+                return slow
+            return fast
+
+        mock_request.side_effect = fake_request
+        policy = HedgePolicy(initial_delay=0.01)
+        client = WeiboClient(cookie=mock_cookie, hedge_policy=policy)
+        try:
+            assert client.people("1").name == "测试用户"
+            assert len(calls) == 2 and calls[0] == calls[1]
+            assert policy.stats == {'requests': 1, 'hedged': 1, 'hedge_wins': 1, 'budget_exhausted': 0}
+        finally:
+            release.set()
+            policy.close()
+
+    @patch('requests.Session.request')
+    def test_hedge_budget(self, mock_request, mock_cookie, sample_user_response):
+        """测试预算用尽时不再对冲，其他接口不受影响"""
+        import time
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.utils.hedge import HedgePolicy
+
+        def slow_request(**kwargs):
+            time.sleep(0.05)
+            return Mock(json=Mock(return_value=sample_user_response))
+
+        mock_request.side_effect = slow_request
+        policy = HedgePolicy(initial_delay=0.001, budget_ratio=0.0, max_tokens=0.0)
+        client = WeiboClient(cookie=mock_cookie, hedge_policy=policy)
+        try:
+            client.people("1").name
+            assert mock_request.call_count == 1
+            assert policy.stats['budget_exhausted'] == 1 and policy.stats['hedged'] == 0
+        finally:
+            policy.close()
+
+    @patch('requests.Session.request')
+    def test_slow_body_is_hedged(self, mock_request, mock_cookie, sample_user_response):
+        """测试响应头很快但内容传输慢时同样对冲，耗时按读完内容计算"""
+        import io
+        import json
+        import threading
+        import requests
+        from weibo_api_sdk import WeiboClient
+        from weibo_api_sdk.utils.hedge import HedgePolicy
+
+        release = threading.Event()
+
+        class SlowBody(io.BytesIO):
+            def read(self, *args, **kwargs):
+                release.wait(5)
+                return super().read(*args, **kwargs)
+
+        def make_response(raw):
+            res = requests.Response()
+            res.status_code = 200
+            res.headers['Content-Type'] = 'application/json'
+            res.url = 'https://m.weibo.cn/api'
+            res.raw = raw
+            return res
+
+        slow_body = json.dumps({"data": {"userInfo": {"screen_name": "slow"}}}).encode('utf-8')
+        fast_body = json.dumps(sample_user_response).encode('utf-8')
+        responses = [make_response(SlowBody(slow_body)), make_response(io.BytesIO(fast_body))]
+        mock_request.side_effect = lambda **kwargs: responses.pop(0)
+        policy = HedgePolicy(initial_delay=0.01)
+        client = WeiboClient(cookie=mock_cookie, hedge_policy=policy)
+        try:
+            assert client.people("1").name == "测试用户"
+            assert mock_request.call_count == 2
+            assert policy.stats['hedge_wins'] == 1
+            assert len(policy._latencies['people']) == 1
+        finally:
+            release.set()
+            policy.close()
+
+    def test_delay_from_recent_latency(self):
+        """测试按最近耗时的分位数计算等待时间"""
+        from weibo_api_sdk.utils.hedge import HedgePolicy
+        policy = HedgePolicy(percentile=0.9, min_samples=10, initial_delay=1.0, min_delay=0.0)
+        assert policy.delay('people') == 1.0
+        for i in range(1, 11):
+            policy._observe('people', i / 10)
+        assert policy.delay('people') == 1.0
+        assert policy.delay('status') == 1.0
+        for _ in range(10):
+            policy._observe('people', 0.1)
+        assert policy.delay('people') == 0.9
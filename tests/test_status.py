@@ -116,3 +116,108 @@ class TestStatuses:
         assert statuses._cache is None
         assert statuses._refresh_times == 1
 
+
+    def test_statuses_pipeline(self, client):
+        """测试流水线方式获取多页微博"""
+        statuses = Statuses("1815418641", None, client._session, original=True)
+
+        def fake_fetch(page_num):
+            return ['status_%d' % page_num]
+
+        with patch.object(Statuses, '_fetch_page', side_effect=fake_fetch):
+            result = list(statuses.pipeline(1, 3, workers=2))
+        assert result == ['status_1', 'status_2', 'status_3']
+
+
+class TestDeadline:
+    """测试超时和截止时间"""
+
+    @staticmethod
+    def page_response(sid):
+        return {"ok": 1, "data": {"cards": [{"mblog": {"id": sid, "text": "", "user": {"id": 1}}}],
+                                  "cardlistInfo": {"total": 10}}}
+
+    @patch('requests.Session.request')
+    def test_timeout_passed_to_request(self, mock_request, client):
+        """测试请求带有 client 的超时时间，并受截止时间限制"""
+        from weibo_api_sdk.utils.deadline import Deadline
+        mock_request.return_value = Mock(json=Mock(return_value=self.page_response("1")))
+        list(Statuses("1", None, client._session).page(1))
+        assert mock_request.call_args.kwargs['timeout'] == (5, 30)
+
+        deadline = Deadline(1.0)
+        list(Statuses("1", None, client._session).page_from_to(1, 1, deadline))
+        connect, read = mock_request.call_args.kwargs['timeout']
+        assert 0 < connect <= 1.0 and 0 < read <= 1.0
+        assert not deadline.truncated
+
+    @patch('requests.Session.request')
+    def test_deadline_stops_pagination(self, mock_request, client):
+        """测试截止时间到期后停止迭代，保留已取到的页"""
+        import time
+        from weibo_api_sdk.utils.deadline import Deadline
+        deadline = Deadline(0.2)
+        calls = []
+
+        def fake_request(*args, **kwargs):
+            calls.append(kwargs['timeout'])
+            if len(calls) == 2:
+                time.sleep(0.25)
+            return Mock(json=Mock(return_value=self.page_response(str(len(calls)))))
+
+        mock_request.side_effect = fake_request
+        statuses = list(Statuses("1", None, client._session).page_from_to(1, 5, deadline))
+        # 第 2 页返回时已经到期，第 3 页不再请求
+        assert [s.id for s in statuses] == ["1", "2"]
+        assert len(calls) == 2
+        assert deadline.truncated and deadline.stopped_at == 3
+
+    @patch('requests.Session.request')
+    def test_request_timeout_at_deadline(self, mock_request, client):
+        """测试到期时的请求超时被视为截止，不抛出异常"""
+        import requests
+        from weibo_api_sdk.utils.deadline import Deadline
+        deadline = Deadline(0.05)
+
+        def timing_out(*args, **kwargs):
+            import time
+            time.sleep(0.06)
+            raise requests.exceptions.ReadTimeout()
+
+        mock_request.side_effect = timing_out
+        assert list(Statuses("1", None, client._session).page_from_to(1, 5, deadline)) == []
+        assert deadline.truncated and deadline.stopped_at == 1
+
+        # 未到期的超时照常抛出
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            list(Statuses("1", None, client._session).page_from_to(1, 5, Deadline(10)))
+
+    @patch('requests.Session.request')
+    def test_deadline_covers_total_and_pipeline(self, mock_request, client):
+        """测试 all() 读取总数和 pipeline() 的请求也受截止时间限制"""
+        import time
+        from weibo_api_sdk.utils.deadline import Deadline
+        from weibo_api_sdk.weibo.people import Peoples
+        expired = Deadline(0)
+        assert list(Statuses("1", None, client._session).all(expired)) == []
+        assert list(Peoples("1", None, client._session).all(expired)) == []
+        assert expired.truncated and mock_request.call_count == 0
+
+        mock_request.return_value = Mock(json=Mock(return_value=self.page_response("1")))
+        deadline = Deadline(1.0)
+        assert [s.id for s in Statuses("1", None, client._session).all(deadline)] == ["1", "1"]
+        connect, read = mock_request.call_args_list[0].kwargs['timeout']
+        assert 0 < connect <= 1.0 and 0 < read <= 1.0
+
+        def fake_request(*args, **kwargs):
+            page = kwargs['url'].rsplit('page=', 1)[1]
+            if page == '3':
+                time.sleep(0.25)
+            return Mock(json=Mock(return_value=self.page_response(page)))
+
+        mock_request.side_effect = fake_request
+        deadline = Deadline(0.2)
+        statuses = list(Statuses("1", None, client._session).pipeline(1, 6, workers=1, deadline=deadline))
+        # 第 3 页返回时已经到期，第 4 页在发出请求前失败
+        assert [s.id for s in statuses] == ["1", "2", "3"]
+        assert deadline.truncated and deadline.stopped_at == 4
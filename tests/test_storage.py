@@ -0,0 +1,264 @@
+"""
+测试 storage 数据导出与存储
+"""
+import pytest
+from unittest.mock import Mock, patch
+from weibo_api_sdk.weibo.article import Article
+from weibo_api_sdk.weibo.people import People
+from weibo_api_sdk.weibo.status import Status
+from weibo_api_sdk.storage.records import (
+    entity_of,
+    people_to_record,
+    status_to_record,
+    article_to_record,
+    to_record,
+    SCHEMAS,
+)
+
+
+def make_people(client, uid=1815418641, followers_count='262.6万'):
+    cache = {
+        "userInfo": {
+            "id": uid,
+            "screen_name": "测试用户%d" % uid,
+            "description": "测试简介",
+            "gender": "m",
+            "avatar_hd": "https://example.com/avatar.jpg",
+            "followers_count": followers_count,
+            "follow_count": 500,
+        }
+    }
+    return People(uid, cache, client._session)
+
+
+def make_status(client, sid="4987000000000001"):
+    status = Status(sid, None, client._session)
+    status.text = "测试微博"
+    status.created_at = "2024-01-01 12:00:00"
+    status.source = None
+    status.thumbnail_pic = None
+    status.bmiddle_pic = None
+    status.original_pic = None
+    status.is_paid = False
+    status.user = People(1815418641, None, client._session)
+    status.pic_urls = ["https://example.com/1.jpg"]
+    return status
+
+
+class TestRecords:
+    """测试实体到记录的转换"""
+
+    def test_entity_of(self, client):
+        """测试实体类型判断"""
+        assert entity_of(make_people(client)) == 'people'
+        assert entity_of(make_status(client)) == 'status'
+        assert entity_of(Article("1", {"config": {}}, client._session)) == 'article'
+        with pytest.raises(TypeError):
+            entity_of(object())
+
+    def test_people_to_record(self, client):
+        """测试用户记录字段与 schema 一致"""
+        record = people_to_record(make_people(client))
+        assert list(record) == [name for name, _ in SCHEMAS['people']]
+        assert record['id'] == 1815418641
+        assert record['name'] == "测试用户1815418641"
+
+    def test_status_to_record_without_network(self, client):
+        """测试微博记录不会触发网络请求"""
+        from unittest.mock import patch
+        with patch('weibo_api_sdk.weibo.base.Base._get_data') as mock_get_data:
+            record = status_to_record(make_status(client))
+            mock_get_data.assert_not_called()
+        assert list(record) == [name for name, _ in SCHEMAS['status']]
+        assert record['user_id'] == 1815418641
+        assert record['pic_urls'] == ["https://example.com/1.jpg"]
+        assert record['created_timestamp'] == 1704081600
+
+    def test_article_to_record(self, client):
+        """测试文章记录"""
+        cache = {"config": {"id": "2309404178688362029907", "title": "标题",
+                            "author_uid": "1815418641", "read_count": 10}}
+        record = article_to_record(Article("2309404178688362029907", cache, client._session))
+        assert record['title'] == "标题"
+        assert record['author_uid'] == 1815418641
+        assert record['attitudes_count'] is None
+
+    def test_to_record_passes_dict_through(self):
+        """测试字典记录原样返回"""
+        record = {"id": 1}
+        assert to_record(record) is record
+
+    @patch('requests.Session.request')
+    def test_people_to_record_fetch_is_accounted(self, mock_request, mock_cookie):
+        """测试导出时请求的数据计入 FetchAccounting"""
+        from weibo_api_sdk.client import WeiboClient
+        from weibo_api_sdk.utils.accounting import FetchAccounting
+
+        mock_request.return_value = Mock(json=Mock(return_value={
+            "ok": 1, "data": {"userInfo": {"id": 1, "screen_name": "测试用户"}}}))
+        client = WeiboClient(cookie=mock_cookie, fetch_accounting=FetchAccounting())
+        assert people_to_record(People(1, None, client._session))['name'] == "测试用户"
+        assert mock_request.call_count == 1
+        snapshot = client.fetch_accounting.snapshot()
+        assert snapshot['total'] == 1
+        assert snapshot['by_attribute'] == [('People.userInfo', 1)]
+
+
+class TestArrowExport:
+    """测试 Arrow / Parquet 导出"""
+
+    def test_iter_record_batches(self, client):
+        """测试按 batch_size 切分 RecordBatch"""
+        pytest.importorskip('pyarrow')
+        from weibo_api_sdk.storage.arrow import iter_record_batches, arrow_schema
+
+        peoples = (make_people(client, uid) for uid in range(1, 26))
+        batches = list(iter_record_batches(peoples, batch_size=10))
+        assert [b.num_rows for b in batches] == [10, 10, 5]
+        assert batches[0].schema == arrow_schema('people')
+        assert batches[2].column(0).to_pylist() == list(range(21, 26))
+
+    def test_iter_record_batches_empty(self):
+        """测试空迭代器"""
+        pytest.importorskip('pyarrow')
+        from weibo_api_sdk.storage.arrow import iter_record_batches
+        assert list(iter_record_batches([])) == []
+
+    def test_dict_records_require_entity(self):
+        """测试记录字典无法推断实体类型，必须指定 entity"""
+        pytest.importorskip('pyarrow')
+        from weibo_api_sdk.storage.arrow import iter_record_batches
+
+        records = [{"id": 1, "name": "测试用户"}, {"id": 2}]
+        with pytest.raises(ValueError, match='entity is required'):
+            list(iter_record_batches(records))
+        batches = list(iter_record_batches(records, entity='people'))
+        assert batches[0].column('name').to_pylist() == ["测试用户", None]
+
+    def test_write_parquet(self, client, tmp_path):
+        """测试流式写入 Parquet"""
+        pytest.importorskip('pyarrow')
+        import pyarrow.parquet as pq
+        from weibo_api_sdk.storage.arrow import write_parquet
+
+        path = tmp_path / "statuses.parquet"
+        statuses = (make_status(client, str(i)) for i in range(7))
+        assert write_parquet(statuses, str(path), batch_size=3) == 7
+
+        table = pq.read_table(str(path))
+        assert table.num_rows == 7
+        assert pq.ParquetFile(str(path)).num_row_groups == 3
+        assert table.column('id').to_pylist() == [str(i) for i in range(7)]
+
+
+class TestJsonlSink:
+    """测试带缓冲的 JSONL 写入器"""
+
+    def test_sink_buffers_until_threshold(self, tmp_path):
+        """测试未达到阈值前不写盘"""
+        import json
+        from weibo_api_sdk.storage.jsonl import JsonlSink
+
+        path = tmp_path / "users.jsonl"
+        sink = JsonlSink(str(path), max_records=3, flush_interval=None, exclude=('depth',))
+        sink.write({"id": 1, "depth": 0})
+        sink.write({"id": 2, "depth": 1})
+        assert path.read_text(encoding='utf-8') == ""
+        sink.write({"id": 3, "depth": 1})
+        lines = path.read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line) for line in lines] == [{"id": 1}, {"id": 2}, {"id": 3}]
+        sink.write({"id": 4})
+        sink.close()
+        assert len(path.read_text(encoding='utf-8').splitlines()) == 4
+        assert sink.records_written == 4
+
+    def test_sink_writes_entities(self, client, tmp_path):
+        """测试直接写入 People 对象"""
+        import json
+        from weibo_api_sdk.storage.jsonl import JsonlSink
+
+        path = tmp_path / "users.jsonl"
+        with JsonlSink(str(path)) as sink:
+            sink.write_many(make_people(client, uid) for uid in (1, 2))
+        records = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        assert [r['id'] for r in records] == [1, 2]
+        assert records[0]['name'] == "测试用户1"
+
+    def test_sink_rotates_and_compresses(self, tmp_path):
+        """测试按大小轮转并压缩"""
+        import gzip
+        from weibo_api_sdk.storage.jsonl import JsonlSink
+
+        path = tmp_path / "users.jsonl"
+        with JsonlSink(str(path), max_records=10, rotate_bytes=100, compress=True) as sink:
+            for i in range(30):
+                sink.write({"id": i, "name": "用户"})
+        rotated = sorted(p.name for p in tmp_path.iterdir() if p.name.endswith('.gz'))
+        assert rotated == ["users.1.jsonl.gz", "users.2.jsonl.gz", "users.3.jsonl.gz"]
+        with gzip.open(str(tmp_path / "users.1.jsonl.gz"), 'rt', encoding='utf-8') as f:
+            assert len(f.read().splitlines()) == 10
+
+
+class TestSQLiteStore:
+    """测试 SQLite 存储后端"""
+
+    def test_upsert_does_not_duplicate(self, client, tmp_path):
+        """测试重复写入同一用户只保留最新数据"""
+        from weibo_api_sdk.storage.sqlite import SQLiteStore
+
+        with SQLiteStore(str(tmp_path / "weibo.db"), batch_size=2) as store:
+            store.write(make_people(client, 1, followers_count='100'))
+            store.write(make_people(client, 2))
+            store.write(make_people(client, 1, followers_count='200'))
+            assert store.count('people') == 2
+            assert store.get('people', 1)['followers_count'] == 200
+            assert store.get('people', 3) is None
+
+            # 不完整的记录不会把已有字段覆盖为 NULL
+            store.write({"id": 1, "name": "新名字"}, entity='people')
+            record = store.get('people', 1)
+            assert record['name'] == "新名字" and record['followers_count'] == 200
+
+    def test_status_roundtrip(self, client, tmp_path):
+        """测试微博记录的读写和按用户查询"""
+        from weibo_api_sdk.storage.sqlite import SQLiteStore
+
+        with SQLiteStore(str(tmp_path / "weibo.db")) as store:
+            store.write_many(make_status(client, sid) for sid in ("2", "1"))
+            record = store.get('status', "1")
+            assert record['pic_urls'] == ["https://example.com/1.jpg"]
+            assert record['is_paid'] is False
+            assert sorted(store.statuses_of(1815418641)) == ["1", "2"]
+
+    def test_wal_mode_and_indexes(self, tmp_path):
+        """测试 WAL 模式和索引"""
+        import sqlite3
+        from weibo_api_sdk.storage.sqlite import SQLiteStore
+
+        path = str(tmp_path / "weibo.db")
+        SQLiteStore(path).close()
+        conn = sqlite3.connect(path)
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        indexes = {row[1] for row in conn.execute("SELECT * FROM sqlite_master WHERE type='index'")}
+        assert {'idx_statuses_user_id', 'idx_statuses_created_timestamp', 'idx_articles_author_uid'} <= indexes
+        assert 'idx_statuses_created_at' not in indexes
+
+        # 旧版本创建的 created_at 索引会被删除
+        conn.execute('CREATE INDEX idx_statuses_created_at ON statuses (created_at)')
+        conn.commit()
+        conn.close()
+        SQLiteStore(path).close()
+        conn = sqlite3.connect(path)
+        indexes = {row[1] for row in conn.execute("SELECT * FROM sqlite_master WHERE type='index'")}
+        assert 'idx_statuses_created_at' not in indexes
+
+    def test_bulk_ingest(self, tmp_path):
+        """测试批量导入记录字典"""
+        from weibo_api_sdk.storage.sqlite import SQLiteStore
+
+        records = ({"id": i, "name": "用户%d" % i} for i in range(2500))
+        with SQLiteStore(str(tmp_path / "weibo.db")) as store:
+            assert store.bulk_ingest(records, entity='people', batch_size=1000) == 2500
+            assert store.bulk_ingest([{"id": 1, "name": "新名字"}], entity='people') == 1
+            assert store.count('people') == 2500
+            assert store.get('people', 1)['name'] == "新名字"
@@ -235,3 +235,199 @@ class TestStreamingJSON:
         assert sj.from_ == "sender"
         assert sj.import_ == "module"
 
+
+
+class TestPagePipeline:
+    """测试 PagePipeline 分页流水线"""
+
+    def test_pipeline_keeps_page_order(self):
+        """测试多线程抓取时仍按页码顺序产出"""
+        import random
+        import time
+        from weibo_api_sdk.utils.pipeline import PagePipeline
+
+        def fetch(page_num):
+            time.sleep(random.uniform(0, 0.01))
+            return [page_num * 10, page_num * 10 + 1]
+
+        pages = list(PagePipeline(fetch, range(1, 9), workers=4, max_buffered=4))
+        assert [p for p, _ in pages] == list(range(1, 9))
+        assert pages[0][1] == [10, 11]
+
+    def test_pipeline_backpressure(self):
+        """测试缓冲区满时抓取线程暂停"""
+        import threading
+        import time
+        from weibo_api_sdk.utils.pipeline import PagePipeline
+
+        fetched = []
+        lock = threading.Lock()
+
+        def fetch(page_num):
+            with lock:
+                fetched.append(page_num)
+            return [page_num]
+
+        pipeline = PagePipeline(fetch, range(1, 101), workers=2, max_buffered=3)
+        it = iter(pipeline)
+        assert next(it) == (1, [1])
+        time.sleep(0.1)
+        # 已消费 1 页，最多再缓冲 3 页
+        assert len(fetched) <= 4
+        it.close()
+        assert len(fetched) <= 5
+
+    def test_pipeline_propagates_error(self):
+        """测试抓取异常在对应页抛出"""
+        from weibo_api_sdk.utils.pipeline import PagePipeline
+
+        def fetch(page_num):
+            if page_num == 3:
+                raise RuntimeError('boom')
+            return [page_num]
+
+        it = iter(PagePipeline(fetch, range(1, 6), workers=2))
+        assert next(it) == (1, [1])
+        assert next(it) == (2, [2])
+        with pytest.raises(RuntimeError):
+            next(it)
+
+    def test_pipeline_invalid_workers(self):
+        """测试 workers 参数校验"""
+        from weibo_api_sdk.utils.pipeline import PagePipeline
+        with pytest.raises(ValueError):
+            PagePipeline(lambda n: [], range(1, 3), workers=0)
+
+
+class TestTimeParse:
+    """测试 created_at 时间解析"""
+
+    # 2025-03-20 10:00:00 北京时间
+    NOW = 1742436000
+
+    def test_relative_formats(self):
+        """测试相对时间"""
+        from weibo_api_sdk.utils.timeparse import parse_created_at
+        assert parse_created_at("刚刚", self.NOW) == self.NOW
+        assert parse_created_at("30秒前", self.NOW) == self.NOW - 30
+        assert parse_created_at("5分钟前", self.NOW) == self.NOW - 300
+        assert parse_created_at("3小时前", self.NOW) == self.NOW - 3 * 3600
+        assert parse_created_at("今天 08:30", self.NOW) == self.NOW - 5400
+        assert parse_created_at("昨天 12:30", self.NOW) == self.NOW - 86400 + 9000
+
+    def test_absolute_formats(self):
+        """测试日期格式"""
+        from weibo_api_sdk.utils.timeparse import parse_created_at
+        assert parse_created_at("03-15", self.NOW) == self.NOW - 5 * 86400 - 36000
+        assert parse_created_at("2025-03-20 10:00:00", self.NOW) == self.NOW
+        assert parse_created_at("2025-03-20") == self.NOW - 36000
+        assert parse_created_at("Thu Mar 20 10:00:00 +0800 2025") == self.NOW
+        # 年初看到的 12-31 属于去年
+        assert parse_created_at("12-31", 1735747200) == 1735574400
+        assert parse_created_at("不是时间") is None
+        assert parse_created_at(None) is None
+
+    def test_out_of_range(self):
+        """测试日期或时刻超出范围时返回 None"""
+        from weibo_api_sdk.utils.timeparse import parse_created_at
+        for value in ("13-45", "2025-13-01", "00-10", "02-30", "2025-02-29",
+                      "03-15 25:00", "今天 24:10", "Thu Mar 32 10:00:00 +0800 2025"):
+            assert parse_created_at(value, self.NOW) is None, value
+        assert parse_created_at("2024-02-29") is not None
+
+    def test_batch(self):
+        """测试批量转换"""
+        from weibo_api_sdk.utils.timeparse import parse_created_at_many
+        result = parse_created_at_many(["刚刚", "1分钟前", None, "2025-03-20 10:00"], now=self.NOW)
+        assert result == [self.NOW, self.NOW - 60, None, self.NOW]
+
+
+class TestParseCount:
+    """测试计数解析"""
+
+    def test_parse_count(self):
+        """测试 "262.6万" 这类缩写"""
+        from weibo_api_sdk.utils.numbers import parse_count
+        assert parse_count("262.6万") == 2626000
+        assert parse_count("1.2亿") == 120000000
+        assert parse_count("3千") == 3000
+        assert parse_count("1,234") == 1234
+        assert parse_count("100万+") == 1000000
+        assert parse_count(" 42 ") == 42
+        assert parse_count(1000) == 1000
+        assert parse_count(None) is None
+        assert parse_count("未知", default=0) == 0
+        # 只有逗号、NaN 和无穷大无法解析，返回默认值而不是抛出异常
+        assert parse_count(",", default=0) == 0
+        assert parse_count(",,万") is None
+        assert parse_count(float('nan'), default=0) == 0
+        assert parse_count(float('inf')) is None
+        assert parse_count(12.7) == 12
+
+    def test_parse_counts(self):
+        """测试批量转换为 int64 数组"""
+        np = pytest.importorskip("numpy")
+        from weibo_api_sdk.utils.numbers import parse_counts
+        result = parse_counts(["262.6万", None, 5, "abc", "1.2亿"])
+        assert result.dtype == np.int64
+        assert result.tolist() == [2626000, 0, 5, 0, 120000000]
+
+
+class TestEntities:
+    """测试微博正文实体提取"""
+
+    HTML = ('转发<br />回复<a href=\'/n/张三\'>@张三</a>:哈哈'
+            '<span class="url-icon"><img alt=[笑cry] src="https://h5.sinaimg.cn/x.png" /></span>'
+            '<a  href="https://m.weibo.cn/search?containerid=231522" data-hide="">'
+            '<span class="surl-text">#话题#</span></a> '
+            '<a data-url="http://t.cn/A6abc" href="https://weibo.com/ttarticle/p/show?id=2309404178688362029907">'
+            '<span class="url-icon"><img src="https://h5.sinaimg.cn/a.png"></span>'
+            '<span class="surl-text">我的文章</span></a> &amp; <a href="https://m.weibo.cn/u/123">@李四</a>')
+
+    def test_extract_entities(self):
+        """测试一次提取全部实体"""
+        from weibo_api_sdk.utils.entities import extract_entities
+        result = extract_entities(self.HTML)
+        assert result['text'] == '转发\n回复@张三:哈哈[笑cry]#话题# 我的文章 & @李四'
+        assert result['mentions'] == [('张三', None), ('李四', 123)]
+        assert result['hashtags'] == ['话题']
+        assert result['urls'] == ['http://t.cn/A6abc']
+        assert result['article_ids'] == ['2309404178688362029907']
+
+    def test_super_topic_with_icon(self):
+        """测试文字前有图标的超话和话题链接算作话题，而不是链接"""
+        from weibo_api_sdk.utils.entities import extract_entities
+        html = ('<a href="https://m.weibo.cn/p/index?extparam=%E8%B6%85%E8%AF%9D&containerid=100808abc" '
+                'data-hide=""><span class=\'url-icon\'><img style=\'width: 1rem;height: 1rem\' '
+                'src=\'https://n.sinaimg.cn/photo/timeline_card_small_super_default.png\'></span>'
+                '<span class="surl-text">超话名</span></a> '
+                '<a href="https://m.weibo.cn/search?containerid=231522" data-hide="">'
+                '<span class=\'url-icon\'><img src=\'https://h5.sinaimg.cn/icon.png\'></span>'
+                '<span class="surl-text">#带图标的话题#</span></a>')
+        result = extract_entities(html)
+        assert result['hashtags'] == ['超话名', '带图标的话题']
+        assert result['urls'] == []
+        assert result['text'] == '超话名 #带图标的话题#'
+
+    def test_extract_entities_many(self, client):
+        """测试批量处理一页微博"""
+        from weibo_api_sdk.utils.entities import extract_entities_many
+        from weibo_api_sdk.weibo.status import Status
+        status = Status("1", None, client._session)
+        status.text = "纯文本"
+        results = extract_entities_many([self.HTML, status, None])
+        assert results[0]['hashtags'] == ['话题']
+        assert results[1] == status.entities
+        assert results[1]['text'] == "纯文本" and results[1]['mentions'] == []
+        assert results[2]['text'] == ''
+
+    def test_article_id_from_url(self):
+        """测试从链接中取出头条文章 ID"""
+        from weibo_api_sdk.utils.entities import article_id_from_url
+        assert article_id_from_url('http://media.weibo.cn/article?id=2309404178688362029907') \
+            == '2309404178688362029907'
+        assert article_id_from_url('https://card.weibo.com/article/m/show/id/2309404178688362029907') \
+            == '2309404178688362029907'
+        assert article_id_from_url('https://m.weibo.cn/p/index?containerid=2309404178688362029907') \
+            == '2309404178688362029907'
+        assert article_id_from_url('http://t.cn/A6abc') is None
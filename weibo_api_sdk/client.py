@@ -1,15 +1,26 @@
+import copy
+
 import requests
 
 __all__ = ['WeiboClient']
 
 
 class WeiboClient:
-    def __init__(self, cookie=None):
+    def __init__(self, cookie=None, media_policy=None, metrics=None, fetch_accounting=None, hedge_policy=None,
+                 timeout=(5, 30), max_response_bytes=32 << 20, concurrency_limiter=None, dispatcher=None):
         """
         初始化微博客户端
         
         :param cookie: 可选的Cookie字符串，用于绕过反爬虫检测
                       可以从浏览器中获取，格式如: "SUB=xxx; SUBP=xxx"
+        :param media_policy: 可选的 MediaPolicy，下载图片时按它选择尺寸
+        :param metrics: 可选的 RequestMetrics，记录每个请求的耗时、大小和状态码
+        :param fetch_accounting: 可选的 FetchAccounting，记录属性读取触发的请求
+        :param hedge_policy: 可选的 HedgePolicy，详情接口响应过慢时发出对冲请求
+        :param timeout: API 请求的超时时间（秒），可以是 ``(连接超时, 读取超时)``，None 表示不限
+        :param max_response_bytes: API 响应的最大字节数，超过时停止读取并抛出 ResponseTooLargeException
+        :param concurrency_limiter: 可选的 AdaptiveConcurrencyLimiter，按接口类型自适应限制并发请求数
+        :param dispatcher: 可选的 RequestDispatcher，按优先级分配并发请求名额，见 :any:`with_priority`
         """
         self._session = requests.session()
         # 设置必要的请求头，绕过基本的反爬虫检测
@@ -24,6 +35,145 @@ class WeiboClient:
         # 如果提供了cookie，则设置
         if cookie:
             self._session.headers['Cookie'] = cookie
+        self.timeout = timeout
+        self._session.max_response_bytes = max_response_bytes
+        self.media_policy = media_policy
+        self.metrics = metrics
+        self.fetch_accounting = fetch_accounting
+        self.hedge_policy = hedge_policy
+        self.concurrency_limiter = concurrency_limiter
+        self.dispatcher = dispatcher
+
+    @property
+    def timeout(self):
+        """
+        API 请求的超时时间
+        """
+        return getattr(self._session, 'request_timeout', None)
+
+    @timeout.setter
+    def timeout(self, timeout):
+        self._session.request_timeout = timeout
+
+    @property
+    def media_policy(self):
+        """
+        图片尺寸选择策略，见 :any:`MediaPolicy`
+        """
+        return getattr(self._session, 'media_policy', None)
+
+    @media_policy.setter
+    def media_policy(self, policy):
+        # 挂在 session 上，由同一 session 创建的 Pic 和下载器都能读到
+        self._session.media_policy = policy
+
+    @property
+    def metrics(self):
+        """
+        请求统计，见 :any:`RequestMetrics`，未启用时为 None
+        """
+        return getattr(self._session, 'metrics', None)
+
+    @metrics.setter
+    def metrics(self, metrics):
+        self._session.metrics = metrics
+
+    @property
+    def fetch_accounting(self):
+        """
+        属性读取触发的请求统计，见 :any:`FetchAccounting`，未启用时为 None
+        """
+        return getattr(self._session, 'fetch_accounting', None)
+
+    @fetch_accounting.setter
+    def fetch_accounting(self, accounting):
+        self._session.fetch_accounting = accounting
+
+    @property
+    def hedge_policy(self):
+        """
+        对冲请求策略，见 :any:`HedgePolicy`，未启用时为 None
+        """
+        return getattr(self._session, 'hedge_policy', None)
+
+    @hedge_policy.setter
+    def hedge_policy(self, policy):
+        self._session.hedge_policy = policy
+
+    @property
+    def concurrency_limiter(self):
+        """
+        自适应并发限制，见 :any:`AdaptiveConcurrencyLimiter`，未启用时为 None
+        """
+        return getattr(self._session, 'concurrency_limiter', None)
+
+    @concurrency_limiter.setter
+    def concurrency_limiter(self, limiter):
+        self._session.concurrency_limiter = limiter
+
+    @property
+    def dispatcher(self):
+        """
+        按优先级分配并发请求名额，见 :any:`RequestDispatcher`，未启用时为 None
+        """
+        return getattr(self._session, 'dispatcher', None)
+
+    @dispatcher.setter
+    def dispatcher(self, dispatcher):
+        self._session.dispatcher = dispatcher
+
+    @property
+    def priority(self):
+        """
+        本 client 发出的请求的优先级
+        """
+        return getattr(self._session, 'request_priority', 'normal')
+
+    def with_priority(self, priority):
+        """
+        得到一个以指定优先级发出请求的 client，与本 client 共享连接池、Cookie 和各项设置。
+        由它创建的对象（以及这些对象翻页得到的对象）发出的请求都带有该优先级。
+
+        :param str priority: ``interactive``、``normal`` 或 ``bulk``
+        :return: :any:`WeiboClient`
+        """
+        from .utils.dispatch import PrioritySession
+        client = copy.copy(self)
+        client._session = PrioritySession(self._session, priority)
+        return client
+
+    @property
+    def hooks(self):
+        """
+        请求生命周期钩子，见 :any:`RequestHooks`
+        """
+        from .utils.hooks import RequestHooks
+        hooks = getattr(self._session, 'request_hooks', None)
+        if hooks is None:
+            hooks = self._session.request_hooks = RequestHooks()
+        return hooks
+
+    def add_hook(self, event, hook):
+        """
+        注册请求钩子，每次 API 请求时以 :any:`RequestEvent` 为参数调用
+
+        - ``before_request``：发出请求前，抛出异常可以取消请求
+        - ``after_response``：收到响应后，此时已有 ``latency``、``status_code``、``size``；
+          抛出异常可以拒绝这个响应，响应被关闭并触发 ``on_error``
+        - ``on_decode``：JSON 解析成功后，此时已有 ``decode_time``
+        - ``on_error``：请求异常或解析失败，``error`` 为异常对象
+
+        :param str event: 事件名
+        :param hook: 钩子函数
+        :return: hook
+        """
+        return self.hooks.add(event, hook)
+
+    def remove_hook(self, event, hook):
+        """
+        删除已注册的请求钩子
+        """
+        self.hooks.remove(event, hook)
 
     def people(self, uid):
         """
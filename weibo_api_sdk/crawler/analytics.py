@@ -0,0 +1,175 @@
+from .graph import _import_numpy
+
+__all__ = [
+    'adjacency',
+    'in_degree',
+    'out_degree',
+    'pagerank',
+    'k_core',
+    'mutual_follows',
+    'mutual_follows_of',
+    'top_users',
+]
+
+
+def _import_scipy_sparse():
+    try:
+        import scipy.sparse
+    except ImportError:
+        raise ImportError('scipy is required for graph analytics, '
+                          'install it with: pip install "weibo-api-sdk[graph]"')
+    return scipy.sparse
+
+
+def adjacency(graph, transpose=False):
+    """
+    关注关系图的稀疏邻接矩阵，直接复用 CSR 数组，不复制边数据。
+
+    :param CSRGraph graph: 关注关系图
+    :param bool transpose: 为 False 时 ``A[i, j] = 1`` 表示 i 关注了 j；
+      为 True 时表示 j 关注了 i（即按粉丝组织的行）
+    :rtype: scipy.sparse.csr_matrix
+    """
+    np = _import_numpy()
+    sparse = _import_scipy_sparse()
+    n = graph.num_nodes
+    if transpose:
+        offsets, neighbors = graph.in_offsets, graph.in_neighbors
+    else:
+        offsets, neighbors = graph.out_offsets, graph.out_neighbors
+    data = np.ones(len(neighbors), dtype=np.float64)
+    return sparse.csr_matrix((data, neighbors, offsets), shape=(n, n))
+
+
+def in_degree(graph):
+    """
+    每个节点的粉丝数（图内），与 ``graph.nodes`` 对齐
+    """
+    np = _import_numpy()
+    return np.diff(graph.in_offsets)
+
+
+def out_degree(graph):
+    """
+    每个节点关注的人数（图内），与 ``graph.nodes`` 对齐
+    """
+    np = _import_numpy()
+    return np.diff(graph.out_offsets)
+
+
+def pagerank(graph, damping=0.85, tol=1e-8, max_iter=100):
+    """
+    用幂迭代计算 PageRank，每轮迭代是一次稀疏矩阵向量乘法。
+    被关注即视为获得一票，没有关注任何人的节点把分数平均分给所有节点。
+
+    :param CSRGraph graph: 关注关系图
+    :param float damping: 阻尼系数
+    :param float tol: 两轮结果的 L1 距离小于该值时停止
+    :param int max_iter: 最大迭代次数
+    :return: 与 ``graph.nodes`` 对齐的分数数组，总和为 1
+    """
+    np = _import_numpy()
+    n = graph.num_nodes
+    if n == 0:
+        return np.zeros(0)
+    followers = adjacency(graph, transpose=True)
+    out_deg = out_degree(graph).astype(np.float64)
+    dangling = out_deg == 0
+    inv_out = np.divide(1.0, out_deg, out=np.zeros(n), where=~dangling)
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new_rank = damping * (followers @ (rank * inv_out))
+        new_rank += (damping * rank[dangling].sum() + 1.0 - damping) / n
+        err = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if err < tol:
+            break
+    return rank
+
+
+def k_core(graph):
+    """
+    计算每个节点的核数（core number），把关注关系视为无向边。
+    节点的核数为 k 表示它属于 k-core（每个节点至少有 k 个邻居的最大子图），
+    但不属于 (k+1)-core。
+
+    采用批量剥离：在当前层级 k 反复删除所有度数不超过 k 的节点，
+    删除后用一次稀疏矩阵向量乘法更新邻居的度数。
+
+    :param CSRGraph graph: 关注关系图
+    :return: 与 ``graph.nodes`` 对齐的核数数组
+    """
+    np = _import_numpy()
+    n = graph.num_nodes
+    a = adjacency(graph)
+    undirected = ((a + a.T) > 0).astype(np.int64)
+    undirected.setdiag(0)
+    undirected.eliminate_zeros()
+
+    degree = np.asarray(undirected.sum(axis=1)).ravel()
+    core = np.zeros(n, dtype=np.int64)
+    alive = np.ones(n, dtype=bool)
+    while alive.any():
+        k = degree[alive].min()
+        while True:
+            remove = alive & (degree <= k)
+            if not remove.any():
+                break
+            core[remove] = k
+            alive[remove] = False
+            degree -= undirected @ remove.astype(np.int64)
+    return core
+
+
+def mutual_follows(graph):
+    """
+    找出全部互相关注的用户对。
+
+    每条边编码为 ``src * n + dst``，CSR 中的边本身即按该键有序；
+    反向边 ``dst * n + src`` 排序后与之做有序数组求交，即得互关的边。
+
+    :param CSRGraph graph: 关注关系图
+    :return: 形状为 ``(m, 2)`` 的用户 ID 数组，每对只出现一次且第一列较小
+    """
+    np = _import_numpy()
+    n = graph.num_nodes
+    src = np.repeat(np.arange(n, dtype=np.int64), out_degree(graph))
+    dst = np.asarray(graph.out_neighbors, dtype=np.int64)
+    forward = src * n + dst
+    backward = np.sort(dst * n + src)
+    both = np.intersect1d(forward, backward, assume_unique=True)
+    a, b = both // n, both % n
+    keep = a < b
+    nodes = np.asarray(graph.nodes)
+    return np.stack((nodes[a[keep]], nodes[b[keep]]), axis=1)
+
+
+def mutual_follows_of(graph, uid):
+    """
+    与某个用户互相关注的用户 ID，对两个有序邻居数组求交
+
+    :param CSRGraph graph: 关注关系图
+    :param uid: 用户 ID
+    """
+    np = _import_numpy()
+    return np.intersect1d(graph.follows(uid), graph.followers(uid), assume_unique=True)
+
+
+def top_users(graph, scores, n=10):
+    """
+    按分数取排名前 n 的用户
+
+    :param CSRGraph graph: 关注关系图
+    :param scores: 与 ``graph.nodes`` 对齐的分数，如 :any:`pagerank` 或 :any:`in_degree` 的结果
+    :param int n: 取前几名
+    :return: ``[(uid, score), ...]``，按分数从高到低排列
+    """
+    np = _import_numpy()
+    scores = np.asarray(scores)
+    n = min(n, len(scores))
+    if n == 0:
+        return []
+    top = np.argpartition(-scores, n - 1)[:n]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [(int(graph.nodes[i]), scores[i].item()) for i in top]
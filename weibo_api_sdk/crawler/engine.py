@@ -0,0 +1,523 @@
+import asyncio
+import math
+import os
+import pickle
+import threading
+import time
+
+from ..utils.numbers import parse_count
+from ..utils.timeparse import parse_created_at
+from .frontier import PriorityFrontier, SortedIdSet
+from .ratelimit import EndpointRateLimiter
+
+__all__ = ['RequestBudget', 'CrawlStats', 'influence_score', 'FollowCrawler']
+
+
+class RequestBudget:
+    def __init__(self, max_requests):
+        """
+        全局请求预算，线程安全。
+
+        :param int max_requests: 允许发出的最大请求数，为 None 时不限制
+        """
+        self.max_requests = max_requests
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self, n=1):
+        """
+        尝试消耗 n 次请求
+
+        :return: 预算足够时返回 True 并计入消耗，否则返回 False
+        """
+        with self._lock:
+            if self.max_requests is not None and self.used + n > self.max_requests:
+                return False
+            self.used += n
+            return True
+
+    def refund(self, n=1):
+        """
+        退还没有实际发出的请求
+        """
+        with self._lock:
+            self.used = max(0, self.used - n)
+
+    @property
+    def remaining(self):
+        if self.max_requests is None:
+            return math.inf
+        return max(0, self.max_requests - self.used)
+
+
+class CrawlStats:
+    def __init__(self):
+        """
+        爬取进度统计，线程安全
+        """
+        self.requests = 0
+        self.users = 0
+        self.edges = 0
+        self.errors = 0
+        self.retries = 0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def incr(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self, **extra):
+        """
+        :return: 当前统计的字典，包括运行时长和每秒请求数
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self.started_at
+            data = {
+                'requests': self.requests,
+                'users': self.users,
+                'edges': self.edges,
+                'errors': self.errors,
+                'retries': self.retries,
+                'elapsed': elapsed,
+                'requests_per_sec': self.requests / elapsed if elapsed > 0 else 0.0,
+            }
+        data.update(extra)
+        return data
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        # monotonic 时钟跨进程无意义，保存已运行的时长
+        state['started_at'] = time.monotonic() - self.started_at
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.started_at = time.monotonic() - state['started_at']
+        self._lock = threading.Lock()
+
+
+def influence_score(followers_count, depth, last_active=None, now=None, half_life_days=30.0):
+    """
+    用户的默认优先级分数：粉丝数取对数，按层级衰减，可选地按最近活跃时间衰减。
+
+    :param followers_count: 粉丝数，整数或 "262.6万" 这类字符串
+    :param int depth: 用户所在层级
+    :param float last_active: 最近活跃时间（Unix 时间戳），未知时为 None
+    :param float now: 当前时间，默认为 ``time.time()``
+    :param float half_life_days: 活跃时间衰减的半衰期（天）
+    """
+    score = math.log1p(parse_count(followers_count, 0)) / (1 + depth)
+    if last_active is not None:
+        age_days = max(0.0, ((now or time.time()) - last_active) / 86400)
+        score *= 0.5 ** (age_days / half_life_days)
+    return score
+
+
+class FollowCrawler:
+    def __init__(self, client, budget=None, max_depth=3, max_pages=10, min_followers=0,
+                 page_decay=0.5, score=None, sinks=(), graph=None, frontier=None,
+                 seen=None, workers=1, rate_limits=None, max_retries=2, checkpoint_path=None,
+                 checkpoint_interval=60.0, on_progress=None, progress_interval=10.0, fetch_last_active=False):
+        """
+        在全局请求预算内按优先级爬取关注网络。
+
+        与逐层广度优先、每层固定页数的做法不同，这里的每次请求（某个用户
+        关注列表的某一页）都有一个分数，始终先发出分数最高的请求：
+
+        - 发现的用户以 ``score(people, depth)`` 入队，默认为 :any:`influence_score`。
+          同一用户在展开前每次被发现都会重新计算分数，队列中保留最高的一次（层级也随之更新），
+          展开（取出第一页）后才不再入队；写入 sinks 只在第一次发现时进行
+        - 默认分数只有在知道用户最新一条微博的时间时才按活跃时间衰减：关注列表中的用户信息附带了
+          ``status.created_at``，或者设置了 ``fetch_last_active=True``；否则只按粉丝数和层级排序
+        - 爬完某个用户的第 p 页后，第 p+1 页以 ``分数 * page_decay`` 重新入队
+        - 展开起始用户时请求其资料并写入 sinks（计入请求预算和 ``people`` 接口的限速，
+          没有 sinks 或预算已耗尽时跳过）
+
+        多个工作线程（或 asyncio 任务）共享同一个爬取边界和去重集合，
+        请求按接口类型限速。调用 :any:`stop` 后工作线程处理完手上的请求即退出；
+        设置了 ``checkpoint_path`` 时会定期并在结束时保存进度，下次运行自动从断点继续。
+
+        :param client: :any:`WeiboClient`
+        :param RequestBudget budget: 请求预算，为 None 时不限制
+        :param int max_depth: 最大层级，起始用户为第 0 层，第 max_depth 层的用户只保存不展开
+        :param int max_pages: 每个用户最多爬取的关注列表页数（接口限制为 10 页）
+        :param int min_followers: 粉丝数低于该值的用户不再展开
+        :param float page_decay: 同一用户后续页面的分数衰减系数
+        :param score: 计算用户分数的函数 ``score(people, depth)``
+        :param sinks: 保存用户数据的写入器列表，需提供线程安全的 ``write(obj)`` 方法，
+          如 :any:`JsonlSink` 或 :any:`SQLiteStore`
+        :param graph: 记录关注关系的 :any:`FollowGraphWriter`
+        :param frontier: 爬取边界，默认为 :any:`PriorityFrontier`
+        :param seen: 已发现用户的去重集合，需提供 ``add`` 方法，默认为 :any:`SortedIdSet`
+        :param int workers: 并发的工作线程（或 asyncio 任务）数；client 设置了
+          :any:`AdaptiveConcurrencyLimiter` 时实际并发数由它调整，workers 为上限
+        :param dict rate_limits: 接口类型到每秒请求数的映射，如 ``{'follows': 1.0}``
+        :param int max_retries: 请求失败后的最大重试次数
+        :param str checkpoint_path: 断点文件路径，不能与 :any:`SQLiteFrontier` 一起使用
+        :param float checkpoint_interval: 自动保存断点的间隔（秒）
+        :param on_progress: 进度回调，参数为 :any:`CrawlStats.snapshot` 的结果
+        :param float progress_interval: 进度回调的间隔（秒）
+        :param bool fetch_last_active: 默认分数需要用户最新一条微博的时间；关注列表中没有附带时，
+          为 True 则请求该用户的第一页微博（每个用户一次，计入请求预算和 ``statuses`` 接口的限速，
+          预算不足时不请求），为 False 则不按活跃时间衰减
+        """
+        from .sharded import SQLiteFrontier
+        if checkpoint_path and isinstance(frontier, SQLiteFrontier):
+            raise ValueError('checkpoint_path cannot be used with SQLiteFrontier, the database is the checkpoint')
+        self._client = client
+        self.budget = budget or RequestBudget(None)
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.min_followers = min_followers
+        self.page_decay = page_decay
+        self._score = score or self._default_score
+        self.sinks = list(sinks)
+        self.graph = graph
+        self.frontier = frontier if frontier is not None else PriorityFrontier()
+        self.workers = workers
+        self.rate_limiter = EndpointRateLimiter(rate_limits)
+        self.max_retries = max_retries
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.fetch_last_active = fetch_last_active
+        self.stats = CrawlStats()
+        self._seen = seen if seen is not None else SortedIdSet()
+        self._failures = {}
+        # fetch_last_active 请求到的用户最新微博时间，用户再次被发现时不重复请求
+        self._last_active_cache = {}
+        # 已取出但尚未处理完的请求，保存断点时一并保存，恢复后重新入队
+        self._running = {}
+        self._cond = threading.Condition()
+        # 各自保护一个共享对象；需要同时持有时先取 _cond 再取 _seen_lock
+        self._seen_lock = threading.Lock()
+        self._graph_lock = threading.Lock()
+        self._report_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._in_flight = 0
+        self._last_checkpoint = self._last_progress = time.monotonic()
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self.load_state(checkpoint_path)
+
+    def _default_score(self, people, depth):
+        return influence_score(people.followers_count, depth, last_active=self._last_active(people))
+
+    def _last_active(self, people):
+        """用户最新一条微博的时间戳，未知时为 None"""
+        status = ((people._cache or {}).get('userInfo') or {}).get('status') or {}
+        if status.get('created_at'):
+            return parse_created_at(status['created_at'])
+        if not self.fetch_last_active:
+            return None
+        uid = int(people._id)
+        if uid in self._last_active_cache:
+            return self._last_active_cache[uid]
+        if not self.budget.try_spend():
+            return None
+        self.rate_limiter.acquire('statuses')
+        self.stats.incr('requests')
+        try:
+            statuses = list(people.statuses.page(1))
+        except Exception:
+            self.stats.incr('errors')
+            return None
+        # 第一页可能有置顶微博，取最新的一条
+        last_active = max((s.created_timestamp for s in statuses if s.created_timestamp is not None),
+                          default=None)
+        self._last_active_cache[uid] = last_active
+        return last_active
+
+    def add_seed(self, uid):
+        """
+        加入起始用户，起始用户总是最先爬取
+        """
+        with self._cond:
+            with self._seen_lock:
+                new = self._seen.add(uid)
+            if new:
+                self.frontier.push(uid, 0, math.inf)
+                self._cond.notify_all()
+
+    def _fetch(self, uid, page):
+        """获取 uid 关注列表的一页"""
+        self.rate_limiter.acquire('follows')
+        return list(self._client.follow(uid).page(page))
+
+    def _fetch_profile(self, uid):
+        """获取 uid 的资料"""
+        self.rate_limiter.acquire('people')
+        people = self._client.people(uid)
+        people._get_data()
+        return people
+
+    def _write_seed(self, uid):
+        """展开起始用户时把它的资料写入 sinks"""
+        if not self.sinks or not self.budget.try_spend():
+            return
+        self.stats.incr('requests')
+        try:
+            people = self._fetch_profile(uid)
+        except Exception:
+            self.stats.incr('errors')
+            return
+        for sink in self.sinks:
+            sink.write(people)
+        self.stats.incr('users')
+
+    def _next_task(self):
+        """在锁内调用：取出下一个请求并计入预算"""
+        if self._stop.is_set() or not len(self.frontier):
+            return None
+        if not self.budget.try_spend():
+            return None
+        task = self.frontier.pop()
+        if task is None:
+            self.budget.refund()
+            return None
+        self._in_flight += 1
+        uid, depth, page, score = task
+        self._running[(uid, page)] = task
+        return task
+
+    def _finished(self):
+        """在锁内调用：没有在途请求且无法再取出新请求时爬取结束"""
+        if self._stop.is_set():
+            return True
+        return self._in_flight == 0 and (not len(self.frontier) or self.budget.remaining == 0)
+
+    def _process(self, task):
+        uid, depth, page, score = task
+        self.stats.incr('requests')
+        try:
+            follows = self._fetch(uid, page)
+        except Exception:
+            follows = None
+            self.stats.incr('errors')
+        pushes = None
+        try:
+            # 写入 sinks、记录关注关系和计算分数都在全局锁之外进行，避免各线程在这里排队
+            if follows is not None:
+                pushes = self._handle(uid, depth, page, score, follows)
+        finally:
+            with self._cond:
+                try:
+                    if follows is None:
+                        self._retry(uid, depth, page, score)
+                    elif pushes is not None:
+                        self._failures.pop((uid, page), None)
+                        for args in pushes:
+                            self.frontier.push(*args)
+                    self.frontier.task_done(uid, page)
+                finally:
+                    del self._running[(uid, page)]
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+        self._maybe_report()
+
+    def _retry(self, uid, depth, page, score):
+        key = (uid, page)
+        failures = self._failures.get(key, 0) + 1
+        if failures > self.max_retries:
+            self._failures.pop(key, None)
+            return
+        self._failures[key] = failures
+        self.stats.incr('retries')
+        metrics = self._client.metrics
+        if metrics is not None:
+            metrics.record_retry('follows')
+        self.frontier.requeue(uid, depth, score * self.page_decay, page)
+
+    def _handle(self, uid, depth, page, score, follows):
+        """处理一页关注列表，不持有全局锁
+
+        :return: 需要加入爬取边界的请求，``frontier.push`` 的参数列表
+        """
+        if self.graph is not None:
+            with self._graph_lock:
+                for people in follows:
+                    self.graph.add_edge(uid, people._id)
+        self.stats.incr('edges', len(follows))
+        if depth == 0 and page == 1:
+            self._write_seed(uid)
+        pushes = []
+        for people in follows:
+            # 同一用户可能出现在多个人的关注列表中，只在第一次发现时写入；
+            # 每次都重新入队，由爬取边界保留分数最高的路径，用户展开后不再入队
+            with self._seen_lock:
+                new = self._seen.add(people._id)
+            if new:
+                for sink in self.sinks:
+                    sink.write(people)
+                self.stats.incr('users')
+            if depth + 1 >= self.max_depth:
+                continue
+            if (people.followers_count or 0) < self.min_followers:
+                continue
+            pushes.append((people._id, depth + 1, self._score(people, depth + 1)))
+        if follows and page < self.max_pages:
+            pushes.append((uid, depth, score * self.page_decay, page + 1))
+        return pushes
+
+    def _maybe_report(self):
+        now = time.monotonic()
+        # 多个工作线程同时到期时只有一个线程回调和保存断点
+        with self._report_lock:
+            report = self.on_progress is not None and now - self._last_progress >= self.progress_interval
+            if report:
+                self._last_progress = now
+            checkpoint = self.checkpoint_path and now - self._last_checkpoint >= self.checkpoint_interval
+            if checkpoint:
+                self._last_checkpoint = now
+        if report:
+            self.on_progress(self.progress())
+        if checkpoint:
+            self.save_state(self.checkpoint_path)
+
+    def progress(self):
+        """
+        :return: 当前进度，包括统计数据、队列长度、在途请求数和剩余预算
+        """
+        return self.stats.snapshot(
+            queued=len(self.frontier),
+            in_flight=self._in_flight,
+            budget_remaining=self.budget.remaining,
+        )
+
+    def step(self):
+        """
+        在当前线程发出一次请求：取出分数最高的页面并处理结果
+
+        :return: 是否发出了请求（队列为空、预算耗尽或已停止时为 False）
+        """
+        with self._cond:
+            task = self._next_task()
+        if task is None:
+            return False
+        self._process(task)
+        return True
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    if self._finished():
+                        self._cond.notify_all()
+                        return
+                    # 其他线程的在途请求可能产生新的任务
+                    self._cond.wait(0.5)
+                    task = self._next_task()
+            self._process(task)
+
+    def run(self, seeds=()):
+        """
+        从 seeds 开始用 ``workers`` 个线程爬取，直到队列为空、预算耗尽或调用了
+        :any:`stop`。在主线程中按 Ctrl+C 会等待在途请求结束后正常退出。
+
+        :return: 最终的进度统计
+        """
+        for uid in seeds:
+            self.add_seed(uid)
+        threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(0.5)
+        except KeyboardInterrupt:
+            self.stop()
+            for t in threads:
+                t.join()
+        finally:
+            self._close()
+        return self.progress()
+
+    async def run_async(self, seeds=()):
+        """
+        :any:`run` 的 asyncio 版本：``workers`` 个任务共享爬取边界，
+        阻塞的网络请求在线程池中执行，不会阻塞事件循环。
+
+        :return: 最终的进度统计
+        """
+        loop = asyncio.get_running_loop()
+        for uid in seeds:
+            self.add_seed(uid)
+
+        async def worker():
+            while True:
+                with self._cond:
+                    task = self._next_task()
+                    if task is None and self._finished():
+                        return
+                if task is None:
+                    await asyncio.sleep(0.05)
+                    continue
+                await loop.run_in_executor(None, self._process, task)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.workers)))
+        finally:
+            self._close()
+        return self.progress()
+
+    def stop(self):
+        """
+        请求停止爬取：不再发出新的请求，在途请求处理完后退出
+        """
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _close(self):
+        for sink in self.sinks:
+            if hasattr(sink, 'flush'):
+                sink.flush()
+        if self.graph is not None:
+            with self._graph_lock:
+                self.graph.flush()
+        if self.checkpoint_path:
+            self.save_state(self.checkpoint_path)
+
+    def save_state(self, path):
+        """
+        保存断点：爬取边界、已发现用户集合、统计数据，以及在途请求和失败次数。
+        先写入临时文件再替换，保存过程中中断不会损坏已有的断点；多个线程同时保存时依次写入。
+        """
+        with self._save_lock:
+            with self._cond, self._seen_lock:
+                state = {
+                    'frontier': self.frontier,
+                    'seen': self._seen,
+                    'stats': self.stats,
+                    'budget_used': self.budget.used,
+                    'in_flight': list(self._running.values()),
+                    'failures': dict(self._failures),
+                    'last_active': dict(self._last_active_cache),
+                }
+                data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+
+    def load_state(self, path):
+        """
+        从断点恢复，保存断点时的在途请求重新入队
+        """
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        with self._cond:
+            self.frontier = state['frontier']
+            self._seen = state['seen']
+            self.stats = state['stats']
+            in_flight = state.get('in_flight', ())
+            # 在途请求已计入预算但没有完成，重新入队后会再次计入
+            self.budget.used = max(0, state['budget_used'] - len(in_flight))
+            self._failures = state.get('failures', {})
+            self._last_active_cache = state.get('last_active', {})
+            for uid, depth, page, score in in_flight:
+                self.frontier.requeue(uid, depth, score, page)
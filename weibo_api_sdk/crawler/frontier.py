@@ -0,0 +1,356 @@
+import bisect
+import hashlib
+import heapq
+import math
+import struct
+import tempfile
+from array import array
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = [
+    'SortedIdSet',
+    'BloomFilter',
+    'ScalableBloomFilter',
+    'DiskQueue',
+    'CrawlFrontier',
+    'PriorityFrontier',
+]
+
+
+class SortedIdSet:
+    def __init__(self, max_delta=100000):
+        """
+        紧凑的整数 ID 集合，用于记录爬取过程中已访问的用户。
+
+        主体是一个有序的 int64 数组（每个 ID 8 字节），新加入的 ID 先放入一个
+        小的 ``set`` 缓冲区，缓冲区满 ``max_delta`` 个后与主体归并。相比直接用
+        ``set`` 保存上百万个 ``int``，内存占用约为十分之一，且结果精确无误判。
+        安装了 numpy 时使用 numpy 数组归并和查找，否则退化为标准库的 ``array``。
+
+        :param int max_delta: 缓冲区大小
+        """
+        self._base = np.empty(0, dtype=np.int64) if np is not None else array('q')
+        self._delta = set()
+        self._max_delta = max_delta
+
+    def __contains__(self, uid):
+        uid = int(uid)
+        if uid in self._delta:
+            return True
+        base = self._base
+        if np is not None:
+            i = int(np.searchsorted(base, uid))
+        else:
+            i = bisect.bisect_left(base, uid)
+        return i < len(base) and base[i] == uid
+
+    def add(self, uid):
+        """
+        加入一个 ID
+
+        :return: 之前不在集合中返回 True，否则返回 False
+        """
+        uid = int(uid)
+        if uid in self:
+            return False
+        self._delta.add(uid)
+        if len(self._delta) >= self._max_delta:
+            self._merge()
+        return True
+
+    def _merge(self):
+        if np is not None:
+            delta = np.fromiter(self._delta, dtype=np.int64, count=len(self._delta))
+            merged = np.concatenate((self._base, delta))
+            merged.sort(kind='stable')
+        else:
+            merged = array('q')
+            merged.extend(heapq.merge(self._base, sorted(self._delta)))
+        self._base = merged
+        self._delta = set()
+
+    def __len__(self):
+        return len(self._base) + len(self._delta)
+
+    def __iter__(self):
+        return heapq.merge((int(uid) for uid in self._base), sorted(self._delta))
+
+    @property
+    def nbytes(self):
+        """主体数组占用的字节数"""
+        return self._base.itemsize * len(self._base)
+
+
+def _hashes(uid, k, m):
+    """对 int64 ID 做双重哈希，产生 k 个 [0, m) 范围内的位置"""
+    digest = hashlib.blake2b(int(uid).to_bytes(8, 'little', signed=True), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + i * h2) % m for i in range(k)]
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        固定容量的布隆过滤器。不保存 ID 本身，内存只与容量和误判率有关；
+        判断为"不存在"时一定不存在，判断为"存在"时有 ``error_rate`` 的概率误判。
+
+        :param int capacity: 预计最多加入的元素个数
+        :param float error_rate: 加入 ``capacity`` 个元素后的误判率
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1.')
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._m = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self._k = max(1, int(round(self._m / capacity * math.log(2))))
+        self._bits = bytearray((self._m + 7) // 8)
+        self._count = 0
+
+    def __contains__(self, uid):
+        bits = self._bits
+        return all(bits[h >> 3] & (1 << (h & 7)) for h in _hashes(uid, self._k, self._m))
+
+    def add(self, uid):
+        """
+        加入一个 ID
+
+        :return: 之前（可能）不在过滤器中返回 True，否则返回 False
+        """
+        bits = self._bits
+        added = False
+        for h in _hashes(uid, self._k, self._m):
+            mask = 1 << (h & 7)
+            if not bits[h >> 3] & mask:
+                bits[h >> 3] |= mask
+                added = True
+        if added:
+            self._count += 1
+        return added
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        return len(self._bits)
+
+
+class ScalableBloomFilter:
+    def __init__(self, initial_capacity=100000, error_rate=0.001, growth=2, tightening=0.5):
+        """
+        可扩容的布隆过滤器。当前过滤器装满后，新建一个容量为 ``growth`` 倍、
+        误判率为 ``tightening`` 倍的过滤器，总体误判率不超过 ``error_rate``。
+
+        :param int initial_capacity: 第一个过滤器的容量
+        :param float error_rate: 总体误判率上限
+        :param int growth: 每次扩容的容量倍数
+        :param float tightening: 每次扩容的误判率收紧比例
+        """
+        self._growth = growth
+        self._tightening = tightening
+        # 各级误判率为 e0 * r^i 的等比数列，使其总和不超过 error_rate
+        self._filters = [BloomFilter(initial_capacity, error_rate * (1 - tightening))]
+
+    def __contains__(self, uid):
+        return any(uid in f for f in reversed(self._filters))
+
+    def add(self, uid):
+        if uid in self:
+            return False
+        last = self._filters[-1]
+        if len(last) >= last.capacity:
+            last = BloomFilter(last.capacity * self._growth, last.error_rate * self._tightening)
+            self._filters.append(last)
+        last.add(uid)
+        return True
+
+    def __len__(self):
+        return sum(len(f) for f in self._filters)
+
+    @property
+    def nbytes(self):
+        return sum(f.nbytes for f in self._filters)
+
+
+class DiskQueue:
+    _RECORD = struct.Struct('<qi')
+
+    def __init__(self, max_memory_items=100000, spill_dir=None):
+        """
+        先进先出的 ``(uid, depth)`` 队列，内存中最多保留 ``max_memory_items``
+        个元素，其余按定长二进制记录写入临时文件，需要时再按块读回。
+
+        :param int max_memory_items: 内存中最多保留的元素个数
+        :param str spill_dir: 临时文件目录，默认为系统临时目录
+        """
+        self._max_memory_items = max_memory_items
+        self._spill_dir = spill_dir
+        self._memory = deque()
+        self._spill = None
+        self._read_pos = 0
+        self._spilled = 0
+
+    def push(self, uid, depth):
+        if not self._spilled and len(self._memory) < self._max_memory_items:
+            self._memory.append((int(uid), depth))
+            return
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(dir=self._spill_dir)
+        self._spill.seek(0, 2)
+        self._spill.write(self._RECORD.pack(int(uid), depth))
+        self._spilled += 1
+
+    def pop(self):
+        """
+        :return: 队首的 ``(uid, depth)``，队列为空时返回 None
+        """
+        if not self._memory and self._spilled:
+            self._load()
+        if not self._memory:
+            return None
+        return self._memory.popleft()
+
+    def _load(self):
+        n = min(self._spilled, self._max_memory_items)
+        size = self._RECORD.size
+        self._spill.seek(self._read_pos)
+        data = self._spill.read(n * size)
+        self._memory.extend(self._RECORD.iter_unpack(data))
+        self._read_pos += n * size
+        self._spilled -= n
+        if not self._spilled:
+            # 磁盘上的元素已全部读回，清空文件以复用空间
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._read_pos = 0
+
+    def __len__(self):
+        return len(self._memory) + self._spilled
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+class CrawlFrontier:
+    def __init__(self, visited=None, max_memory_items=100000, spill_dir=None):
+        """
+        广度优先的爬取边界：待爬取队列加已访问集合。
+
+        用户 ID 在入队时即标记为已访问，保证每个用户最多入队一次。
+        已访问集合默认为精确的 :any:`SortedIdSet`，数据量特别大、能容忍少量
+        漏爬时可以换成 :any:`ScalableBloomFilter`；队列超出内存上限的部分
+        写入磁盘（见 :any:`DiskQueue`）。
+
+        :param visited: 已访问集合，需支持 ``add`` 和 ``in``
+        :param int max_memory_items: 队列在内存中最多保留的元素个数
+        :param str spill_dir: 队列溢出文件的目录
+        """
+        self.visited = visited if visited is not None else SortedIdSet()
+        self._queue = DiskQueue(max_memory_items, spill_dir)
+
+    def push(self, uid, depth):
+        """
+        加入一个待爬取的用户，已访问过的用户会被忽略
+
+        :return: 是否成功入队
+        """
+        if not self.visited.add(uid):
+            return False
+        self._queue.push(uid, depth)
+        return True
+
+    def pop(self):
+        """
+        :return: 下一个待爬取的 ``(uid, depth)``，没有时返回 None
+        """
+        return self._queue.pop()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def close(self):
+        self._queue.close()
+
+
+class PriorityFrontier:
+    def __init__(self, visited=None):
+        """
+        按优先级出队的爬取边界，基于二叉堆实现。
+
+        队列中的每个元素是一次页面请求 ``(uid, depth, page)``：新发现的用户以
+        ``page=1`` 入队，爬完一页后可以把同一用户的下一页以较低的分数重新入队，
+        这样每次请求都花在当前价值最高的页面上。
+
+        同一用户在队列中重复入队时只保留分数最高的一次；用户在第一页出队时
+        才标记为已访问，之后的 ``page=1`` 入队请求都会被忽略。
+
+        :param visited: 已访问集合，需支持 ``add`` 和 ``in``，默认为 :any:`SortedIdSet`
+        """
+        self.visited = visited if visited is not None else SortedIdSet()
+        self._heap = []
+        self._queued = {}
+        self._seq = 0
+
+    def push(self, uid, depth, score, page=1):
+        """
+        加入一次页面请求
+
+        :param uid: 用户 ID
+        :param int depth: 用户所在层级
+        :param float score: 优先级分数，越大越先出队
+        :param int page: 页码，大于 1 时表示同一用户的后续页面
+        :return: 是否成功入队
+        """
+        uid = int(uid)
+        key = (uid, page)
+        if page == 1 and uid in self.visited:
+            return False
+        if key in self._queued and self._queued[key] >= score:
+            return False
+        self._queued[key] = score
+        # seq 保证分数相同时先入队的先出队，也避免比较 uid 之外的字段
+        heapq.heappush(self._heap, (-score, self._seq, uid, depth, page))
+        self._seq += 1
+        return True
+
+    def requeue(self, uid, depth, score, page=1):
+        """
+        重新加入一次失败的页面请求，不检查是否已访问
+        """
+        uid = int(uid)
+        self._queued[(uid, page)] = score
+        heapq.heappush(self._heap, (-score, self._seq, uid, depth, page))
+        self._seq += 1
+
+    def pop(self):
+        """
+        :return: 分数最高的 ``(uid, depth, page, score)``，队列为空时返回 None
+        """
+        while self._heap:
+            neg_score, _, uid, depth, page = heapq.heappop(self._heap)
+            key = (uid, page)
+            if self._queued.get(key) != -neg_score:
+                # 已被更高分数的同一请求取代
+                continue
+            del self._queued[key]
+            if page == 1:
+                self.visited.add(uid)
+            return uid, depth, page, -neg_score
+        return None
+
+    def task_done(self, uid, page):
+        """
+        标记出队的请求已处理完。内存中的队列出队即完成，这里什么也不做，
+        供共享的爬取边界（如 :any:`SQLiteFrontier`）确认任务。
+        """
+
+    def __len__(self):
+        return len(self._queued)
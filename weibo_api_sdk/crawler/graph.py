@@ -0,0 +1,213 @@
+import os
+from array import array
+
+__all__ = ['FollowGraphWriter', 'CSRGraph']
+
+_EDGES_FILE = 'edges.bin'
+_CSR_FILES = ('nodes', 'out_offsets', 'out_neighbors', 'in_offsets', 'in_neighbors')
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy is required for the follow graph, '
+                          'install it with: pip install "weibo-api-sdk[graph]"')
+    return numpy
+
+
+def _uid(obj):
+    """People 对象或用户 ID 转为整数 ID"""
+    return int(getattr(obj, '_id', obj))
+
+
+class FollowGraphWriter:
+    def __init__(self, directory, buffer_edges=65536):
+        """
+        爬取过程中记录关注关系的边。
+
+        每条边 ``(src, dst)`` 表示 src 关注了 dst，以两个 int64 追加写入
+        ``directory/edges.bin``，爬取中断也不会丢失已写入的边。爬取结束后调用
+        :any:`compact` 转换为 CSR 格式，再用 :any:`CSRGraph.load` 加载。
+
+        :param str directory: 图数据目录
+        :param int buffer_edges: 缓冲多少条边后写盘
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._buffer_edges = buffer_edges
+        self._buffer = array('q')
+        self._file = open(os.path.join(directory, _EDGES_FILE), 'ab')
+
+    def add_edge(self, src, dst):
+        """
+        记录 src 关注了 dst
+        """
+        self._buffer.append(_uid(src))
+        self._buffer.append(_uid(dst))
+        if len(self._buffer) >= 2 * self._buffer_edges:
+            self.flush()
+
+    def add_follows(self, uid, follows):
+        """
+        记录 uid 关注的用户，一般来自 ``people.follows.page()``
+
+        :param uid: 用户 ID
+        :param follows: :any:`People` 对象或用户 ID 的可迭代对象
+        """
+        src = _uid(uid)
+        for dst in follows:
+            self.add_edge(src, dst)
+
+    def add_followers(self, uid, followers):
+        """
+        记录 uid 的粉丝，一般来自 ``people.followers.page()``
+
+        :param uid: 用户 ID
+        :param followers: :any:`People` 对象或用户 ID 的可迭代对象
+        """
+        dst = _uid(uid)
+        for src in followers:
+            self.add_edge(src, dst)
+
+    def flush(self):
+        if self._buffer:
+            self._buffer.tofile(self._file)
+            self._file.flush()
+            self._buffer = array('q')
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def compact(self):
+        """
+        把已记录的边（去重后）转换为 CSR 格式保存到同一目录，返回加载后的图。
+
+        :rtype: CSRGraph
+        """
+        self.flush()
+        return CSRGraph.build(self._directory)
+
+
+class CSRGraph:
+    def __init__(self, nodes, out_offsets, out_neighbors, in_offsets, in_neighbors):
+        """
+        以 CSR（压缩稀疏行）格式保存的关注关系图。
+
+        - ``nodes``：有序的用户 ID 数组，下标即节点编号，用二分查找完成 uid 到编号的映射
+        - ``out_offsets`` / ``out_neighbors``：节点 i 关注的节点编号为
+          ``out_neighbors[out_offsets[i]:out_offsets[i + 1]]``
+        - ``in_offsets`` / ``in_neighbors``：同上，为节点 i 的粉丝
+
+        数组以 ``.npy`` 文件保存，加载时使用内存映射，不需要读入全部数据，
+        查询某个用户的邻居复杂度为 O(log n + degree)。
+        """
+        self.nodes = nodes
+        self.out_offsets = out_offsets
+        self.out_neighbors = out_neighbors
+        self.in_offsets = in_offsets
+        self.in_neighbors = in_neighbors
+
+    @classmethod
+    def build(cls, directory):
+        """
+        读取 ``directory/edges.bin`` 中的边，生成 CSR 数组并保存到同一目录。
+        """
+        np = _import_numpy()
+        path = os.path.join(directory, _EDGES_FILE)
+        if os.path.getsize(path):
+            edges = np.memmap(path, dtype=np.int64, mode='r').reshape(-1, 2)
+        else:
+            edges = np.empty((0, 2), dtype=np.int64)
+        # 一次 unique 同时得到有序的节点表和每个端点的节点编号
+        nodes, inverse = np.unique(edges, return_inverse=True)
+        inverse = inverse.reshape(-1, 2)
+        del edges
+
+        # 以 src * n + dst 作为边的唯一键，同时完成按 (src, dst) 排序和去重
+        n = len(nodes)
+        keys = np.unique(inverse[:, 0] * n + inverse[:, 1])
+        del inverse
+        src, dst = keys // n, keys % n
+        del keys
+
+        arrays = {'nodes': nodes}
+        arrays['out_offsets'], arrays['out_neighbors'] = cls._csr(np, src, dst, n)
+        # 已按 src 有序，按 dst 稳定排序即得到按 (dst, src) 排列的反向边
+        order = np.argsort(dst, kind='stable')
+        arrays['in_offsets'], arrays['in_neighbors'] = cls._csr(np, dst[order], src[order], n)
+        for name in _CSR_FILES:
+            np.save(os.path.join(directory, name + '.npy'), arrays[name])
+        return cls(*(arrays[name] for name in _CSR_FILES))
+
+    @staticmethod
+    def _csr(np, rows, cols, n):
+        """rows 已有序时，生成 (offsets, neighbors)"""
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+        return offsets, cols.astype(np.int64)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        加载 :any:`build` 生成的 CSR 文件
+
+        :param str directory: 图数据目录
+        :param bool mmap: 是否使用内存映射
+        """
+        np = _import_numpy()
+        mode = 'r' if mmap else None
+        return cls(*(np.load(os.path.join(directory, name + '.npy'), mmap_mode=mode)
+                     for name in _CSR_FILES))
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        return len(self.out_neighbors)
+
+    def index_of(self, uid):
+        """
+        用户 ID 对应的节点编号，不在图中时返回 None
+        """
+        uid = int(uid)
+        i = int(self.nodes.searchsorted(uid))
+        if i < len(self.nodes) and int(self.nodes[i]) == uid:
+            return i
+        return None
+
+    def _neighbors(self, offsets, neighbors, uid):
+        i = self.index_of(uid)
+        if i is None:
+            return self.nodes[:0]
+        return self.nodes[neighbors[offsets[i]:offsets[i + 1]]]
+
+    def follows(self, uid):
+        """
+        uid 关注的用户 ID 数组
+        """
+        return self._neighbors(self.out_offsets, self.out_neighbors, uid)
+
+    def followers(self, uid):
+        """
+        uid 的粉丝 ID 数组
+        """
+        return self._neighbors(self.in_offsets, self.in_neighbors, uid)
+
+    def out_degree(self, uid):
+        i = self.index_of(uid)
+        return 0 if i is None else int(self.out_offsets[i + 1] - self.out_offsets[i])
+
+    def in_degree(self, uid):
+        i = self.index_of(uid)
+        return 0 if i is None else int(self.in_offsets[i + 1] - self.in_offsets[i])
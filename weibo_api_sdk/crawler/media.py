@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ..weibo.pic import Pic, media_filename
+
+__all__ = ['MediaDownloader']
+
+_INDEX_FILE = 'index.jsonl'
+# 按保存路径分段加锁的锁数
+_PATH_LOCKS = 64
+
+
+class MediaDownloader:
+    def __init__(self, session, directory, workers=4, chunk_size=1 << 16, max_retries=2, timeout=30,
+                 policy=None):
+        """
+        图片、视频下载器。
+
+        - 用最多 ``workers`` 个线程并发下载，响应按 ``chunk_size`` 分块直接写入磁盘
+        - 先写入 ``.part`` 文件，中断后再次下载时用 ``Range`` 请求从断点继续
+        - ``directory/index.jsonl`` 记录每个 URL 对应文件的 sha256，已下载过的 URL
+          不再请求；内容相同的文件只保留一份
+
+        :param session: 网络请求 Session，一般为 ``client._session``
+        :param str directory: 保存目录
+        :param int workers: 并发下载的线程数
+        :param int chunk_size: 每次写盘的字节数
+        :param int max_retries: 下载失败（如连接中断）后从断点重试的次数
+        :param float timeout: 单次请求的超时时间（秒）
+        :param MediaPolicy policy: 图片尺寸选择策略，默认使用 client 上设置的 ``media_policy``
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._session = session
+        self._directory = directory
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.policy = policy
+        self._lock = threading.Lock()
+        # 同一路径（如不同 wx1~wx4 域名上的同一张图片）同时只有一个线程写入 .part 文件
+        self._path_locks = [threading.Lock() for _ in range(_PATH_LOCKS)]
+        self._by_url = {}
+        self._by_hash = {}
+        self._load_index()
+        self.stats = {'downloaded': 0, 'skipped': 0, 'duplicates': 0, 'failed': 0, 'bytes': 0}
+
+    def _load_index(self):
+        path = os.path.join(self._directory, _INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 写到一半中断的最后一行
+                    continue
+                self._by_url[entry['url']] = entry
+                self._by_hash.setdefault(entry['sha256'], entry['path'])
+
+    def _record(self, url, path, sha256, size):
+        entry = {'url': url, 'path': path, 'sha256': sha256, 'bytes': size}
+        with open(os.path.join(self._directory, _INDEX_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._by_url[url] = entry
+        self._by_hash.setdefault(sha256, path)
+
+    def _incr(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def download(self, media, filename=None):
+        """
+        下载一个文件
+
+        :param media: URL，或 :any:`Pic` / :any:`Video` 对象
+        :param str filename: 保存的相对路径，默认取 URL 路径的最后两段
+        :return: 字典，``status`` 为 ``downloaded`` / ``skipped``（该 URL 已下载过）/
+          ``duplicate``（内容与已有文件相同）/ ``failed``，以及 ``url``、``path``、
+          ``sha256``、``bytes``、``error``
+        """
+        if isinstance(media, Pic):
+            media = media.select(self.policy)
+        url = getattr(media, 'url', media)
+        relpath = filename or media_filename(url)
+        with self._path_locks[hash(relpath) % _PATH_LOCKS]:
+            return self._download(url, relpath)
+
+    def _download(self, url, relpath):
+        """持有 relpath 的锁时调用"""
+        with self._lock:
+            entry = self._by_url.get(url)
+        if entry is not None and os.path.exists(os.path.join(self._directory, entry['path'])):
+            self._incr('skipped')
+            return dict(entry, status='skipped', error=None)
+
+        path = os.path.join(self._directory, relpath)
+        error = None
+        for _ in range(self.max_retries + 1):
+            try:
+                sha256, size = self._fetch(url, path)
+                break
+            except Exception as e:
+                error = e
+        else:
+            self._incr('failed')
+            return {'url': url, 'path': relpath, 'sha256': None, 'bytes': 0,
+                    'status': 'failed', 'error': error}
+
+        with self._lock:
+            existing = self._by_hash.get(sha256)
+            if existing is not None and existing != relpath \
+                    and os.path.exists(os.path.join(self._directory, existing)):
+                os.remove(path)
+                relpath, status = existing, 'duplicate'
+            else:
+                status = 'downloaded'
+            self._record(url, relpath, sha256, size)
+        self._incr('duplicates' if status == 'duplicate' else 'downloaded')
+        return {'url': url, 'path': relpath, 'sha256': sha256, 'bytes': size,
+                'status': status, 'error': None}
+
+    def _fetch(self, url, path):
+        """下载到 path，已有 .part 文件时从断点继续，返回 (sha256, 字节数)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        part = path + '.part'
+        digest = hashlib.sha256()
+        offset = 0
+        if os.path.exists(part):
+            # 断点之前的内容也要计入摘要
+            with open(part, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                    digest.update(chunk)
+                    offset += len(chunk)
+        headers = {'Range': 'bytes=%d-' % offset} if offset else None
+        res = self._session.request('GET', url=url, headers=headers, stream=True, timeout=self.timeout)
+        try:
+            if offset and res.status_code == 416:
+                # 断点处已是文件结尾
+                pass
+            else:
+                res.raise_for_status()
+                if offset and res.status_code != 206:
+                    # 服务器不支持 Range，从头下载
+                    digest = hashlib.sha256()
+                    offset = 0
+                with open(part, 'ab' if offset else 'wb') as f:
+                    for chunk in res.iter_content(self.chunk_size):
+                        if chunk:
+                            f.write(chunk)
+                            digest.update(chunk)
+                            offset += len(chunk)
+                            self._incr('bytes', len(chunk))
+        finally:
+            res.close()
+        os.replace(part, path)
+        return digest.hexdigest(), offset
+
+    def download_many(self, medias):
+        """
+        并发下载多个文件
+
+        :param medias: URL，或 :any:`Pic` / :any:`Video` 对象的可迭代对象
+        :return: 与输入顺序一致的下载结果列表
+        """
+        medias = list(medias)
+        # 保存到同一路径的文件只下载一次：同一个 URL，或不同 wx1~wx4 域名上的同一张图片
+        unique = {}
+        for media in medias:
+            unique.setdefault(media_filename(getattr(media, 'url', media)), media)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = dict(zip(unique, executor.map(self.download, unique.values())))
+        return [results[media_filename(getattr(media, 'url', media))] for media in medias]
@@ -0,0 +1,235 @@
+import contextlib
+import threading
+import time
+
+from ..utils.exception import AntiCrawlException, DeadlineExceededException
+
+__all__ = ['RateLimiter', 'EndpointRateLimiter', 'AdaptiveConcurrencyLimiter', 'is_throttle_signal']
+
+# 被限流时接口返回 {"ok": 0}，读取列表属性时出现这个错误
+_THROTTLE_MESSAGE = 'Only dict and list can be StreamingJSON.'
+
+
+class RateLimiter:
+    def __init__(self, rate, burst=1):
+        """
+        令牌桶限速器，线程安全。
+
+        :param float rate: 每秒产生的令牌数，即平均每秒允许的请求数
+        :param int burst: 桶容量，允许的瞬时突发请求数
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive.')
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """
+        不等待地尝试取一个令牌
+
+        :return: 取到返回 True
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        """
+        取一个令牌，令牌不足时阻塞等待
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # 先预定令牌，再在锁外等待，多个线程按预定顺序依次放行
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class EndpointRateLimiter:
+    def __init__(self, rates=None, default_rate=None, burst=1):
+        """
+        按接口类型分别限速
+
+        :param dict rates: 接口类型到每秒请求数的映射，如 ``{'follows': 1.0, 'people': 2.0}``
+        :param float default_rate: 未列出的接口类型的速率，为 None 时不限速
+        :param int burst: 每个令牌桶的容量
+        """
+        self._limiters = {name: RateLimiter(rate, burst) for name, rate in (rates or {}).items()}
+        self._default_rate = default_rate
+        self._burst = burst
+        self._lock = threading.Lock()
+
+    def limiter(self, endpoint):
+        """
+        :return: 接口类型对应的 :any:`RateLimiter`，不限速时返回 None
+        """
+        limiter = self._limiters.get(endpoint)
+        if limiter is None and self._default_rate is not None:
+            with self._lock:
+                limiter = self._limiters.setdefault(
+                    endpoint, RateLimiter(self._default_rate, self._burst))
+        return limiter
+
+    def acquire(self, endpoint):
+        limiter = self.limiter(endpoint)
+        if limiter is not None:
+            limiter.acquire()
+
+
+def is_throttle_signal(error):
+    """
+    :return: 异常是否表示被限流或遇到反爬虫页面
+    """
+    return isinstance(error, AntiCrawlException) or (isinstance(error, TypeError) and str(error) == _THROTTLE_MESSAGE)
+
+
+class _Slot:
+    __slots__ = ('started_at', 'saturated', 'throttled')
+
+    def __init__(self, started_at, saturated):
+        self.started_at = started_at
+        # 发出时在途请求数至少为上限的一半，说明并发确实被用上了
+        self.saturated = saturated
+        self.throttled = False
+
+    def throttle(self):
+        """
+        标记本次请求被限流，如响应为 ``{"ok": 0}``
+        """
+        self.throttled = True
+
+
+class _EndpointState:
+    def __init__(self, limit):
+        self.limit = float(limit)
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.cond = threading.Condition()
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(self, initial=2, min_limit=1, max_limit=32, increase=1.0, decrease=0.5):
+        """
+        按接口类型自适应调整并发请求数（AIMD，加性增、乘性减），线程安全。
+
+        - 请求正常返回时，并发上限每经过约一个上限数量的请求增加 ``increase``；
+          在途请求数不到上限的一半时说明并发没有用满，不再增加
+        - 被限流（418 / 429、验证码或登录页面、``{"ok": 0}``）时上限乘以 ``decrease``；
+          同一时刻在途的请求只触发一次下调，即只有在上次下调之后发出的请求才会再次下调
+        - 其他错误（如连接超时）不调整上限
+
+        通过 ``WeiboClient(concurrency_limiter=AdaptiveConcurrencyLimiter())`` 启用后，所有经过
+        ``_get_data`` 的请求（包括 ``pipeline()``、``headlines()`` 和 :any:`FollowCrawler`
+        的工作线程）在发出前都要取得所在接口类型的一个名额。
+
+        :param int initial: 初始并发上限
+        :param int min_limit: 最小并发上限
+        :param int max_limit: 最大并发上限
+        :param float increase: 每轮增加的并发数
+        :param float decrease: 被限流时的缩减系数
+        """
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self.stats = {'successes': 0, 'throttles': 0, 'decreases': 0}
+
+    def _state(self, endpoint):
+        with self._lock:
+            state = self._endpoints.get(endpoint)
+            if state is None:
+                state = self._endpoints[endpoint] = _EndpointState(self.initial)
+            return state
+
+    def limit(self, endpoint):
+        """
+        :return: 接口类型当前的并发上限
+        """
+        return int(self._state(endpoint).limit)
+
+    def limits(self):
+        """
+        :return: 各接口类型当前的并发上限和在途请求数
+        """
+        with self._lock:
+            states = dict(self._endpoints)
+        return {endpoint: {'limit': int(state.limit), 'in_flight': state.in_flight}
+                for endpoint, state in states.items()}
+
+    def acquire(self, endpoint, timeout=None):
+        """
+        取得一个名额，在途请求数达到上限时阻塞等待
+
+        :param float timeout: 最长等待时间（秒），为 None 时一直等待
+        :return: 名额，请求结束后传给 :any:`release`
+        :raise DeadlineExceededException: 超过 timeout 仍未取得名额
+        """
+        state = self._state(endpoint)
+        with state.cond:
+            if not state.cond.wait_for(lambda: state.in_flight < int(state.limit), timeout):
+                raise DeadlineExceededException(endpoint)
+            state.in_flight += 1
+            saturated = state.in_flight * 2 >= state.limit
+        return _Slot(time.monotonic(), saturated)
+
+    def release(self, endpoint, slot, throttled=False):
+        """
+        归还名额并根据结果调整上限
+
+        :param bool throttled: 请求是否被限流
+        """
+        state = self._state(endpoint)
+        with state.cond:
+            state.in_flight -= 1
+            if throttled:
+                self.stats['throttles'] += 1
+                if slot.started_at >= state.last_decrease:
+                    state.limit = max(self.min_limit, state.limit * self.decrease)
+                    state.last_decrease = time.monotonic()
+                    self.stats['decreases'] += 1
+            else:
+                self.stats['successes'] += 1
+                if slot.saturated:
+                    state.limit = min(self.max_limit, state.limit + self.increase / state.limit)
+            state.cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, endpoint, timeout=None):
+        """
+        在 with 块中持有一个名额，块内抛出限流相关的异常（见 :any:`is_throttle_signal`）或调用
+        ``slot.throttle()`` 时下调上限，其他异常不调整上限
+        """
+        slot = self.acquire(endpoint, timeout)
+        throttled = neutral = False
+        try:
+            yield slot
+        except Exception as e:
+            throttled = is_throttle_signal(e)
+            neutral = not throttled
+            raise
+        finally:
+            if neutral:
+                self._release_neutral(endpoint)
+            else:
+                self.release(endpoint, slot, throttled or slot.throttled)
+
+    def _release_neutral(self, endpoint):
+        state = self._state(endpoint)
+        with state.cond:
+            state.in_flight -= 1
+            state.cond.notify_all()
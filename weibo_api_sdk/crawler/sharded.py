@@ -0,0 +1,272 @@
+import multiprocessing
+import sqlite3
+import threading
+
+from .engine import FollowCrawler, RequestBudget
+
+__all__ = ['SQLiteFrontier', 'SQLiteSeenSet', 'run_sharded']
+
+# 任务状态
+_QUEUED, _CLAIMED, _DONE = 0, 1, 2
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+class SQLiteSeenSet:
+    def __init__(self, path):
+        """
+        多个进程共享的已发现用户集合，保存在 SQLite 数据库中。
+
+        :param str path: 数据库文件路径，与 :any:`SQLiteFrontier` 共用
+        """
+        self._conn = _connect(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS seen (uid INTEGER PRIMARY KEY)')
+
+    def add(self, uid):
+        """
+        :return: 之前没有任何进程加入过该用户时返回 True
+        """
+        with self._lock:
+            cur = self._conn.execute('INSERT OR IGNORE INTO seen (uid) VALUES (?)', (int(uid),))
+            return cur.rowcount == 1
+
+    def __contains__(self, uid):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT 1 FROM seen WHERE uid = ?', (int(uid),)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+class SQLiteFrontier:
+    def __init__(self, path, shard=0, num_shards=1):
+        """
+        多个进程共享的优先级爬取边界，保存在 SQLite（WAL 模式）数据库中。
+
+        用户 ID 按 ``uid % num_shards`` 划分到各个分片，每个进程只领取自己分片
+        的任务，但可以向任意分片添加任务。任务领取在一个写事务中完成，不会被
+        两个进程同时领取；处理完后由 :any:`task_done` 确认。进程崩溃后未确认的
+        任务可以用 :any:`recover` 放回队列。
+
+        接口与 :any:`PriorityFrontier` 相同，可以直接传给 :any:`FollowCrawler`。
+
+        :param str path: 数据库文件路径
+        :param int shard: 当前进程负责的分片
+        :param int num_shards: 分片总数
+        """
+        self.shard = shard
+        self.num_shards = num_shards
+        self._conn = _connect(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS tasks ('
+                'uid INTEGER, page INTEGER, depth INTEGER, score REAL, shard INTEGER, state INTEGER, '
+                'PRIMARY KEY (uid, page))')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (shard, state, score)')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS visited (uid INTEGER PRIMARY KEY)')
+            # 已退出的分片，其待领取任务不再计入其他分片的 len()
+            self._conn.execute('CREATE TABLE IF NOT EXISTS finished_shards (shard INTEGER PRIMARY KEY)')
+            self._conn.execute('DELETE FROM finished_shards WHERE shard = ?', (shard,))
+
+    def push(self, uid, depth, score, page=1):
+        """
+        加入一次页面请求，已访问用户的第一页会被忽略；同一请求已在队列中时保留较高的分数及其层级
+
+        :return: 是否成功入队或提高了分数
+        """
+        uid = int(uid)
+        with self._lock:
+            if page == 1 and self._conn.execute(
+                    'SELECT 1 FROM visited WHERE uid = ?', (uid,)).fetchone():
+                return False
+            cur = self._conn.execute(
+                'INSERT INTO tasks (uid, page, depth, score, shard, state) VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (uid, page) DO UPDATE SET score = excluded.score, depth = excluded.depth '
+                'WHERE tasks.state = ? AND tasks.score < excluded.score',
+                (uid, page, depth, score, uid % self.num_shards, _QUEUED, _QUEUED))
+            return cur.rowcount == 1
+
+    def requeue(self, uid, depth, score, page=1):
+        """
+        重新加入一次失败的页面请求
+        """
+        uid = int(uid)
+        with self._lock:
+            self._conn.execute(
+                'UPDATE tasks SET state = ?, score = ?, depth = ? WHERE uid = ? AND page = ?',
+                (_QUEUED, score, depth, uid, page))
+
+    def pop(self):
+        """
+        领取当前分片中分数最高的请求
+
+        :return: ``(uid, depth, page, score)``，分片中没有待领取的任务时返回 None
+        """
+        with self._lock:
+            # BEGIN IMMEDIATE 立即拿到写锁，保证查询和更新之间不会被其他进程插入
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    'SELECT uid, depth, page, score FROM tasks WHERE shard = ? AND state = ? '
+                    'ORDER BY score DESC LIMIT 1', (self.shard, _QUEUED)).fetchone()
+                if row is not None:
+                    uid, depth, page, score = row
+                    self._conn.execute('UPDATE tasks SET state = ? WHERE uid = ? AND page = ?',
+                                       (_CLAIMED, uid, page))
+                    if page == 1:
+                        self._conn.execute('INSERT OR IGNORE INTO visited (uid) VALUES (?)', (uid,))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return row
+
+    def task_done(self, uid, page):
+        """
+        确认领取的请求已处理完
+        """
+        with self._lock:
+            self._conn.execute('UPDATE tasks SET state = ? WHERE uid = ? AND page = ? AND state = ?',
+                               (_DONE, int(uid), page, _CLAIMED))
+
+    def recover(self):
+        """
+        把已领取但未确认的任务放回队列，并清除分片的退出标记，用于重新开始爬取前
+        从上次崩溃或中断中恢复
+
+        :return: 放回的任务数
+        """
+        with self._lock:
+            self._conn.execute('DELETE FROM finished_shards')
+            return self._conn.execute('UPDATE tasks SET state = ? WHERE state = ?',
+                                      (_QUEUED, _CLAIMED)).rowcount
+
+    def __len__(self):
+        """
+        仍在运行的分片中尚未完成（待领取或处理中）的任务数。其他分片的任务可能为
+        当前分片产生新任务，因此以全局数量判断爬取是否结束；已调用 :any:`close`
+        退出的分片（如预算耗尽）剩下的任务不计入，不会拖住其他进程。
+        """
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM tasks WHERE state != ? '
+                'AND shard NOT IN (SELECT shard FROM finished_shards)', (_DONE,)).fetchone()[0]
+
+    def close(self, finished=True):
+        """
+        标记当前分片已退出并关闭数据库连接
+
+        :param bool finished: 为 False 时只关闭连接，不标记分片已退出，
+          用于只加入任务、不领取任务的进程（如 :any:`run_sharded` 加入起始用户）
+        """
+        with self._lock:
+            if finished:
+                self._conn.execute('INSERT OR IGNORE INTO finished_shards (shard) VALUES (?)', (self.shard,))
+        self._conn.close()
+
+    def __getstate__(self):
+        raise TypeError('SQLiteFrontier cannot be pickled, the database itself is the checkpoint')
+
+
+def _run_shard(shard, num_shards, db_path, cookie, max_requests, sinks_factory, kwargs):
+    from ..client import WeiboClient
+
+    frontier = SQLiteFrontier(db_path, shard, num_shards)
+    seen = SQLiteSeenSet(db_path)
+    sinks = sinks_factory(shard) if sinks_factory is not None else []
+    crawler = FollowCrawler(
+        WeiboClient(cookie=cookie),
+        budget=RequestBudget(max_requests),
+        frontier=frontier,
+        seen=seen,
+        sinks=sinks,
+        **kwargs
+    )
+    try:
+        stats = crawler.run()
+    finally:
+        for sink in sinks:
+            if hasattr(sink, 'close'):
+                sink.close()
+        frontier.close()
+        seen.close()
+    stats['shard'] = shard
+    return stats
+
+
+def _seed(db_path, num_shards, seeds):
+    """从上次中断中恢复并加入起始用户，不领取任务，也不标记任何分片已退出"""
+    frontier = SQLiteFrontier(db_path, 0, num_shards)
+    seen = SQLiteSeenSet(db_path)
+    try:
+        frontier.recover()
+        for uid in seeds:
+            if seen.add(uid):
+                frontier.push(uid, 0, float('inf'))
+    finally:
+        frontier.close(finished=False)
+        seen.close()
+
+
+def run_sharded(seeds, db_path, cookie=None, processes=None, max_requests=None,
+                sinks_factory=None, **kwargs):
+    """
+    多进程分片爬取关注网络。
+
+    用户 ID 空间按 ``uid % processes`` 分片，每个进程使用独立的 :any:`WeiboClient`
+    会话运行一个 :any:`FollowCrawler`，通过同一个 SQLite 数据库中的
+    :any:`SQLiteFrontier` 和 :any:`SQLiteSeenSet` 协调，每个页面只会被请求一次。
+    解析 JSON、构建对象等 CPU 开销分散到多个核心上。
+
+    数据库即断点：用相同的 ``db_path`` 再次运行会把上次未确认的任务放回队列后继续。
+
+    :param seeds: 起始用户 ID 列表
+    :param str db_path: 共享数据库文件路径
+    :param str cookie: 每个进程创建 :any:`WeiboClient` 时使用的 Cookie
+    :param int processes: 进程数，默认为 CPU 核数
+    :param int max_requests: 全部进程的总请求预算，平均分给各进程，余数分给前几个进程；
+      少于进程数时只启动 ``max_requests`` 个进程。为 None 时不限制
+    :param sinks_factory: 可 pickle 的函数 ``sinks_factory(shard)``，
+      在子进程中为该分片创建写入器列表（如每个分片一个 JSONL 文件）
+    :param kwargs: 传给 :any:`FollowCrawler` 的其他参数，如 ``max_depth``、``workers``；
+      不支持 ``checkpoint_path``，数据库即断点
+    :return: 各进程的进度统计列表
+    """
+    if kwargs.get('checkpoint_path'):
+        raise ValueError('checkpoint_path is not supported by run_sharded, the database is the checkpoint')
+    processes = processes or multiprocessing.cpu_count()
+    if max_requests is not None:
+        if max_requests < 1:
+            raise ValueError('max_requests must be at least 1.')
+        # 每个进程至少有一次请求的预算
+        processes = min(processes, max_requests)
+    _seed(db_path, processes, seeds)
+
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(processes) as pool:
+        return pool.starmap(_run_shard, [
+            (shard, processes, db_path, cookie, _shard_budget(max_requests, processes, shard),
+             sinks_factory, kwargs)
+            for shard in range(processes)
+        ])
+
+
+def _shard_budget(max_requests, processes, shard):
+    """平均分配总请求预算，前 ``max_requests % processes`` 个分片各多一次"""
+    if max_requests is None:
+        return None
+    return max_requests // processes + (shard < max_requests % processes)
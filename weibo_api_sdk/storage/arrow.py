@@ -0,0 +1,105 @@
+import itertools
+
+from .records import SCHEMAS, entity_of, to_record
+
+__all__ = ['arrow_schema', 'iter_record_batches', 'write_parquet']
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('pyarrow is required for Arrow/Parquet export, '
+                          'install it with: pip install "weibo-api-sdk[arrow]"')
+    return pyarrow
+
+
+def arrow_schema(entity):
+    """
+    获取实体对应的 Arrow schema
+
+    :param str entity: 'people' / 'status' / 'article'
+    :rtype: pyarrow.Schema
+    """
+    pa = _import_pyarrow()
+    types = {
+        'int64': pa.int64(),
+        'string': pa.string(),
+        'bool': pa.bool_(),
+        'list<string>': pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[t]) for name, t in SCHEMAS[entity]])
+
+
+def _peek_entity(items, entity):
+    """
+    未指定实体类型时，从第一个对象推断，返回 (entity, 还原后的迭代器)
+
+    :raise ValueError: 记录字典无法推断实体类型，必须指定 entity
+    """
+    items = iter(items)
+    if entity is not None:
+        return entity, items
+    try:
+        first = next(items)
+    except StopIteration:
+        return None, iter(())
+    if isinstance(first, dict):
+        raise ValueError('entity is required for dict records')
+    return entity_of(first), itertools.chain([first], items)
+
+
+def iter_record_batches(items, entity=None, batch_size=1000):
+    """
+    将任意微博对象迭代器（如 :any:`Statuses.page`、:any:`Peoples.all`、
+    :any:`Articles.page_from_to`）流式转换为 Arrow RecordBatch。
+
+    每次只在内存中保留一个 batch 的数据，内存占用与抓取的总页数无关。
+
+    :param items: :any:`People` / :any:`Status` / :any:`Article` 对象或记录字典的迭代器
+    :param str entity: 实体类型，为空时由第一个对象推断；传入记录字典时必须指定
+    :param int batch_size: 每个 RecordBatch 的行数
+    :return: pyarrow.RecordBatch 的生成器
+    """
+    pa = _import_pyarrow()
+    if batch_size < 1:
+        raise ValueError('batch_size must be at least 1.')
+    entity, items = _peek_entity(items, entity)
+    if entity is None:
+        return
+    schema = arrow_schema(entity)
+    names = schema.names
+    while True:
+        chunk = list(itertools.islice(items, batch_size))
+        if not chunk:
+            return
+        records = [to_record(obj) for obj in chunk]
+        columns = [[r.get(name) for r in records] for name in names]
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+            schema=schema,
+        )
+
+
+def write_parquet(items, path, entity=None, batch_size=1000, compression='snappy'):
+    """
+    将微博对象迭代器流式写入 Parquet 文件，每个 batch 写成一个 row group。
+
+    :param items: 微博对象或记录字典的迭代器
+    :param path: 输出文件路径
+    :param str entity: 实体类型，为空时由第一个对象推断；传入记录字典时必须指定
+    :param int batch_size: 每个 row group 的行数
+    :param str compression: Parquet 压缩算法
+    :return: 写入的行数
+    """
+    pa = _import_pyarrow()
+    entity, items = _peek_entity(items, entity)
+    if entity is None:
+        return 0
+    rows = 0
+    with pa.parquet.ParquetWriter(path, arrow_schema(entity), compression=compression) as writer:
+        for batch in iter_record_batches(items, entity, batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
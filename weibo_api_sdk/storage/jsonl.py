@@ -0,0 +1,133 @@
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+
+from .records import to_record
+
+__all__ = ['JsonlSink']
+
+
+class JsonlSink:
+    def __init__(self, path, max_records=1000, max_buffer_size=1 << 20, flush_interval=5.0,
+                 rotate_bytes=None, compress=False, exclude=(), mode='a'):
+        """
+        带缓冲的 JSONL 写入器。
+
+        整个生命周期只打开一次文件，记录序列化后先放入缓冲区，缓冲的记录数、
+        大小或距上次写盘的时间任一超过阈值时批量写入文件。
+
+        使用示例::
+
+            with JsonlSink('follow_network.jsonl', exclude=('depth',)) as sink:
+                for fan in client.followers(uid).all():
+                    sink.write(fan)
+
+        :param path: 输出文件路径
+        :param int max_records: 缓冲多少条记录后写盘
+        :param int max_buffer_size: 缓冲区超过多少字符后写盘
+        :param float flush_interval: 距上次写盘超过多少秒后，下一次写入时写盘；
+          为 None 时不按时间写盘
+        :param int rotate_bytes: 文件超过多少字节后轮转为 ``name.1.jsonl``、
+          ``name.2.jsonl`` ...，为 None 时不轮转
+        :param bool compress: 轮转出的文件是否用 gzip 压缩
+        :param exclude: 写入前从记录中去掉的字段
+        :param str mode: 打开文件的模式，'a' 追加或 'w' 覆盖
+        """
+        self._path = path
+        self._max_records = max_records
+        self._max_buffer_size = max_buffer_size
+        self._flush_interval = flush_interval
+        self._rotate_bytes = rotate_bytes
+        self._compress = compress
+        self._exclude = frozenset(exclude)
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._buffer_size = 0
+        self._last_flush = time.monotonic()
+        self._file = open(path, mode, encoding='utf-8')
+        self._file_bytes = self._file.tell()
+        self.records_written = 0
+
+    def write(self, obj):
+        """
+        写入一条记录
+
+        :param obj: 记录字典，或 :any:`People` / :any:`Status` / :any:`Article` 对象
+        """
+        record = to_record(obj)
+        if self._exclude:
+            record = {k: v for k, v in record.items() if k not in self._exclude}
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._buffer.append(line)
+            self._buffer_size += len(line)
+            if (len(self._buffer) >= self._max_records
+                    or self._buffer_size >= self._max_buffer_size
+                    or (self._flush_interval is not None
+                        and time.monotonic() - self._last_flush >= self._flush_interval)):
+                self._flush()
+
+    def write_many(self, objs):
+        """
+        写入多条记录
+        """
+        for obj in objs:
+            self.write(obj)
+
+    def flush(self):
+        """
+        把缓冲区中的记录写入文件
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            data = ''.join(self._buffer)
+            self._file.write(data)
+            self._file.flush()
+            self._file_bytes = self._file.tell()
+            self.records_written += len(self._buffer)
+            self._buffer = []
+            self._buffer_size = 0
+        self._last_flush = time.monotonic()
+        if self._rotate_bytes and self._file_bytes >= self._rotate_bytes:
+            self._rotate()
+
+    def _rotated_name(self):
+        stem, suffix = os.path.splitext(self._path)
+        n = 1
+        while True:
+            name = f'{stem}.{n}{suffix}'
+            if not os.path.exists(name) and not os.path.exists(name + '.gz'):
+                return name
+            n += 1
+
+    def _rotate(self):
+        self._file.close()
+        rotated = self._rotated_name()
+        os.replace(self._path, rotated)
+        if self._compress:
+            with open(rotated, 'rb') as src, gzip.open(rotated + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        self._file = open(self._path, 'w', encoding='utf-8')
+        self._file_bytes = 0
+
+    def close(self):
+        """
+        写出剩余的缓冲并关闭文件
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,181 @@
+from ..utils.accounting import lazy_fetch
+from ..utils.numbers import parse_count
+from ..utils.timeparse import parse_created_at
+from ..weibo.article import Article
+from ..weibo.people import People
+from ..weibo.status import Status
+
+__all__ = [
+    'PEOPLE_SCHEMA',
+    'STATUS_SCHEMA',
+    'ARTICLE_SCHEMA',
+    'SCHEMAS',
+    'entity_of',
+    'people_to_record',
+    'status_to_record',
+    'article_to_record',
+    'to_record',
+]
+
+# 每种实体导出时的固定字段，(字段名, 类型)
+# 类型取值：int64 / string / bool / list<string>
+
+PEOPLE_SCHEMA = (
+    ('id', 'int64'),
+    ('name', 'string'),
+    ('description', 'string'),
+    ('gender', 'string'),
+    ('avatar', 'string'),
+    ('followers_count', 'int64'),
+    ('follow_count', 'int64'),
+)
+
+STATUS_SCHEMA = (
+    ('id', 'string'),
+    ('user_id', 'int64'),
+    ('text', 'string'),
+    ('created_at', 'string'),
+    ('created_timestamp', 'int64'),
+    ('source', 'string'),
+    ('thumbnail_pic', 'string'),
+    ('bmiddle_pic', 'string'),
+    ('original_pic', 'string'),
+    ('is_paid', 'bool'),
+    ('pic_urls', 'list<string>'),
+)
+
+ARTICLE_SCHEMA = (
+    ('id', 'string'),
+    ('title', 'string'),
+    ('author_uid', 'int64'),
+    ('author_name', 'string'),
+    ('attitudes_count', 'int64'),
+    ('read_count', 'int64'),
+    ('reposts_count', 'int64'),
+    ('image', 'string'),
+)
+
+SCHEMAS = {
+    'people': PEOPLE_SCHEMA,
+    'status': STATUS_SCHEMA,
+    'article': ARTICLE_SCHEMA,
+}
+
+
+def entity_of(obj):
+    """
+    判断对象对应的实体类型
+
+    :param obj: :any:`People`，:any:`Status` 或 :any:`Article` 对象
+    :return: 'people' / 'status' / 'article'
+    """
+    if isinstance(obj, People):
+        return 'people'
+    if isinstance(obj, Status):
+        return 'status'
+    if isinstance(obj, Article):
+        return 'article'
+    raise TypeError(f'Can not export object of type {type(obj).__name__}.')
+
+
+def _raw(obj, name):
+    """
+    直接从对象的 cache 或 data 中取出原始 JSON 字段，避免 :any:`StreamingJSON`
+    的深拷贝。两者都没有时才会请求网络，与读取属性一样计入 :any:`FetchAccounting`。
+    """
+    if obj._cache and name in obj._cache:
+        return obj._cache[name] or {}
+    lazy_fetch(obj, name)
+    return (obj._data or {}).get(name) or {}
+
+
+def _int(value):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _str(value):
+    return None if value is None else str(value)
+
+
+def people_to_record(people):
+    """
+    :param People people: 用户对象，一般来自 :any:`Peoples.page`
+    :return: 按 :any:`PEOPLE_SCHEMA` 排列的字典
+    """
+    info = _raw(people, 'userInfo')
+    return {
+        'id': _int(info.get('id', people._id)),
+        'name': info.get('screen_name'),
+        'description': info.get('description'),
+        'gender': info.get('gender'),
+        'avatar': info.get('avatar_hd'),
+        'followers_count': parse_count(info.get('followers_count')),
+        'follow_count': parse_count(info.get('follow_count')),
+    }
+
+
+def status_to_record(status):
+    """
+    只导出 :any:`Statuses.page` 已经填充的字段，不会触发网络请求。
+
+    :param Status status: 微博对象
+    :return: 按 :any:`STATUS_SCHEMA` 排列的字典
+    """
+    attrs = vars(status)
+    user = attrs.get('user')
+    created_timestamp = attrs.get('created_timestamp')
+    if created_timestamp is None:
+        created_timestamp = parse_created_at(attrs.get('created_at'))
+    return {
+        'id': _str(status._id),
+        'user_id': _int(user._id) if user is not None else None,
+        'text': attrs.get('text'),
+        'created_at': attrs.get('created_at'),
+        'created_timestamp': created_timestamp,
+        'source': attrs.get('source'),
+        'thumbnail_pic': attrs.get('thumbnail_pic'),
+        'bmiddle_pic': attrs.get('bmiddle_pic'),
+        'original_pic': attrs.get('original_pic'),
+        'is_paid': attrs.get('is_paid'),
+        'pic_urls': attrs.get('pic_urls') or [],
+    }
+
+
+def article_to_record(article):
+    """
+    :param Article article: 头条文章对象
+    :return: 按 :any:`ARTICLE_SCHEMA` 排列的字典
+    """
+    config = _raw(article, 'config')
+    return {
+        'id': _str(config.get('id', article._id)),
+        'title': config.get('title'),
+        'author_uid': _int(config.get('author_uid')),
+        'author_name': config.get('author_name'),
+        'attitudes_count': _int(config.get('attitudes_count')),
+        'read_count': _int(config.get('read_count')),
+        'reposts_count': _int(config.get('reposts_count')),
+        'image': config.get('image'),
+    }
+
+
+_CONVERTERS = {
+    'people': people_to_record,
+    'status': status_to_record,
+    'article': article_to_record,
+}
+
+
+def to_record(obj):
+    """
+    将微博对象转换为扁平的字典记录，字段顺序与对应实体的 schema 一致。
+    已经是字典的记录原样返回。
+    """
+    if isinstance(obj, dict):
+        return obj
+    return _CONVERTERS[entity_of(obj)](obj)
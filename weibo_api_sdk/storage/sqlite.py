@@ -0,0 +1,229 @@
+import json
+import sqlite3
+import threading
+
+from .records import SCHEMAS, entity_of, to_record
+
+__all__ = ['SQLiteStore']
+
+_TABLES = {
+    'people': 'people',
+    'status': 'statuses',
+    'article': 'articles',
+}
+
+_INDEXES = {
+    'people': (),
+    'status': ('user_id', 'created_timestamp'),
+    'article': ('author_uid',),
+}
+
+# 旧版本创建、已不再使用的索引。created_at 是 "3分钟前"、"01-02" 这类字符串，索引无法用于范围查询
+_DROPPED_INDEXES = ('idx_statuses_created_at',)
+
+_SQL_TYPES = {
+    'int64': 'INTEGER',
+    'string': 'TEXT',
+    'bool': 'INTEGER',
+    'list<string>': 'TEXT',
+}
+
+
+class SQLiteStore:
+    def __init__(self, path, batch_size=1000):
+        """
+        基于 SQLite 的存储后端，按主键 upsert :any:`People`，:any:`Status`
+        和 :any:`Article` 记录，重复抓取不会产生重复数据。
+
+        数据库使用 WAL 模式，写入先缓冲，每满 ``batch_size`` 条在一个事务中
+        批量提交。``people`` 表以用户 ID 为主键，``statuses`` 表以微博 ID 为主键
+        并对 ``user_id``、``created_timestamp`` 建索引，``articles`` 表对 ``author_uid`` 建索引。
+
+        upsert 时为 None 的字段保留已有的值，不完整的记录（如不联网构建的 :any:`Status`）
+        不会把已保存的数据覆盖为 NULL。
+
+        :param path: 数据库文件路径
+        :param int batch_size: 缓冲多少条记录后提交一次事务
+        """
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._buffers = {entity: [] for entity in SCHEMAS}
+        self._pending = 0
+        self._create_tables()
+
+    def _create_tables(self):
+        for entity, schema in SCHEMAS.items():
+            table = _TABLES[entity]
+            columns = ', '.join(
+                f'{name} {_SQL_TYPES[t]}' + (' PRIMARY KEY' if name == 'id' else '')
+                for name, t in schema
+            )
+            self._conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({columns})')
+            # 旧版本创建的表补上新增的字段
+            existing = {row[1] for row in self._conn.execute(f'PRAGMA table_info({table})')}
+            for name, t in schema:
+                if name not in existing:
+                    self._conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {_SQL_TYPES[t]}')
+            for column in _INDEXES[entity]:
+                self._conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})')
+        for index in _DROPPED_INDEXES:
+            self._conn.execute(f'DROP INDEX IF EXISTS {index}')
+
+    @staticmethod
+    def _upsert_sql(entity):
+        names = [name for name, _ in SCHEMAS[entity]]
+        table = _TABLES[entity]
+        updates = ', '.join(
+            f'{name}=COALESCE(excluded.{name}, {table}.{name})' for name in names if name != 'id')
+        return (f'INSERT INTO {table} ({", ".join(names)}) '
+                f'VALUES ({", ".join("?" * len(names))}) '
+                f'ON CONFLICT(id) DO UPDATE SET {updates}')
+
+    @staticmethod
+    def _row(entity, record):
+        row = []
+        for name, t in SCHEMAS[entity]:
+            value = record.get(name)
+            if t == 'list<string>' and value is not None:
+                value = json.dumps(value, ensure_ascii=False)
+            row.append(value)
+        return row
+
+    def write(self, obj, entity=None):
+        """
+        写入（upsert）一条记录
+
+        :param obj: :any:`People` / :any:`Status` / :any:`Article` 对象，或记录字典
+        :param str entity: 记录字典对应的实体类型，传入对象时可以为空
+        """
+        entity = entity or entity_of(obj)
+        row = self._row(entity, to_record(obj))
+        with self._lock:
+            self._buffers[entity].append(row)
+            self._pending += 1
+            if self._pending >= self._batch_size:
+                self._flush()
+
+    def write_many(self, objs, entity=None):
+        """
+        写入多条记录
+        """
+        for obj in objs:
+            self.write(obj, entity)
+
+    def bulk_ingest(self, objs, entity=None, batch_size=10000):
+        """
+        批量导入的快速通道：不经过写缓冲，每 ``batch_size`` 条记录用一次
+        ``executemany`` 在一个事务内提交。
+
+        :param objs: 同一种实体的对象或记录字典的迭代器
+        :param str entity: 实体类型，为空时由第一个对象推断
+        :return: 导入的记录数
+        """
+        sql = None
+        rows = []
+        total = 0
+        for obj in objs:
+            if sql is None:
+                entity = entity or entity_of(obj)
+                sql = self._upsert_sql(entity)
+            rows.append(self._row(entity, to_record(obj)))
+            if len(rows) >= batch_size:
+                total += self._commit(sql, rows)
+                rows = []
+        if rows:
+            total += self._commit(sql, rows)
+        return total
+
+    def _commit(self, sql, rows):
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(sql, rows)
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+        return len(rows)
+
+    def flush(self):
+        """
+        提交缓冲区中的全部记录
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self._conn.execute('BEGIN')
+        try:
+            for entity, rows in self._buffers.items():
+                if rows:
+                    self._conn.executemany(self._upsert_sql(entity), rows)
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+        self._buffers = {entity: [] for entity in SCHEMAS}
+        self._pending = 0
+
+    def get(self, entity, obj_id):
+        """
+        按主键读取一条记录
+
+        :param str entity: 'people' / 'status' / 'article'
+        :param obj_id: 记录 ID
+        :return: 记录字典，不存在时返回 None
+        """
+        self.flush()
+        names = [name for name, _ in SCHEMAS[entity]]
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT {", ".join(names)} FROM {_TABLES[entity]} WHERE id = ?', (obj_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = dict(zip(names, row))
+        for name, t in SCHEMAS[entity]:
+            if t == 'list<string>' and record[name] is not None:
+                record[name] = json.loads(record[name])
+            elif t == 'bool' and record[name] is not None:
+                record[name] = bool(record[name])
+        return record
+
+    def count(self, entity):
+        """
+        某种实体的记录数
+        """
+        self.flush()
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM {_TABLES[entity]}').fetchone()[0]
+
+    def statuses_of(self, uid):
+        """
+        某个用户的全部微博 ID，按发布时间排序
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id FROM statuses WHERE user_id = ? ORDER BY created_timestamp', (uid,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        """
+        提交剩余缓冲并关闭数据库
+        """
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
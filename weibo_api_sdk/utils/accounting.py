@@ -0,0 +1,111 @@
+import os
+import sys
+import threading
+from collections import Counter
+
+__all__ = ['FetchAccounting', 'lazy_fetch']
+
+# 这两个目录中的栈帧属于属性读取的实现，统计调用位置时跳过
+_INTERNAL_DIRS = tuple(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), name) + os.sep
+    for name in ('weibo', 'utils')
+)
+
+
+def lazy_fetch(obj, attr):
+    """
+    :any:`normal_attr` 和 :any:`streaming` 中代替 ``obj._get_data()``，
+    启用了 :any:`FetchAccounting` 时记录这次请求是由哪个属性触发的
+    """
+    accounting = getattr(obj._session, 'fetch_accounting', None)
+    if accounting is not None and obj._data is None:
+        accounting.record(obj, attr, sys._getframe(1))
+    obj._get_data()
+
+
+class FetchAccounting:
+    def __init__(self):
+        """
+        统计属性读取触发的网络请求：按类、按属性、按调用位置计数。
+
+        ``normal_attr`` 和 ``streaming`` 属性在没有数据时会自动请求 API，
+        如在循环中读取 ``status.user.name`` 会为每条微博的用户各发一次请求。
+        通过 ``WeiboClient(fetch_accounting=FetchAccounting())`` 启用后，
+        用 :any:`report` 查看是哪些属性读取产生了请求。
+
+        调用位置取 ``weibo_api_sdk.weibo`` 和 ``weibo_api_sdk.utils`` 之外的第一个栈帧，
+        即读取属性的代码所在的文件和行号；属性按调用方直接读取的属性记录，
+        如 ``People.name`` 内部读取 ``userInfo`` 时记为 ``People.name (People.userInfo)``。
+        """
+        self._lock = threading.Lock()
+        self._by_class = Counter()
+        self._by_attribute = Counter()
+        self._by_call_site = Counter()
+
+    def record(self, obj, attr, frame=None):
+        """
+        记录一次请求
+
+        :param obj: 发出请求的对象
+        :param str attr: 触发请求的属性名
+        :param frame: 开始查找调用位置的栈帧，默认为调用方
+        """
+        frame = frame or sys._getframe(1)
+        key = '{0}.{1}'.format(type(obj).__name__, attr)
+        # 找到调用方直接读取的属性
+        entry = None
+        while frame is not None and frame.f_code.co_filename.startswith(_INTERNAL_DIRS):
+            owner = frame.f_locals.get('self')
+            if frame.f_code.co_filename.startswith(_INTERNAL_DIRS[0]) and owner is not None:
+                entry = '{0}.{1}'.format(type(owner).__name__, frame.f_code.co_name)
+            frame = frame.f_back
+        if entry is not None and entry != key:
+            key = '{0} ({1})'.format(entry, key)
+        if frame is None:
+            site = '<unknown>'
+        else:
+            site = '{0}:{1} in {2}'.format(frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+        with self._lock:
+            self._by_class[type(obj).__name__] += 1
+            self._by_attribute[key] += 1
+            self._by_call_site[(key, site)] += 1
+
+    @property
+    def total(self):
+        with self._lock:
+            return sum(self._by_class.values())
+
+    def reset(self):
+        with self._lock:
+            self._by_class.clear()
+            self._by_attribute.clear()
+            self._by_call_site.clear()
+
+    def snapshot(self):
+        """
+        :return: 字典，``total`` 为请求总数，``by_class``、``by_attribute``
+          和 ``by_call_site``（``(类名.属性名, 调用位置)``）为按次数从多到少排列的 ``(键, 次数)`` 列表
+        """
+        with self._lock:
+            return {
+                'total': sum(self._by_class.values()),
+                'by_class': self._by_class.most_common(),
+                'by_attribute': self._by_attribute.most_common(),
+                'by_call_site': self._by_call_site.most_common(),
+            }
+
+    def report(self, top=10):
+        """
+        :param int top: 每部分最多显示的行数
+        :return: 可读的统计报告
+        """
+        snapshot = self.snapshot()
+        lines = ['lazy fetches: {0}'.format(snapshot['total'])]
+        for title, rows in (('by class', snapshot['by_class']),
+                            ('by attribute', snapshot['by_attribute'])):
+            lines.append(title + ':')
+            lines.extend('  {0:>8}  {1}'.format(n, key) for key, n in rows[:top])
+        lines.append('by call site:')
+        lines.extend('  {0:>8}  {1}  <- {2}'.format(n, key, site)
+                     for (key, site), n in snapshot['by_call_site'][:top])
+        return '\n'.join(lines)
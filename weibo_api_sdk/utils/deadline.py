@@ -0,0 +1,128 @@
+import time
+
+from requests.exceptions import Timeout
+
+from .exception import DeadlineExceededException
+
+__all__ = ['Deadline', 'fetch_within', 'paginate', 'paginate_pipeline']
+
+
+class Deadline:
+    def __init__(self, seconds):
+        """
+        端到端的截止时间，可以传给 ``page_from_to()``、``all()``、``pipeline()`` 和 ``headlines_from_to()`` 等方法。
+
+        每个请求的超时时间不超过剩余时间；到期后迭代正常结束，不抛出异常，
+        并把 ``truncated`` 设为 True 表示结果不完整，``stopped_at`` 为未完成的页码。
+
+        :param float seconds: 从现在起的秒数
+        """
+        self.expires_at = time.monotonic() + seconds
+        self.truncated = False
+        self.stopped_at = None
+
+    def remaining(self):
+        """
+        :return: 剩余秒数，已到期时为 0
+        """
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, timeout=None, url=None):
+        """
+        把请求的超时时间限制在剩余时间内
+
+        :param timeout: 原超时时间，可以是秒数或 ``(连接超时, 读取超时)``，None 表示不限
+        :param str url: 请求的网址，用于异常信息
+        :return: 限制后的超时时间
+        :raise DeadlineExceededException: 已经到期
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededException(url)
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    def truncate(self, page_num=None):
+        """
+        标记结果不完整
+        """
+        self.truncated = True
+        if self.stopped_at is None:
+            self.stopped_at = page_num
+
+    def is_deadline_error(self, error):
+        """
+        :return: error 是否由截止时间引起，即到期前的检查或到期时的请求超时
+        """
+        return isinstance(error, DeadlineExceededException) or (isinstance(error, Timeout) and self.expired)
+
+    def __repr__(self):
+        return '<Deadline remaining={0:.3f}s truncated={1}>'.format(self.remaining(), self.truncated)
+
+
+def fetch_within(obj, deadline, fetch, page_num=None):
+    """
+    在截止时间内调用 ``fetch()``，期间 obj 发出的请求都受 deadline 限制。
+
+    已经到期或因截止时间失败时标记 ``deadline.truncated`` 并返回 None，其他异常照常抛出。
+
+    :param obj: 发出请求的对象
+    :param Deadline deadline: 截止时间，为 None 时直接调用
+    :param fetch: 无参数的函数，如读取总页数或获取一页
+    :param int page_num: 标记 ``stopped_at`` 时使用的页码
+    """
+    if deadline is None:
+        return fetch()
+    if deadline.expired:
+        deadline.truncate(page_num)
+        return None
+    obj._deadline = deadline
+    try:
+        return fetch()
+    except Exception as e:
+        if not deadline.is_deadline_error(e):
+            raise
+        deadline.truncate(page_num)
+        return None
+    finally:
+        obj._deadline = None
+
+
+def paginate(obj, page_nums, deadline=None):
+    """
+    依次获取 ``obj.page(page_num)``，供各列表类的 ``page_from_to`` 使用。
+
+    传入 deadline 时，每页的请求都受截止时间限制，到期后停止迭代并标记 ``deadline.truncated``；
+    一页的数据全部取到后才输出，不会输出不完整的页。
+    """
+    for page_num in page_nums:
+        if deadline is None:
+            yield from obj.page(page_num)
+            continue
+        items = fetch_within(obj, deadline, lambda: list(obj.page(page_num)), page_num)
+        if items is None:
+            return
+        yield from items
+
+
+def paginate_pipeline(pages, deadline=None):
+    """
+    按页码顺序输出 :any:`PagePipeline` 的结果，供各列表类的 ``pipeline`` 使用。
+
+    某一页因截止时间失败时停止迭代，标记 ``deadline.truncated``，``stopped_at`` 为该页；
+    之后各抓取线程上的请求在发出前就会因已到期而失败，不会再访问网络。
+    """
+    try:
+        for _, items in pages:
+            yield from items
+    except Exception as e:
+        if deadline is None or not deadline.is_deadline_error(e):
+            raise
+        deadline.truncate(pages.failed_page)
@@ -0,0 +1,156 @@
+import bisect
+import contextlib
+import itertools
+import threading
+import time
+
+from .exception import DeadlineExceededException
+
+__all__ = ['PRIORITIES', 'RequestDispatcher', 'PrioritySession']
+
+# 从高到低
+PRIORITIES = ('interactive', 'normal', 'bulk')
+_RANKS = {name: rank for rank, name in enumerate(PRIORITIES)}
+
+
+class _ClassStats:
+    def __init__(self):
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+
+class RequestDispatcher:
+    def __init__(self, max_concurrency=8, limits=None):
+        """
+        按优先级分配同一个 client 的并发请求名额，线程安全。
+
+        名额空出时总是先给优先级最高、等待最久的请求；``limits`` 限制每个优先级最多占用的名额，
+        默认 ``bulk`` 最多占用 3/4，剩下的名额始终留给 ``interactive`` 和 ``normal`` 请求，
+        这样批量爬取只使用空闲的并发，不会让交互式查询排在一长串批量请求后面。
+
+        优先级见 ``PRIORITIES``，用 :any:`WeiboClient.with_priority` 得到指定优先级的 client。
+
+        :param int max_concurrency: 总的并发请求数
+        :param dict limits: 优先级到最多占用名额数的映射
+        """
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1.')
+        self.max_concurrency = max_concurrency
+        if limits is None:
+            limits = {'bulk': max(1, max_concurrency - max(1, max_concurrency // 4))}
+        for priority in limits:
+            _rank(priority)
+        self.limits = dict(limits)
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._waiters = []
+        self._in_flight = 0
+        self._stats = {priority: _ClassStats() for priority in PRIORITIES}
+
+    def _eligible(self, waiter):
+        """在锁内调用：waiter 是否是下一个可以取得名额的请求"""
+        if self._in_flight >= self.max_concurrency:
+            return False
+        for rank, seq in self._waiters:
+            priority = PRIORITIES[rank]
+            if self._stats[priority].in_flight < self.limits.get(priority, self.max_concurrency):
+                return (rank, seq) == waiter
+        return False
+
+    def acquire(self, priority='normal', timeout=None):
+        """
+        取得一个名额，没有可用名额时按优先级排队等待
+
+        :param str priority: 优先级
+        :param float timeout: 最长等待时间（秒），为 None 时一直等待
+        :raise DeadlineExceededException: 超过 timeout 仍未取得名额
+        """
+        waiter = (_rank(priority), next(self._seq))
+        stats = self._stats[priority]
+        start = time.monotonic()
+        with self._cond:
+            bisect.insort(self._waiters, waiter)
+            stats.waiting += 1
+            try:
+                if not self._cond.wait_for(lambda: self._eligible(waiter), timeout):
+                    raise DeadlineExceededException(priority)
+            finally:
+                self._waiters.remove(waiter)
+                stats.waiting -= 1
+                # 排在前面的请求超时离开后，后面的请求可能可以取得名额
+                self._cond.notify_all()
+            self._in_flight += 1
+            stats.in_flight += 1
+            waited = time.monotonic() - start
+            stats.wait_time += waited
+            stats.max_wait = max(stats.max_wait, waited)
+
+    def release(self, priority='normal'):
+        with self._cond:
+            self._in_flight -= 1
+            stats = self._stats[priority]
+            stats.in_flight -= 1
+            stats.completed += 1
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, priority='normal', timeout=None):
+        """
+        在 with 块中持有一个名额
+        """
+        self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self):
+        """
+        :return: 各优先级的在途请求数、排队数、完成数，以及累计和最长的排队时间（秒）
+        """
+        with self._cond:
+            return {
+                priority: {
+                    'in_flight': s.in_flight,
+                    'waiting': s.waiting,
+                    'completed': s.completed,
+                    'wait_time': s.wait_time,
+                    'max_wait': s.max_wait,
+                }
+                for priority, s in self._stats.items()
+            }
+
+
+def _rank(priority):
+    try:
+        return _RANKS[priority]
+    except KeyError:
+        raise ValueError('unknown priority: %r, expected one of %s' % (priority, ', '.join(PRIORITIES)))
+
+
+class PrioritySession:
+    def __init__(self, session, priority):
+        """
+        共享同一个 Session（连接池、Cookie 和各项设置），只是请求带有不同的优先级。
+        设置属性时写入原 Session。
+
+        :param session: 原 Session
+        :param str priority: 优先级
+        """
+        _rank(priority)
+        if isinstance(session, PrioritySession):
+            session = session._session
+        object.__setattr__(self, '_session', session)
+        object.__setattr__(self, 'request_priority', priority)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._session, name, value)
+
+    def __repr__(self):
+        return '<PrioritySession {0} {1!r}>'.format(self.request_priority, self._session)
@@ -0,0 +1,143 @@
+import re
+from html import unescape
+
+__all__ = ['extract_entities', 'extract_entities_many', 'article_id_from_url']
+
+# 一次扫描把匹配到的片段替换为纯文本（仍未还原实体）并收集实体，没有匹配到的标签最后统一删除。
+# 按微博正文的常见结构分别匹配，每个片段由 lastindex 直接区分类型：
+#   2: @用户  <a href='/n/昵称'>@昵称</a>
+#   3: 话题   <a href="..."><span class="surl-text">#话题#</span></a>
+#   4: 其他链接（短链、头条文章等），其中文字前有图标的话题和超话仍算作话题
+#   5: 表情   <span class="url-icon"><img alt=[笑cry] src="..." /></span>
+#   6: 换行
+_TOKEN_RE = re.compile(
+    r'''<(?:a\b([^>]*)>'''
+    r'''(?:@([^<]*)|(?:<span\b[^>]*>)?#([^<#]+)#(?:</span>)?|(.*?))</a\s*>'''
+    r'''|(?:span class=["']url-icon["']><)?img\b[^>]*?\balt=["']?([^"'\s>]+)["']?[^>]*>(?:</span>)?'''
+    r'''|(br\s*/?>))''',
+    re.S | re.I,
+)
+_TAG_RE = re.compile(r'<[^>]*>')
+_HREF_RE = re.compile(r'''\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.I)
+_DATA_URL_RE = re.compile(r'''\bdata-url\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.I)
+_UID_RE = re.compile(r'/u/(\d+)')
+# 图标之后的 #话题#
+_ICON_HASHTAG_RE = re.compile(r'>#([^<#]+)#<')
+# https://m.weibo.cn/p/index?containerid=2309404178688362029907
+# https://weibo.com/ttarticle/p/show?id=2309404178688362029907
+# https://card.weibo.com/article/m/show/id/2309404178688362029907
+_ARTICLE_ID_RE = re.compile(r'article\S*?(?:[?&]id=|/id/)(\d+)|containerid=(230940\d+)')
+
+
+def _attr(pattern, text):
+    m = pattern.search(text)
+    if m is None:
+        return ''
+    value = m.group(1) or m.group(2) or m.group(3) or ''
+    return unescape(value) if '&' in value else value
+
+
+def _plain(html):
+    """删除标签并还原 HTML 实体"""
+    if '<' in html:
+        html = _TAG_RE.sub('', html)
+    if '&' in html:
+        html = unescape(html)
+    return html
+
+
+def article_id_from_url(url):
+    """
+    从头条文章链接中取出文章 ID，不是文章链接时返回 None
+    """
+    if not url:
+        return None
+    m = _ARTICLE_ID_RE.search(url)
+    if m is None:
+        return None
+    return m.group(1) or m.group(2)
+
+
+def extract_entities(html):
+    """
+    一次扫描微博正文 HTML，得到纯文本和其中的实体。
+
+    - @用户：``<a href='/n/昵称'>@昵称</a>``，链接中带 ``/u/{uid}`` 时一并取出 uid
+    - 话题：链接文字为 ``#话题#``，文字前可能有图标；超话链接（``containerid=100808...``，没有 ``#``）也算作话题
+    - 链接：其他 ``<a>``，优先取短链 ``data-url``
+    - 头条文章：指向文章页面的链接，取出文章 ID
+    - 表情图片替换为 ``alt`` 文字（如 ``[笑cry]``），``<br />`` 替换为换行
+
+    :param str html: ``status.text``
+    :return: 字典，包括 ``text``、``mentions``（``(昵称, uid)`` 列表，uid 未知时为 None）、
+      ``hashtags``、``urls`` 和 ``article_ids``
+    """
+    mentions = []
+    hashtags = []
+    urls = []
+    article_ids = []
+
+    def replace(m):
+        kind = m.lastindex
+        if kind == 2:
+            attrs, name = m.group(1, 2)
+            uid = _UID_RE.search(attrs) if '/u/' in attrs else None
+            mentions.append((unescape(name) if '&' in name else name,
+                             int(uid.group(1)) if uid else None))
+            return '@' + name
+        if kind == 3:
+            tag = m.group(3)
+            hashtags.append(unescape(tag) if '&' in tag else tag)
+            return '#' + tag + '#'
+        if kind == 4:
+            attrs, html_inner = m.group(1, 4)
+            inner = _TAG_RE.sub('', html_inner) if '<' in html_inner else html_inner
+            if '#' in inner or 'containerid=100808' in attrs:
+                tag = _ICON_HASHTAG_RE.search(html_inner)
+                if tag is not None:
+                    tag = tag.group(1)
+                    hashtags.append(unescape(tag) if '&' in tag else tag)
+                    return inner
+                # 超话：指向 containerid=100808... 的页面，文字前是超话图标，没有 #
+                if 'containerid=100808' in attrs:
+                    hashtags.append((unescape(inner) if '&' in inner else inner).strip())
+                    return inner
+            url = ((_attr(_DATA_URL_RE, attrs) if 'data-url' in attrs else '')
+                   or (_attr(_HREF_RE, attrs) if 'href' in attrs else ''))
+            if url:
+                urls.append(url)
+            if 'article' in attrs or 'containerid=230940' in attrs:
+                article_id = article_id_from_url(attrs)
+                if article_id:
+                    article_ids.append(article_id)
+            return inner
+        if kind == 5:
+            return m.group(5)
+        return '\n'
+
+    # 每种片段只在其触发字符出现时才处理：没有 '<' 的正文不扫描，
+    # 匹配到的片段中只在出现 '/u/'、'#'、'data-url'、'href'、'article'、'&' 时才继续解析。
+    # 替换结果仍是转义的文本，最后统一删除剩余标签并还原实体
+    if not html:
+        text = ''
+    elif '<' in html:
+        text = _plain(_TOKEN_RE.sub(replace, html))
+    else:
+        text = unescape(html) if '&' in html else html
+    return {
+        'text': text,
+        'mentions': mentions,
+        'hashtags': hashtags,
+        'urls': urls,
+        'article_ids': article_ids,
+    }
+
+
+def extract_entities_many(htmls):
+    """
+    批量处理一页微博的正文
+
+    :param htmls: ``status.text`` 的可迭代对象，也可以直接传入 :any:`Status` 对象
+    :return: 与输入顺序一致的 :any:`extract_entities` 结果列表
+    """
+    return [extract_entities(getattr(html, 'text', html)) for html in htmls]
@@ -1,3 +1,4 @@
+import json
 from json import JSONDecodeError
 
 __all__ = [
@@ -9,9 +10,15 @@ __all__ = [
     'WeiboException',
     'UnexpectedResponseException',
     'GetDataErrorException',
+    'ResponseTooLargeException',
+    'AntiCrawlException',
+    'ThrottledException',
+    'CaptchaRequiredException',
+    'LoginRequiredException',
     'NeedCaptchaException',
     'NeedLoginException',
     'IdMustBeIntException',
+    'DeadlineExceededException',
     'UnimplementedException',
     'JSONDecodeError',
 ]
@@ -21,22 +28,42 @@ class WeiboException(Exception):
     pass
 
 
+# 异常中最多保留的响应内容字符数，避免大量出错时占用过多内存
+MAX_ERROR_BODY = 512
+
+
+def _truncate(body):
+    if isinstance(body, bytes):
+        body = body[:MAX_ERROR_BODY * 4].decode('utf-8', errors='replace')
+    return body[:MAX_ERROR_BODY]
+
+
 class UnexpectedResponseException(WeiboException):
-    def __init__(self, url, res, expect):
+    def __init__(self, url, res, expect, body=None):
         """
         服务器回复了和预期格式不符的数据
 
+        异常只保留状态码和响应内容的前 ``MAX_ERROR_BODY`` 个字符，不保留响应对象本身。
+
         :param str url: 当前尝试访问的网址
         :param request.Response res: 服务器的回复
         :param str expect: 一个用来说明期望服务器回复的数据格式的字符串
+        :param body: 已经读取的响应内容（str 或 bytes），默认取 ``res.text``
         """
         self.url = url
-        self.res = res
         self.expect = expect
+        status_code = getattr(res, 'status_code', None)
+        self.status_code = status_code if isinstance(status_code, int) else None
+        if body is None:
+            try:
+                body = res.text
+            except Exception:
+                body = ''
+        self.body = _truncate(body) if isinstance(body, (str, bytes)) else ''
 
     def __repr__(self):
         return (f'Get an unexpected response when visit url [{self.url}], '
-                f'we expect [{self.expect}], but the response body is {self.res.text}')
+                f'we expect [{self.expect}], but the response body is {self.body}')
 
     __str__ = __repr__
 
@@ -60,17 +87,17 @@ class UnimplementedException(WeiboException):
 
 
 class GetDataErrorException(UnexpectedResponseException):
-    def __init__(self, url, res, expect):
+    def __init__(self, url, res, expect, body=None):
         """
         :class:`UnexpectedResponseException` 的子类，
-        尝试获取服务器给出的错误信息。如果获取失败则显示父类的出错信息。
+        尝试从响应内容中获取服务器给出的错误信息。如果获取失败则显示父类的出错信息。
 
         ..  seealso:: :class:`UnexpectedResponseException`
         """
-        super().__init__(url, res, expect)
+        super().__init__(url, res, expect, body)
         try:
-            self.reason = res.json()['error']['message']
-        except (JSONDecodeError, KeyError):
+            self.reason = json.loads(self.body)['error']['message']
+        except (JSONDecodeError, KeyError, TypeError):
             self.reason = None
 
     def __repr__(self):
@@ -83,6 +110,56 @@ class GetDataErrorException(UnexpectedResponseException):
     __str__ = __repr__
 
 
+class ResponseTooLargeException(GetDataErrorException):
+    def __init__(self, url, res, expect, size, limit, body=None):
+        """
+        响应内容超过 ``max_response_bytes``，已停止读取
+
+        :param int size: 响应大小（Content-Length）或停止读取时已读到的字节数
+        :param int limit: 允许的最大字节数
+        """
+        super().__init__(url, res, expect, body if body is not None else '')
+        self.size = size
+        self.limit = limit
+
+    def __repr__(self):
+        return f'Response of url [{self.url}] is larger than {self.limit} bytes (got {self.size})'
+
+    __str__ = __repr__
+
+
+class AntiCrawlException(GetDataErrorException):
+    """
+    服务器返回了反爬虫页面（HTML）而不是 JSON 数据，读到页面开头即停止
+    """
+
+    what = 'an anti-crawl page'
+
+    def __repr__(self):
+        return (f'Got {self.what} (status {self.status_code}) when visit url [{self.url}], '
+                f'the response body starts with {self.body[:200]!r}')
+
+    __str__ = __repr__
+
+
+class ThrottledException(AntiCrawlException):
+    """请求过于频繁（HTTP 418 / 429 或提示操作频繁的页面），应降低请求速度"""
+
+    what = 'throttled'
+
+
+class CaptchaRequiredException(AntiCrawlException):
+    """需要输入验证码"""
+
+    what = 'a captcha page'
+
+
+class LoginRequiredException(AntiCrawlException):
+    """被重定向到登录页面，需要有效的 Cookie"""
+
+    what = 'a login page'
+
+
 class TokenError(WeiboException):
     def __init__(self, msg):
         self._msg = msg
@@ -131,6 +208,21 @@ class IdMustBeIntException(WeiboException):
     __str__ = __repr__
 
 
+class DeadlineExceededException(WeiboException):
+    def __init__(self, url):
+        """
+        截止时间已过，没有再发出请求
+
+        :param str url: 当前尝试访问的网址
+        """
+        self.url = url
+
+    def __repr__(self):
+        return f'Deadline exceeded before requesting url [{self.url}]'
+
+    __str__ = __repr__
+
+
 class WeiboWarning(UserWarning):
     def __init__(self, message, *args, **kwargs):
         super().__init__(*args)
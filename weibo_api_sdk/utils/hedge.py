@@ -0,0 +1,166 @@
+import collections
+import itertools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from .exception import ResponseTooLargeException
+
+__all__ = ['HedgePolicy']
+
+
+def _close_loser(future):
+    """没有被采用的请求结束后关闭响应，释放连接"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _read_body(res, max_bytes):
+    """
+    在对冲的请求中读完 ``stream=True`` 的响应，之后 ``iter_content`` 从内存中读取。
+    超过 ``max_bytes`` 时停止读取并抛出 :any:`ResponseTooLargeException`。
+    """
+    if not isinstance(res, requests.Response):
+        return
+    chunks = []
+    size = 0
+    for chunk in res.iter_content(65536):
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            res.close()
+            raise ResponseTooLargeException(res.url, res, 'a response within max_response_bytes',
+                                            size, max_bytes, body=chunks[0] if chunks else chunk)
+        chunks.append(chunk)
+    res._content = b''.join(chunks)
+
+
+class HedgePolicy:
+    def __init__(self, endpoints=('people', 'status'), percentile=0.95, initial_delay=1.0, min_delay=0.05,
+                 window=200, min_samples=20, budget_ratio=0.05, max_tokens=10.0, sessions=None, workers=8,
+                 read_body=True):
+        """
+        对冲请求：请求超过最近耗时的 ``percentile`` 分位数仍未返回时，再发一次相同的请求，
+        采用先返回的结果，另一个请求未开始时取消，已发出时在结束后关闭响应。
+
+        对冲的总量受预算限制：每个请求积累 ``budget_ratio`` 个令牌（最多 ``max_tokens`` 个），
+        每次对冲消耗一个，即长期来看最多对冲 ``budget_ratio`` 比例的请求。
+
+        请求以 ``stream=True`` 发出，收到响应头时响应内容还没有传输。``read_body`` 为 True（默认）时
+        在对冲的请求中读完响应内容，耗时样本、对冲的等待时间和"先返回者胜出"都按完整响应计算，
+        响应内容传输慢的请求同样会被对冲；为 False 时只计算到收到响应头，内容传输慢不会触发对冲，
+        也不计入耗时样本。
+
+        通过 ``WeiboClient(hedge_policy=HedgePolicy())`` 启用，只对 ``endpoints`` 中的接口类型生效。
+
+        :param endpoints: 接口类型，见 :any:`Base._endpoint`，默认为用户详情和微博详情
+        :param float percentile: 按最近耗时的哪个分位数决定何时对冲
+        :param float initial_delay: 样本不足 ``min_samples`` 个时的对冲等待时间（秒）
+        :param float min_delay: 最短的对冲等待时间（秒）
+        :param int window: 每个接口类型保留的最近耗时样本数
+        :param int min_samples: 按分位数计算等待时间所需的最少样本数
+        :param float budget_ratio: 每个请求积累的对冲令牌数
+        :param float max_tokens: 最多积累的令牌数
+        :param sessions: 对冲请求使用的 Session 列表（如其他账号的 Cookie），轮流使用；
+          默认使用原 Session 连接池中的另一个连接
+        :param int workers: 执行请求的线程数，应不少于同时发出请求的线程数的两倍
+        :param bool read_body: 是否在对冲的请求中读完响应内容
+        """
+        self.endpoints = frozenset(endpoints)
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.budget_ratio = budget_ratio
+        self.max_tokens = max_tokens
+        self._sessions = itertools.cycle(sessions) if sessions else None
+        self._workers = workers
+        self.read_body = read_body
+        self._executor = None
+        self._lock = threading.Lock()
+        self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self._tokens = max_tokens
+        self.stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'budget_exhausted': 0}
+
+    def delay(self, endpoint):
+        """
+        :return: 该接口类型当前的对冲等待时间（秒）
+        """
+        with self._lock:
+            samples = sorted(self._latencies[endpoint])
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        index = min(len(samples) - 1, int(self.percentile * len(samples)))
+        return max(self.min_delay, samples[index])
+
+    def _observe(self, endpoint, latency):
+        with self._lock:
+            self._latencies[endpoint].append(latency)
+
+    def _try_spend(self):
+        with self._lock:
+            if self._tokens < 1:
+                self.stats['budget_exhausted'] += 1
+                return False
+            self._tokens -= 1
+            self.stats['hedged'] += 1
+            return True
+
+    def _timed(self, session, endpoint, max_bytes, kwargs):
+        start = time.monotonic()
+        res = session.request(**kwargs)
+        if self.read_body:
+            _read_body(res, max_bytes)
+        self._observe(endpoint, time.monotonic() - start)
+        return res
+
+    def request(self, session, endpoint, max_bytes=None, **kwargs):
+        """
+        发出请求，超时未返回时对冲
+
+        :param session: 原请求的 Session
+        :param str endpoint: 接口类型
+        :param int max_bytes: 读完响应内容时允许的最大字节数，见 ``read_body``
+        :param kwargs: ``session.request`` 的参数
+        :return: 先返回的响应，``read_body`` 为 True 时已读完内容
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='weibo-hedge')
+            self.stats['requests'] += 1
+            self._tokens = min(self.max_tokens, self._tokens + self.budget_ratio)
+        primary = self._executor.submit(self._timed, session, endpoint, max_bytes, kwargs)
+        done, _ = wait([primary], timeout=self.delay(endpoint))
+        if done or not self._try_spend():
+            return primary.result()
+        with self._lock:
+            hedge_session = next(self._sessions) if self._sessions else session
+        hedge = self._executor.submit(self._timed, hedge_session, endpoint, max_bytes, kwargs)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    if future is primary or error is None:
+                        error = future.exception()
+                    continue
+                for other in pending:
+                    if not other.cancel():
+                        other.add_done_callback(_close_loser)
+                if future is hedge:
+                    with self._lock:
+                        self.stats['hedge_wins'] += 1
+                return future.result()
+        raise error
+
+    def close(self):
+        """
+        关闭执行请求的线程池
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
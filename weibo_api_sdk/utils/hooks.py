@@ -0,0 +1,80 @@
+import threading
+
+__all__ = ['HOOK_EVENTS', 'RequestEvent', 'RequestHooks']
+
+# before_request: 发出请求前；抛出异常可以取消本次请求（如预算用尽）
+# after_response: 收到响应后，JSON 解析前
+# on_decode:      JSON 解析成功后
+# on_error:       请求异常或 JSON 解析失败，随后异常会继续抛出
+HOOK_EVENTS = ('before_request', 'after_response', 'on_decode', 'on_error')
+
+
+class RequestEvent:
+    __slots__ = ('obj', 'object_type', 'endpoint', 'method', 'url', 'started_at',
+                 'latency', 'status_code', 'size', 'decode_time', 'error', 'extra')
+
+    def __init__(self, obj, endpoint, method, url, started_at):
+        """
+        一次请求的信息，同一个对象依次传给该请求的所有钩子
+
+        - ``obj``：发出请求的对象，如 :any:`People`；``object_type`` 为它的类名
+        - ``endpoint``：接口类型，如 ``follows``、``statuses``
+        - ``started_at``：``time.perf_counter()`` 的值
+        - ``latency``：请求耗时（秒），收到响应或请求异常后设置
+        - ``status_code``、``size``：HTTP 状态码和响应字节数
+        - ``decode_time``：JSON 解析耗时（秒）
+        - ``error``：异常
+        - ``extra``：供钩子之间传递数据的字典
+        """
+        self.obj = obj
+        self.object_type = type(obj).__name__
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+        self.started_at = started_at
+        self.latency = None
+        self.status_code = None
+        self.size = None
+        self.decode_time = None
+        self.error = None
+        self.extra = {}
+
+    def __repr__(self):
+        return '<RequestEvent {0} {1} latency={2}>'.format(self.object_type, self.url, self.latency)
+
+
+class RequestHooks:
+    def __init__(self):
+        """
+        请求生命周期钩子，事件见 ``HOOK_EVENTS``。钩子以 :any:`RequestEvent` 为唯一参数，
+        在发出请求的线程中同步调用，钩子抛出的异常会传给调用方。
+
+        注册和删除时复制列表，调用时只读取一个 tuple，不需要加锁。
+        """
+        self._lock = threading.Lock()
+        self._hooks = {event: () for event in HOOK_EVENTS}
+
+    def add(self, event, hook):
+        """
+        :param str event: 事件名，见 ``HOOK_EVENTS``
+        :param hook: 以 :any:`RequestEvent` 为参数的函数
+        :return: hook，便于用作装饰器
+        """
+        if event not in self._hooks:
+            raise ValueError('unknown hook event: %r, expected one of %s' % (event, ', '.join(HOOK_EVENTS)))
+        with self._lock:
+            self._hooks[event] = self._hooks[event] + (hook,)
+        return hook
+
+    def remove(self, event, hook):
+        with self._lock:
+            hooks = list(self._hooks[event])
+            hooks.remove(hook)
+            self._hooks[event] = tuple(hooks)
+
+    def fire(self, event, request_event):
+        for hook in self._hooks[event]:
+            hook(request_event)
+
+    def __bool__(self):
+        return any(self._hooks.values())
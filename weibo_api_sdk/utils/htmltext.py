@@ -0,0 +1,219 @@
+import codecs
+import json
+import re
+from html.parser import HTMLParser
+
+__all__ = ['HtmlTextExtractor', 'iter_text_chunks', 'iter_json_string', 'read_json_object']
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_SPECIAL_RE = re.compile(r'[\\"]')
+_SPACE_RE = re.compile(r'\s+')
+# 查找 key 时保留的上一块末尾，保证跨块的 key 也能匹配
+_KEY_TAIL = 256
+
+
+class HtmlTextExtractor(HTMLParser):
+    # 这些标签结束时输出一个段落
+    BLOCK_TAGS = frozenset((
+        'p', 'div', 'br', 'li', 'ul', 'ol', 'blockquote', 'pre', 'section', 'article',
+        'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'table', 'figcaption',
+    ))
+    # 这些标签内的文字不输出
+    SKIP_TAGS = frozenset(('script', 'style', 'noscript'))
+
+    def __init__(self, max_paragraph_size=65536):
+        """
+        增量地把 HTML 转为纯文本段落。每次 :any:`feed` 一段 HTML，返回其中已经
+        完整的段落，内存中只保留当前未结束的段落。
+
+        :param int max_paragraph_size: 单个段落的最大字符数，超过时提前输出，
+          避免没有分段的超长正文占用过多内存
+        """
+        super().__init__(convert_charrefs=True)
+        self._max_paragraph_size = max_paragraph_size
+        self._parts = []
+        self._size = 0
+        self._skip = 0
+        self._ready = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+        elif tag in self.BLOCK_TAGS:
+            self._end_paragraph()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in self.BLOCK_TAGS:
+            self._end_paragraph()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.BLOCK_TAGS:
+            self._end_paragraph()
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= self._max_paragraph_size:
+            self._end_paragraph()
+
+    def _end_paragraph(self):
+        if self._parts:
+            text = _SPACE_RE.sub(' ', ''.join(self._parts)).strip()
+            if text:
+                self._ready.append(text)
+            self._parts = []
+            self._size = 0
+
+    def feed(self, data):
+        """
+        :param str data: 一段 HTML
+        :return: 已经完整的段落列表
+        """
+        super().feed(data)
+        ready, self._ready = self._ready, []
+        return ready
+
+    def close(self):
+        """
+        :return: 剩余的段落列表
+        """
+        super().close()
+        self._end_paragraph()
+        ready, self._ready = self._ready, []
+        return ready
+
+
+def iter_text_chunks(byte_chunks, encoding='utf-8'):
+    """
+    把字节块增量解码为字符串块，多字节字符被切开时留到下一块
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def _find_key(chunks, key, opener):
+    """
+    在 JSON 文本流中找到 ``"key": <opener>``，返回其后剩余的文本；没有找到时返回 None。
+
+    JSON 字符串中的引号都会被转义，所以不带反斜杠的 ``"key":`` 只会是真正的键。
+    """
+    pattern = re.compile(r'"%s"\s*:\s*%s' % (re.escape(key), re.escape(opener)))
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        m = pattern.search(buffer)
+        if m:
+            return buffer[m.end():]
+        buffer = buffer[-_KEY_TAIL:]
+    return None
+
+
+def iter_json_string(chunks, key):
+    """
+    在 JSON 文本流中找到第一个 ``"key": "..."``，逐段解码并输出它的字符串值，
+    不需要把整个响应读入内存。
+
+    :param chunks: 字符串块的迭代器，如 :any:`iter_text_chunks` 的结果
+    :param str key: 键名
+    :return: 解码后字符串片段的生成器；没有找到该键时不输出任何内容
+    """
+    chunks = iter(chunks)
+    rest = _find_key(chunks, key, '"')
+    if rest is None:
+        return
+    pending = ''
+    for chunk in _prepend(rest, chunks):
+        text = pending + chunk
+        pending = ''
+        out = []
+        pos = 0
+        while True:
+            m = _SPECIAL_RE.search(text, pos)
+            if m is None:
+                out.append(text[pos:])
+                break
+            out.append(text[pos:m.start()])
+            if m.group() == '"':
+                yield ''.join(out)
+                return
+            i = m.start()
+            if i + 1 >= len(text):
+                pending = text[i:]
+                break
+            c = text[i + 1]
+            if c != 'u':
+                out.append(_ESCAPES.get(c, c))
+                pos = i + 2
+                continue
+            # \uXXXX，高位代理需要和下一个 \uXXXX 组成一个字符
+            if i + 6 > len(text):
+                pending = text[i:]
+                break
+            code = int(text[i + 2:i + 6], 16)
+            if 0xd800 <= code < 0xdc00:
+                if i + 12 > len(text):
+                    pending = text[i:]
+                    break
+                if text[i + 6:i + 8] == '\\u':
+                    low = int(text[i + 8:i + 12], 16)
+                    out.append(chr(0x10000 + ((code - 0xd800) << 10) + (low - 0xdc00)))
+                    pos = i + 12
+                    continue
+            out.append(chr(code))
+            pos = i + 6
+        if out:
+            yield ''.join(out)
+
+
+def read_json_object(chunks, key):
+    """
+    在 JSON 文本流中找到第一个 ``"key": {...}`` 并解析该对象，读到对象结尾即停止，
+    不会继续消费后面的内容。
+
+    :param chunks: 字符串块的迭代器
+    :param str key: 键名
+    :return: dict，没有找到该键时返回 None
+    """
+    chunks = iter(chunks)
+    rest = _find_key(chunks, key, '{')
+    if rest is None:
+        return None
+    parts = ['{']
+    depth = 1
+    in_string = escaped = False
+    for chunk in _prepend(rest, chunks):
+        for i, c in enumerate(chunk):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif c == '\\':
+                    escaped = True
+                elif c == '"':
+                    in_string = False
+            elif c == '"':
+                in_string = True
+            elif c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+                if depth == 0:
+                    parts.append(chunk[:i + 1])
+                    return json.loads(''.join(parts))
+        parts.append(chunk)
+    return None
+
+
+def _prepend(first, chunks):
+    if first:
+        yield first
+    yield from chunks
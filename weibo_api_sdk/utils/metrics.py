@@ -0,0 +1,224 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+__all__ = ['Histogram', 'RequestMetrics']
+
+# 耗时分桶的上界（秒），1ms 到 60s 大致按 2 倍递增
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        固定分桶的直方图，内存占用与样本数无关，分位数在桶内线性插值估计。
+        不是线程安全的，由 :any:`RequestMetrics` 加锁调用。
+
+        :param buckets: 递增的桶上界
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        :param float q: 0 到 1 之间
+        :return: 估计的 q 分位数，没有样本时为 None
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - seen) / n
+                return min(max(value, self.min), self.max)
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+        }
+
+
+class _EndpointMetrics:
+    def __init__(self):
+        self.latency = Histogram()
+        self.decode = Histogram()
+        self.status_codes = {}
+        self.bytes = 0
+        self.errors = 0
+        self.retries = 0
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    def __init__(self):
+        """
+        按接口类型（如 ``follows``、``statuses``、``people``）统计请求：耗时直方图、
+        响应字节数、状态码、JSON 解析耗时、请求异常和重试次数。线程安全。
+
+        通过 ``WeiboClient(metrics=RequestMetrics())`` 启用，未启用时请求路径上
+        只多一次属性查找。
+        """
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _get(self, endpoint):
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = _EndpointMetrics()
+        return metrics
+
+    def observe(self, endpoint, latency, status_code=None, size=0, decode_time=None, error=False):
+        """
+        记录一次完成的请求
+
+        :param str endpoint: 接口类型
+        :param float latency: 请求耗时（秒）
+        :param int status_code: HTTP 状态码
+        :param int size: 响应字节数
+        :param float decode_time: JSON 解析耗时（秒）
+        :param bool error: 收到了响应但被拒绝（如 ``after_response`` 钩子抛出异常），计入请求异常
+        """
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.latency.observe(latency)
+            if error:
+                metrics.errors += 1
+            metrics.status_codes[status_code] = metrics.status_codes.get(status_code, 0) + 1
+            metrics.bytes += size
+            if decode_time is not None:
+                metrics.decode.observe(decode_time)
+
+    def record_error(self, endpoint, latency):
+        """
+        记录一次没有得到响应的请求（如连接超时）
+        """
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.latency.observe(latency)
+            metrics.errors += 1
+
+    def record_retry(self, endpoint, n=1):
+        with self._lock:
+            self._get(endpoint).retries += n
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def snapshot(self):
+        """
+        :return: 接口类型到统计字典的映射，包括 ``requests``、``errors``、``retries``、
+          ``bytes``、``status_codes``，以及 ``latency`` 和 ``decode_time`` 的
+          count / mean / p50 / p95 / p99 / max（秒）
+        """
+        with self._lock:
+            return {
+                endpoint: {
+                    'requests': m.latency.count,
+                    'errors': m.errors,
+                    'retries': m.retries,
+                    'bytes': m.bytes,
+                    'status_codes': dict(m.status_codes),
+                    'latency': m.latency.summary(),
+                    'decode_time': m.decode.summary(),
+                }
+                for endpoint, m in self._endpoints.items()
+            }
+
+    def to_prometheus(self, prefix='weibo'):
+        """
+        :return: Prometheus 文本格式的指标
+        """
+        lines = []
+
+        def histogram(name, help_text, attr):
+            lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+            lines.append('# TYPE %s_%s histogram' % (prefix, name))
+            for endpoint, m in self._endpoints.items():
+                h = getattr(m, attr)
+                label = 'endpoint="%s"' % _escape(endpoint)
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append('%s_%s_bucket{%s,le="%r"} %d' % (prefix, name, label, bound, cumulative))
+                lines.append('%s_%s_bucket{%s,le="+Inf"} %d' % (prefix, name, label, h.count))
+                lines.append('%s_%s_sum{%s} %r' % (prefix, name, label, h.sum))
+                lines.append('%s_%s_count{%s} %d' % (prefix, name, label, h.count))
+
+        def counter(name, help_text, values):
+            lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+            lines.append('# TYPE %s_%s counter' % (prefix, name))
+            for labels, value in values:
+                label = ','.join('%s="%s"' % (k, _escape(v)) for k, v in labels)
+                lines.append('%s_%s{%s} %d' % (prefix, name, label, value))
+
+        with self._lock:
+            endpoints = self._endpoints
+            histogram('request_duration_seconds', 'Request latency in seconds.', 'latency')
+            histogram('decode_duration_seconds', 'JSON decode time in seconds.', 'decode')
+            counter('response_bytes_total', 'Response body bytes.',
+                    [((('endpoint', e),), m.bytes) for e, m in endpoints.items()])
+            counter('responses_total', 'Responses by status code.',
+                    [((('endpoint', e), ('code', code)), n)
+                     for e, m in endpoints.items() for code, n in m.status_codes.items()])
+            counter('request_errors_total', 'Requests that got no response.',
+                    [((('endpoint', e),), m.errors) for e, m in endpoints.items()])
+            counter('request_retries_total', 'Retried requests.',
+                    [((('endpoint', e),), m.retries) for e, m in endpoints.items()])
+        return '\n'.join(lines) + '\n'
+
+    def serve_prometheus(self, port, host=''):
+        """
+        在后台线程中启动 HTTP 服务，供 Prometheus 抓取 ``/metrics``
+
+        :return: ``ThreadingHTTPServer``，调用 ``shutdown()`` 停止
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -1,5 +1,7 @@
 import functools
 
+from .accounting import lazy_fetch
+
 __all__ = ['normal_attr']
 
 
@@ -49,7 +51,7 @@ def normal_attr(name_in_json=None):
                 if name == 'id':
                     return func(self, *args, **kwargs)
 
-                self._get_data()
+                lazy_fetch(self, func.__name__)
                 # noinspection PyTypeChecker
                 if self._data:
                     return use_data_or_func(name, self._data)
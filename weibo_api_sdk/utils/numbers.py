@@ -0,0 +1,62 @@
+import math
+import re
+from array import array
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['parse_count', 'parse_counts']
+
+# 262.6万 / 1.2亿 / 3千 / 1,234 / 100万+
+_COUNT_RE = re.compile(r'^(\d[\d,]*(?:\.\d+)?)(万|亿|千)?\+?$')
+
+_UNITS = {None: 1, '千': 1000, '万': 10000, '亿': 100000000}
+
+
+@lru_cache(maxsize=65536)
+def _parse(text):
+    m = _COUNT_RE.match(text.strip())
+    if m is None:
+        return None
+    number, unit = m.groups()
+    number = number.replace(',', '')
+    if unit is None and '.' not in number:
+        return int(number)
+    # 262.6 * 10000 用浮点数计算会得到 2625999.99...，需要四舍五入
+    return int(round(float(number) * _UNITS[unit]))
+
+
+def parse_count(value, default=None):
+    """
+    把微博返回的计数转为整数，如 ``"262.6万"`` -> 2626000，``"1.2亿"`` -> 120000000。
+    相同字符串的解析结果会被缓存。
+
+    :param value: 整数或计数字符串
+    :param default: 为空或无法解析时的返回值
+    :rtype: int
+    """
+    if value is None or isinstance(value, bool):
+        return default
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if math.isfinite(value) else default
+    result = _parse(str(value))
+    return default if result is None else result
+
+
+def parse_counts(values, default=0):
+    """
+    批量转换一整列计数，如导出的 ``followers_count`` 列。
+
+    :param values: 整数或计数字符串的可迭代对象
+    :param int default: 为空或无法解析的位置填充的值
+    :return: 安装了 numpy 时为 int64 的 ``numpy.ndarray``，否则为 ``array('q')``
+    """
+    counts = (parse_count(value, default) for value in values)
+    if np is not None:
+        return np.fromiter(counts, dtype=np.int64)
+    return array('q', counts)
@@ -0,0 +1,119 @@
+import threading
+
+__all__ = ['PagePipeline']
+
+
+class PagePipeline:
+    def __init__(self, fetch_page, page_nums, workers=2, max_buffered=4):
+        """
+        有界的生产者/消费者分页流水线。
+
+        若干抓取线程调用 ``fetch_page(page_num)`` 获取并解析页面，结果放入
+        有界缓冲区，消费者按页码顺序取出。这样网络 I/O 与下游处理（解析、写库）
+        可以重叠进行，同时缓冲区满时抓取线程会阻塞等待（背压），内存占用有上限。
+
+        消费者提前停止迭代（``break`` 或异常）时，流水线会通知抓取线程不再
+        领取新的页面，并等待正在进行中的请求结束。
+
+        :param fetch_page: 抓取并解析一页的函数，参数为页码，返回该页的对象列表
+        :param page_nums: 需要抓取的页码序列
+        :param int workers: 抓取线程数
+        :param int max_buffered: 最多同时缓冲（含正在抓取）的页数，不小于 ``workers``
+        """
+        if workers < 1:
+            raise ValueError('workers must be at least 1.')
+        self._fetch_page = fetch_page
+        self._page_nums = iter(page_nums)
+        self._workers = workers
+        self._max_buffered = max(max_buffered, workers)
+        self._slots = threading.Semaphore(self._max_buffered)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._results = {}
+        self._next_seq = 0
+        self._total = None
+        self._threads = []
+        # 抓取失败、在迭代时抛出异常的页码
+        self.failed_page = None
+
+    def _take(self):
+        """领取下一个待抓取的页码，返回 ``(序号, 页码)``，已取完返回 None"""
+        with self._cond:
+            if self._total is not None:
+                return None
+            try:
+                page_num = next(self._page_nums)
+            except StopIteration:
+                self._total = self._next_seq
+                self._cond.notify_all()
+                return None
+            seq = self._next_seq
+            self._next_seq += 1
+            return seq, page_num
+
+    def _run(self):
+        while not self._stop.is_set():
+            # 缓冲区已满时在这里阻塞，定期醒来检查是否已取消
+            if not self._slots.acquire(timeout=0.1):
+                continue
+            task = None if self._stop.is_set() else self._take()
+            if task is None:
+                self._slots.release()
+                return
+            seq, page_num = task
+            try:
+                result = (page_num, self._fetch_page(page_num), None)
+            except Exception as e:
+                result = (page_num, None, e)
+            with self._cond:
+                self._results[seq] = result
+                self._cond.notify_all()
+
+    def start(self):
+        if not self._threads:
+            for _ in range(self._workers):
+                t = threading.Thread(target=self._run, daemon=True)
+                t.start()
+                self._threads.append(t)
+        return self
+
+    def close(self):
+        """
+        取消流水线：不再抓取新的页面，丢弃已缓冲的结果，并等待抓取线程退出。
+        """
+        self._stop.set()
+        with self._cond:
+            self._results.clear()
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join()
+
+    def __iter__(self):
+        """
+        按页码顺序产出 ``(page_num, items)``。某一页抓取失败时，
+        在轮到该页时抛出对应的异常。
+        """
+        self.start()
+        seq = 0
+        try:
+            while True:
+                with self._cond:
+                    while seq not in self._results:
+                        if self._total is not None and seq >= self._total:
+                            return
+                        self._cond.wait()
+                    page_num, items, error = self._results.pop(seq)
+                self._slots.release()
+                if error is not None:
+                    self.failed_page = page_num
+                    raise error
+                yield page_num, items
+                seq += 1
+        finally:
+            self.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,130 @@
+import itertools
+import json
+
+import requests
+
+from .exception import (
+    CaptchaRequiredException,
+    GetDataErrorException,
+    JSONDecodeError,
+    LoginRequiredException,
+    ResponseTooLargeException,
+    ThrottledException,
+)
+
+__all__ = ['ResponseBody', 'read_json']
+
+# 判断响应类型时读取的字节数
+SNIFF_BYTES = 4096
+# 触发限流时微博返回 418，也可能是标准的 429
+THROTTLE_STATUS = frozenset((418, 429))
+
+_CAPTCHA_MARKERS = ('captcha', 'verifycode', 'geetest', '验证码')
+_LOGIN_MARKERS = ('passport.weibo', 'login', '登录')
+_THROTTLE_MARKERS = ('频繁', 'too many requests')
+
+
+def _classify(url, res, expect, head):
+    """根据状态码、最终 URL 和页面开头判断反爬虫页面的类型"""
+    status_code = getattr(res, 'status_code', None)
+    if status_code in THROTTLE_STATUS:
+        return ThrottledException(url, res, expect, body=head)
+    text = head.decode('utf-8', errors='replace').lower()
+    final_url = str(getattr(res, 'url', '') or '').lower()
+    if any(marker in text or marker in final_url for marker in _CAPTCHA_MARKERS):
+        return CaptchaRequiredException(url, res, expect, body=head)
+    # 限流页面上一般也有登录链接，先按限流判断
+    if any(marker in text for marker in _THROTTLE_MARKERS):
+        return ThrottledException(url, res, expect, body=head)
+    if any(marker in text or marker in final_url for marker in _LOGIN_MARKERS):
+        return LoginRequiredException(url, res, expect, body=head)
+    return GetDataErrorException(url, res, expect, body=head)
+
+
+def _looks_like_html(head, content_type):
+    start = head.lstrip()[:1]
+    if start in (b'{', b'['):
+        return False
+    return start == b'<' or 'html' in content_type
+
+
+class ResponseBody:
+    def __init__(self, url, res, expect, max_bytes=None, chunk_size=SNIFF_BYTES):
+        """
+        以流的方式逐块读取 ``stream=True`` 发出的请求的响应内容。
+
+        读取第一块时检查状态码和页面开头，反爬虫页面抛出的异常与 :any:`read_json` 相同；
+        累计读取超过 ``max_bytes`` 时抛出 :any:`ResponseTooLargeException`。
+        不负责关闭响应。
+
+        :param str url: 请求的网址
+        :param res: 响应
+        :param str expect: 期望的数据格式，用于异常信息
+        :param int max_bytes: 响应的最大字节数，None 表示不限
+        :param int chunk_size: 每块的字节数，第一块用于判断响应类型
+        """
+        self.url = url
+        self.response = res
+        self.expect = expect
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        # 已读取的字节数
+        self.size = 0
+
+    def _too_large(self, size, head=None):
+        return ResponseTooLargeException(self.url, self.response, self.expect, size, self.max_bytes, body=head)
+
+    def __iter__(self):
+        res = self.response
+        chunks = res.iter_content(self.chunk_size)
+        head = None
+        if isinstance(res, requests.Response):
+            length = res.headers.get('Content-Length')
+            if self.max_bytes is not None and length and length.isdigit() and int(length) > self.max_bytes:
+                raise self._too_large(int(length))
+            head = next(chunks, b'')
+            if res.status_code in THROTTLE_STATUS or _looks_like_html(
+                    head, res.headers.get('Content-Type', '').lower()):
+                raise _classify(self.url, res, self.expect, head)
+            chunks = itertools.chain((head,), chunks)
+        elif getattr(res, 'status_code', None) in THROTTLE_STATUS:
+            raise ThrottledException(self.url, res, self.expect)
+        for chunk in chunks:
+            self.size += len(chunk)
+            if self.max_bytes is not None and self.size > self.max_bytes:
+                raise self._too_large(self.size, head)
+            yield chunk
+
+
+def read_json(url, res, expect, max_bytes=None):
+    """
+    读取 ``stream=True`` 发出的请求的响应并解析 JSON。
+
+    先读取开头的 ``SNIFF_BYTES`` 字节：状态码为 418 / 429，或者内容是 HTML 页面时
+    立即关闭连接，按页面内容抛出 :any:`ThrottledException`、:any:`CaptchaRequiredException`、
+    :any:`LoginRequiredException` 或 :any:`GetDataErrorException`；读取过程中超过
+    ``max_bytes`` 时抛出 :any:`ResponseTooLargeException`。异常中只保留响应开头的内容。
+
+    不是 ``requests.Response`` 的响应对象（如自定义的 Session）直接调用 ``res.json()``。
+
+    :param str url: 请求的网址
+    :param res: 响应
+    :param str expect: 期望的数据格式，用于异常信息
+    :param int max_bytes: 响应的最大字节数，None 表示不限
+    :return: 解析后的 JSON 数据
+    """
+    if not isinstance(res, requests.Response):
+        if getattr(res, 'status_code', None) in THROTTLE_STATUS:
+            raise ThrottledException(url, res, expect)
+        try:
+            return res.json()
+        except JSONDecodeError:
+            raise GetDataErrorException(url, res, expect)
+    try:
+        body = b''.join(ResponseBody(url, res, expect, max_bytes))
+    finally:
+        res.close()
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise GetDataErrorException(url, res, expect, body=body)
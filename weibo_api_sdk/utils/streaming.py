@@ -1,6 +1,8 @@
 import functools
 import copy
 
+from .accounting import lazy_fetch
+
 __all__ = ['StreamingJSON', 'streaming']
 
 
@@ -141,7 +143,7 @@ def streaming(name_in_json=None, use_cache=True):
             if use_cache and self._cache and name in self._cache:
                 cache = self._cache[name]
             else:
-                self._get_data()
+                lazy_fetch(self, func.__name__)
                 if self._data and name in self._data:
                     cache = self._data[name]
                 else:
@@ -0,0 +1,138 @@
+import calendar
+import re
+import time
+from functools import lru_cache
+
+__all__ = ['parse_created_at', 'parse_created_at_many']
+
+# 微博返回的时间均为北京时间
+_CST_OFFSET = 8 * 3600
+
+_MONTHS = {name: i for i, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+
+# Sat Mar 15 12:30:00 +0800 2025
+_RFC_RE = re.compile(
+    r'^\w{3} (\w{3}) (\d{1,2}) (\d{1,2}):(\d{2}):(\d{2}) ([+-])(\d{2})(\d{2}) (\d{4})$')
+# 2025-03-15 / 2025-03-15 12:30 / 2025-03-15 12:30:00
+_YMD_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})(?: (\d{1,2}):(\d{2})(?::(\d{2}))?)?$')
+# 03-15 / 03-15 12:30，为今年
+_MD_RE = re.compile(r'^(\d{1,2})-(\d{1,2})(?: (\d{1,2}):(\d{2}))?$')
+# 5秒前 / 5分钟前 / 5小时前 / 5天前
+_AGO_RE = re.compile(r'^(\d+)\s*(秒|分钟|小时|天)前$')
+# 今天 12:30 / 昨天 12:30 / 前天 12:30
+_DAY_RE = re.compile(r'^(今天|昨天|前天)\s*(\d{1,2}):(\d{2})$')
+
+_AGO_UNITS = {'秒': 1, '分钟': 60, '小时': 3600, '天': 86400}
+_DAY_OFFSETS = {'今天': 0, '昨天': 1, '前天': 2}
+
+
+def _cst_epoch(year, month, day, hour=0, minute=0, second=0):
+    return calendar.timegm((year, month, day, hour, minute, second)) - _CST_OFFSET
+
+
+def _valid(month, day, hour=0, minute=0, second=0, year=2000):
+    """年份未知时按闰年检查，允许 02-29"""
+    return (1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]
+            and 0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 60)
+
+
+@lru_cache(maxsize=65536)
+def _parse(value):
+    """
+    解析时间字符串，结果与当前时间无关，可以缓存：
+
+    - ``('abs', epoch)``：绝对时间
+    - ``('ago', seconds)``：距当前时间的秒数
+    - ``('day', days, hour, minute)``：几天前的某个时刻
+    - ``('md', month, day, hour, minute)``：今年的某个时刻
+    - ``None``：无法识别，或日期、时刻超出范围
+    """
+    value = value.strip()
+    if value == '刚刚':
+        return 'ago', 0
+    m = _AGO_RE.match(value)
+    if m:
+        return 'ago', int(m.group(1)) * _AGO_UNITS[m.group(2)]
+    m = _DAY_RE.match(value)
+    if m:
+        hour, minute = int(m.group(2)), int(m.group(3))
+        if not _valid(1, 1, hour, minute):
+            return None
+        return 'day', _DAY_OFFSETS[m.group(1)], hour, minute
+    m = _MD_RE.match(value)
+    if m:
+        month, day, hour, minute = (int(g or 0) for g in m.groups())
+        if not _valid(month, day, hour, minute):
+            return None
+        return 'md', month, day, hour, minute
+    m = _YMD_RE.match(value)
+    if m:
+        year, month, day, hour, minute, second = (int(g or 0) for g in m.groups())
+        if not _valid(month, day, hour, minute, second, year=max(year, 1)):
+            return None
+        return 'abs', _cst_epoch(year, month, day, hour, minute, second)
+    m = _RFC_RE.match(value)
+    if m and m.group(1) in _MONTHS:
+        month, day, hour, minute, second, sign, tz_h, tz_m, year = m.groups()
+        if not _valid(_MONTHS[month], int(day), int(hour), int(minute), int(second), year=max(int(year), 1)):
+            return None
+        offset = (int(tz_h) * 3600 + int(tz_m) * 60) * (1 if sign == '+' else -1)
+        epoch = calendar.timegm((int(year), _MONTHS[month], int(day),
+                                 int(hour), int(minute), int(second)))
+        return 'abs', epoch - offset
+    return None
+
+
+def _resolve(parsed, now):
+    kind = parsed[0]
+    if kind == 'abs':
+        return parsed[1]
+    if kind == 'ago':
+        return now - parsed[1]
+    # 以北京时间的日历日期计算
+    today = time.gmtime(now + _CST_OFFSET)
+    if kind == 'day':
+        _, days, hour, minute = parsed
+        return _cst_epoch(today.tm_year, today.tm_mon, today.tm_mday, hour, minute) - days * 86400
+    _, month, day, hour, minute = parsed
+    epoch = _cst_epoch(today.tm_year, month, day, hour, minute)
+    # 年初看到的 12-31 属于去年
+    if epoch > now + 86400:
+        epoch = _cst_epoch(today.tm_year - 1, month, day, hour, minute)
+    return epoch
+
+
+def parse_created_at(value, now=None):
+    """
+    把微博返回的 ``created_at`` 转为 Unix 时间戳（秒）。
+
+    支持 ``刚刚``、``5分钟前``、``3小时前``、``昨天 12:30``、``03-15``、
+    ``2025-03-15`` 和 ``Sat Mar 15 12:30:00 +0800 2025`` 等格式，
+    没有时区的时间按北京时间处理。相同字符串的解析结果会被缓存。
+
+    :param str value: 时间字符串
+    :param int now: 计算相对时间时的当前时间戳，默认为当前时间
+    :return: 时间戳，无法识别时返回 None
+    """
+    if not value:
+        return None
+    parsed = _parse(value)
+    if parsed is None:
+        return None
+    if now is None:
+        now = int(time.time())
+    return _resolve(parsed, now)
+
+
+def parse_created_at_many(values, now=None):
+    """
+    批量转换一页微博或导出的一整列 ``created_at``，所有相对时间使用同一个当前时间。
+
+    :param values: 时间字符串的可迭代对象
+    :param int now: 计算相对时间时的当前时间戳，默认为当前时间
+    :return: 时间戳列表，无法识别的位置为 None
+    """
+    if now is None:
+        now = int(time.time())
+    return [parse_created_at(value, now) for value in values]
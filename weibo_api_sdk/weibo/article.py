@@ -1,7 +1,17 @@
+import functools
 import math
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.deadline import fetch_within, paginate, paginate_pipeline
+from ..utils.entities import article_id_from_url, extract_entities
+from ..utils.exception import GetDataErrorException
+from ..utils.htmltext import HtmlTextExtractor, iter_json_string, iter_text_chunks, read_json_object
 from ..utils.normal import normal_attr
+from ..utils.pipeline import PagePipeline
 from ..utils.streaming import streaming
+from ..utils.timeparse import parse_created_at
 from .base import Base
+from .pic import Pic
 from ..config.urls import (
     ARTICLE_DETAIL_URL,
     ARTICLE_LIST_URL
@@ -32,6 +42,44 @@ class Article(Base):
         """
         return None
 
+    def iter_text(self, chunk_size=16384, max_paragraph_size=65536):
+        """
+        流式获取文章正文，逐段输出纯文本。
+
+        边下载边从 JSON 中解码 ``content`` 字段并转为纯文本，内存中只保留当前段落，
+        不会把几百 KB 的 HTML 整个读入内存。正文已经加载过时直接从内存中转换。
+        :param chunk_size: 每次从网络读取的字节数
+        :param max_paragraph_size: 单个段落的最大字符数，超过时提前输出
+        :return: 段落字符串的生成器
+        """
+        extractor = HtmlTextExtractor(max_paragraph_size)
+        if self._data is not None:
+            yield from extractor.feed(self.content or '')
+            yield from extractor.close()
+            return
+        self._record_fetch('iter_text')
+        with self._stream(chunk_size) as body:
+            for piece in iter_json_string(iter_text_chunks(body), 'content'):
+                yield from extractor.feed(piece)
+            yield from extractor.close()
+
+    def fetch_config(self, chunk_size=4096):
+        """
+        只获取文章的 ``config``（标题、作者、阅读数等），不下载正文。
+
+        流式读取响应，解析到 ``config`` 对象结尾即关闭连接；之后读取
+        :any:`title` 等属性不会再发出请求。
+        :param chunk_size: 每次从网络读取的字节数
+        :return: self
+        """
+        self._record_fetch('fetch_config')
+        with self._stream(chunk_size) as body:
+            config = read_json_object(iter_text_chunks(body), 'config')
+        if config is None:
+            raise GetDataErrorException(body.url, body.response, self._expect() + ' with config')
+        self._cache = dict(self._cache or {}, config=config)
+        return self
+
     @property
     def title(self):
         """
@@ -114,6 +162,8 @@ class Articles(Base):
     def __init__(self, uid, cache, session):
         super().__init__(uid, cache, session)
         self._page_num = 1
+        # 最近一次 headlines() / headlines_from_to() 中获取失败而跳过的文章，(文章 ID, 异常) 列表
+        self.failed_articles = []
 
     def _build_url(self):
         return ARTICLE_LIST_URL.format(id=self._id, page_num=self._page_num)
@@ -151,17 +201,18 @@ class Articles(Base):
         :return: 
         """
         from .people import People
-        from .status import Status
+        from .status import Status, _video_of
         self.refresh()
         self._page_num = page_num
         for card in filter(lambda x: hasattr(x, 'mblog'), self._cards):
             mblog = card.mblog
             raw_data = mblog.raw_data()
-            # 该article实际也是status，只是在内容中可能会存在文章链接
-            # TODO：后期解析出文章内容中的真实文章链接，取出头条文章
+            # 该article实际也是status，只是在内容中可能会存在文章链接，
+            # 真实的头条文章 ID 记录在 article_ids 中，用 headlines() 获取文章详情
             article = Status(mblog.id, None, self._session)
             article.text = raw_data.get('text')
             article.created_at = raw_data.get('created_at')
+            article.created_timestamp = parse_created_at(article.created_at)
             article.source = raw_data.get('mblog.source')
             article.thumbnail_pic = raw_data.get('thumbnail_pic')
             article.bmiddle_pic = raw_data.get('bmiddle_pic')
@@ -169,22 +220,122 @@ class Articles(Base):
             article.is_paid = raw_data.get('is_paid')
             article.user = People(mblog.user.id, None, self._session)
             article.pic_urls = [pic.get('url') for pic in raw_data.get('pics', [])]
+            article.pics = [Pic(pic.get('url'), pic, self._session) for pic in raw_data.get('pics', [])]
+            article.video = _video_of(raw_data, self._session)
+            article.article_ids = self._article_ids(raw_data)
             yield article
 
-    def page_from_to(self, from_page, to_page):
+    @staticmethod
+    def _article_ids(raw_data):
+        """微博正文和卡片（page_info）中的头条文章 ID"""
+        ids = extract_entities(raw_data.get('text'))['article_ids']
+        page_info = raw_data.get('page_info') or {}
+        article_id = article_id_from_url(page_info.get('page_url'))
+        if article_id:
+            ids.append(article_id)
+        return ids
+
+    def headlines(self, page_num=1, workers=4, deadline=None):
+        """
+        获取某一页文章微博中链接的头条文章，并发请求文章详情
+        :param page_num: 页数
+        :param workers: 同时请求文章详情的最大线程数
+        :param deadline: 可选的 :any:`Deadline`，到期时未取到的文章被跳过并标记 ``deadline.truncated``
+        :return: 已加载 ``config`` 的 :any:`Article` 列表，按出现顺序去重；
+          已删除、付费等无法获取的文章被跳过，记录在 :any:`failed_articles` 中
+        """
+        return self._fetch_articles(
+            (aid for status in self.page_from_to(page_num, page_num, deadline) for aid in status.article_ids),
+            workers, deadline)
+
+    def headlines_from_to(self, from_page, to_page, workers=4, deadline=None):
+        """
+        获取从第from_page页到第to_page页的文章微博中链接的头条文章，
+        各页之间也会去重
+        :param from_page: int 开始页
+        :param to_page: int 结束页
+        :param workers: 同时请求文章详情的最大线程数
+        :param deadline: 可选的 :any:`Deadline`
+        :return: 已加载 ``config`` 的 :any:`Article` 列表，无法获取的文章记录在 :any:`failed_articles` 中
+        """
+        return self._fetch_articles(
+            (aid for status in self.page_from_to(from_page, to_page, deadline) for aid in status.article_ids),
+            workers, deadline)
+
+    def _fetch_articles(self, article_ids, workers, deadline=None):
+        article_ids = list(dict.fromkeys(article_ids))
+        self.failed_articles = []
+        if not article_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(workers, len(article_ids))) as executor:
+            results = list(executor.map(lambda aid: self._fetch_article(aid, deadline), article_ids))
+        self.failed_articles = [(aid, result) for aid, result in zip(article_ids, results)
+                                if isinstance(result, GetDataErrorException)]
+        return [result for result in results if isinstance(result, Article)]
+
+    def _fetch_article(self, article_id, deadline=None):
+        """
+        只请求一篇文章的 ``config``，供多个线程并发调用
+
+        :return: :any:`Article`；截止时间已到时返回 None；
+          文章无法获取（:any:`GetDataErrorException`）时返回该异常，不影响其他文章
+        """
+        article = Article(article_id, None, self._session)
+        article._deadline = deadline
+        try:
+            article.fetch_config()
+        except GetDataErrorException as e:
+            return e
+        except Exception as e:
+            if deadline is None or not deadline.is_deadline_error(e):
+                raise
+            deadline.truncate()
+            return None
+        finally:
+            article._deadline = None
+        return article
+
+    def page_from_to(self, from_page, to_page, deadline=None):
         """
         获取从第from_page页到第to_page页的所有文章微博
         :param from_page: int 开始页
         :param to_page: int 结束页
+        :param deadline: 可选的 :any:`Deadline`，到期后停止并标记 ``deadline.truncated``
         :return: 
         """
-        for page_num in range(from_page, to_page + 1):
-            for article in self.page(page_num):
-                yield article
+        for article in paginate(self, range(from_page, to_page + 1), deadline):
+            yield article
+
+    def pipeline(self, from_page, to_page, workers=2, max_buffered=4, deadline=None):
+        """
+        以流水线方式获取从第from_page页到第to_page页的所有文章微博，
+        后台线程预取后续页面，与调用方的处理过程重叠进行
+        :param from_page: int 开始页
+        :param to_page: int 结束页
+        :param workers: 抓取线程数
+        :param max_buffered: 最多缓冲的页数，缓冲区满时暂停抓取
+        :param deadline: 可选的 :any:`Deadline`，到期后停止并标记 ``deadline.truncated``
+        :return: 
+        """
+        fetch_page = self._fetch_page
+        if deadline is not None:
+            fetch_page = functools.partial(self._fetch_page, deadline=deadline)
+        pages = PagePipeline(fetch_page, range(from_page, to_page + 1), workers, max_buffered)
+        return paginate_pipeline(pages, deadline)
+
+    def _fetch_page(self, page_num, deadline=None):
+        """在独立的对象上获取一页，供多个抓取线程并发调用"""
+        articles = Articles(self._id, None, self._session)
+        articles._deadline = deadline
+        return list(articles.page(page_num))
 
-    def all(self):
+    def all(self, deadline=None):
         """
         获取用户的所有文章
+        :param deadline: 可选的 :any:`Deadline`
         :return: 
         """
-        return self.page_from_to(1, self._pages + 1)
+        pages = fetch_within(self, deadline, lambda: self._pages)
+        if pages is None:
+            return iter(())
+        return self.page_from_to(1, pages + 1, deadline)
@@ -1,9 +1,38 @@
 import abc
+import contextlib
+import sys
+import time
 
-from ..utils.exception import GetDataErrorException, JSONDecodeError
+import requests
+
+from ..utils.hooks import RequestEvent
+from ..utils.response import ResponseBody, read_json
 from ..utils.normal import normal_attr
 
 
+def _response_size(res):
+    """响应字节数：已从连接读取的字节数，未读取时为 Content-Length"""
+    if isinstance(res, requests.Response):
+        try:
+            read = res.raw.tell()
+        except (AttributeError, OSError, ValueError):
+            read = 0
+        if read:
+            return read
+        length = res.headers.get('Content-Length')
+        return int(length) if length and length.isdigit() else None
+    try:
+        return len(res.content)
+    except TypeError:
+        return 0
+
+
+def _close(res):
+    close = getattr(res, 'close', None)
+    if close is not None:
+        close()
+
+
 class Base:
     def __init__(self, weibo_obj_id, cache, session):
         """
@@ -32,6 +61,7 @@ class Base:
         self._session = session
         self._data = None
         self._refresh_times = 0
+        self._deadline = None
 
     @property
     @normal_attr()
@@ -51,31 +81,197 @@ class Base:
         data 从 :any:`_build_data` 中获取。
 
         :raise: 当返回的数据无法被解析成 JSON
-          或 JSON 中含有 'message' 字段时，会抛出 :any:`GetDataErrorException`
+          或 JSON 中含有 'message' 字段时，会抛出 :any:`GetDataErrorException`；
+          返回反爬虫页面或响应过大时抛出它的子类，见 :any:`read_json`
         """
         if self._data is None:
             url = self._build_url()
-            res = self._session.request(
-                self._method(),
+            if (getattr(self._session, 'concurrency_limiter', None) is None
+                    and getattr(self._session, 'dispatcher', None) is None):
+                self._fetch(url)
+                return
+            with self._slots() as slot:
+                self._fetch(url)
+                # 被限流时接口返回 {"ok": 0} 且没有 data
+                if slot is not None and isinstance(self._data, dict) and self._data.get('ok') == 0:
+                    slot.throttle()
+
+    @contextlib.contextmanager
+    def _slots(self):
+        """
+        按 client 设置的 dispatcher 和 concurrency_limiter 排队，with 块中持有名额
+
+        :return: 接口的并发名额，没有设置 concurrency_limiter 时为 None
+        """
+        limiter = getattr(self._session, 'concurrency_limiter', None)
+        dispatcher = getattr(self._session, 'dispatcher', None)
+        with contextlib.ExitStack() as stack:
+            # 先按优先级排队，取得名额后才占用接口的并发名额，
+            # 否则排队中的 bulk 请求会占着接口的名额，同一接口的 interactive 请求只能等它
+            if dispatcher is not None:
+                priority = getattr(self._session, 'request_priority', 'normal')
+                stack.enter_context(dispatcher.slot(priority, self._wait_timeout()))
+            slot = None
+            if limiter is not None:
+                slot = stack.enter_context(limiter.slot(self._endpoint(), self._wait_timeout()))
+            yield slot
+
+    def _wait_timeout(self):
+        """等待并发名额的最长时间，即截止时间前剩余的时间"""
+        return self._deadline.remaining() if self._deadline is not None else None
+
+    def _fetch(self, url):
+        metrics = getattr(self._session, 'metrics', None)
+        hooks = getattr(self._session, 'request_hooks', None)
+        if metrics is None and not hooks:
+            res = self._request(url)
+            self._data = self._decode(url, res)
+            return
+        with self._traced_response(url, metrics, hooks or None) as res:
+            self._data = self._decode(url, res)
+
+    @contextlib.contextmanager
+    def _stream(self, chunk_size):
+        """
+        以流的方式请求 :any:`_build_url`，with 块中逐块读取响应内容，供只需要部分内容的方法使用。
+
+        与 :any:`_get_data` 一样按优先级和接口并发排队，受超时和截止时间限制，计入请求统计和钩子；
+        反爬虫页面和超过 ``max_response_bytes`` 的响应抛出的异常见 :any:`ResponseBody`。
+        离开 with 块时关闭响应。
+
+        :param int chunk_size: 每次从网络读取的字节数
+        :return: :any:`ResponseBody`
+        """
+        url = self._build_url()
+        metrics = getattr(self._session, 'metrics', None)
+        hooks = getattr(self._session, 'request_hooks', None) or None
+        max_bytes = getattr(self._session, 'max_response_bytes', None)
+        with self._slots():
+            with self._traced_response(url, metrics, hooks) as res:
+                try:
+                    yield ResponseBody(url, res, self._expect(), max_bytes, chunk_size)
+                finally:
+                    res.close()
+
+    def _record_fetch(self, attr):
+        """
+        直接发出请求的方法（而不是读取属性）也计入 :any:`FetchAccounting`
+
+        :param str attr: 方法名
+        """
+        accounting = getattr(self._session, 'fetch_accounting', None)
+        if accounting is not None:
+            accounting.record(self, attr, sys._getframe(1))
+
+    def _expect(self):
+        """异常信息中期望的数据格式"""
+        return 'a valid Weibo {0} JSON data'.format(self.__class__.__name__)
+
+    def _timeout(self, url=None):
+        """
+        本次请求的超时时间：client 设置的 ``timeout``，并且不超过截止时间的剩余时间
+
+        :raise DeadlineExceededException: 截止时间已过
+        """
+        timeout = getattr(self._session, 'request_timeout', None)
+        if self._deadline is not None:
+            timeout = self._deadline.timeout(timeout, url)
+        return timeout
+
+    def _request(self, url):
+        timeout = self._timeout(url)
+        hedge_policy = getattr(self._session, 'hedge_policy', None)
+        if hedge_policy is not None and self._endpoint() in hedge_policy.endpoints:
+            return hedge_policy.request(
+                self._session,
+                self._endpoint(),
+                max_bytes=getattr(self._session, 'max_response_bytes', None),
+                method=self._method(),
                 url=url,
                 params=self._build_params(),
                 data=self._build_data(),
+                timeout=timeout,
+                stream=True,
             )
-            e = GetDataErrorException(
-                url,
-                res,
-                'a valid Weibo {0} JSON data'.format(self.__class__.__name__),
-            )
-            try:
-                json_data = res.json()
-                # 微博 API 返回格式: {"ok": 1, "data": {...}}
-                # 提取 data 字段作为实际数据
-                if isinstance(json_data, dict) and 'data' in json_data:
-                    self._data = json_data['data']
-                else:
-                    self._data = json_data
-            except JSONDecodeError:
-                raise e
+        return self._session.request(
+            self._method(),
+            url=url,
+            params=self._build_params(),
+            data=self._build_data(),
+            timeout=timeout,
+            stream=True,
+        )
+
+    def _decode(self, url, res):
+        json_data = read_json(
+            url,
+            res,
+            self._expect(),
+            getattr(self._session, 'max_response_bytes', None),
+        )
+        # 微博 API 返回格式: {"ok": 1, "data": {...}}
+        # 提取 data 字段作为实际数据
+        if isinstance(json_data, dict) and 'data' in json_data:
+            return json_data['data']
+        return json_data
+
+    @contextlib.contextmanager
+    def _traced_response(self, url, metrics, hooks):
+        """
+        发出请求，with 块中读取响应；启用了请求统计或钩子时记录请求和读取的耗时、响应大小
+        """
+        if metrics is None and hooks is None:
+            yield self._request(url)
+            return
+        event = RequestEvent(self, self._endpoint(), self._method(), url, time.perf_counter())
+        if hooks is not None:
+            hooks.fire('before_request', event)
+            # 钩子的耗时不计入请求
+            event.started_at = time.perf_counter()
+        try:
+            res = self._request(url)
+        except Exception as error:
+            event.latency = time.perf_counter() - event.started_at
+            event.error = error
+            if metrics is not None:
+                metrics.record_error(event.endpoint, event.latency)
+            if hooks is not None:
+                hooks.fire('on_error', event)
+            raise
+        event.latency = time.perf_counter() - event.started_at
+        status_code = getattr(res, 'status_code', None)
+        event.status_code = status_code if isinstance(status_code, int) else None
+        # 响应以流的方式读取，此时只有 Content-Length，读取完成后再更新为实际大小
+        event.size = _response_size(res)
+        rejected = False
+        decode_start = time.perf_counter()
+        try:
+            if hooks is not None:
+                # 钩子抛出异常即拒绝这个响应，与解析失败一样触发 on_error 并关闭响应
+                rejected = True
+                hooks.fire('after_response', event)
+                rejected = False
+                decode_start = time.perf_counter()
+            yield res
+        except Exception as error:
+            event.error = error
+            if rejected:
+                _close(res)
+            raise
+        finally:
+            event.decode_time = time.perf_counter() - decode_start
+            event.size = _response_size(res)
+            if metrics is not None:
+                metrics.observe(event.endpoint, event.latency, status_code=event.status_code,
+                                size=event.size or 0, decode_time=event.decode_time, error=rejected)
+            if hooks is not None:
+                hooks.fire('on_decode' if event.error is None else 'on_error', event)
+
+    def _endpoint(self):
+        """
+        子类可以重载这一函数，提供统计请求时使用的接口类型，默认为小写的类名。
+        """
+        return self.__class__.__name__.lower()
 
     @abc.abstractmethod
     def _build_url(self):
@@ -1,5 +1,9 @@
+import functools
 import math
 
+from ..utils.deadline import fetch_within, paginate, paginate_pipeline
+from ..utils.numbers import parse_count
+from ..utils.pipeline import PagePipeline
 from ..utils.streaming import streaming
 from .base import Base
 from ..config.urls import (
@@ -60,18 +64,18 @@ class People(Base):
     @property
     def followers_count(self):
         """
-        他的粉丝数
-        :return: 
+        他的粉丝数，"262.6万" 这类缩写已转为整数
+        :return: int
         """
-        return self.userInfo.followers_count
+        return parse_count(self.userInfo.followers_count)
 
     @property
     def follow_count(self):
         """
         他关注的用户数量
-        :return: 
+        :return: int
         """
-        return self.userInfo.follow_count
+        return parse_count(self.userInfo.follow_count)
 
     @property
     def followers(self):
@@ -135,6 +139,9 @@ class Peoples(Base):
             return FOLLOWS_LIST_URL.format(id=self._id, page_num=self._page_num)
         return FOLLOWERS_LIST_URL.format(id=self._id, page_num=self._page_num)
 
+    def _endpoint(self):
+        return 'follows' if self._utype == 'follow' else 'followers'
+
     @property
     @streaming(name_in_json='cards')
     def _cards(self):
@@ -160,6 +167,7 @@ class Peoples(Base):
         :return: 
         """
         p = People(self._id, None, self._session)
+        p._deadline = self._deadline
         peoples_num = p.followers_count if self._utype == "follower" else p.follow_count
         return peoples_num
 
@@ -184,23 +192,50 @@ class Peoples(Base):
             fan = People(card.user.id, cache, self._session)
             yield fan
 
-    def page_from_to(self, from_page, to_page):
+    def page_from_to(self, from_page, to_page, deadline=None):
         """
         获取从第 from_page 页 到第 to_page 页的粉丝 or 关注的用户
         :param from_page: 
         :param to_page: 
+        :param deadline: 可选的 :any:`Deadline`，到期后停止并标记 ``deadline.truncated``
+        :return: 
+        """
+        for fan in paginate(self, range(from_page, to_page + 1), deadline):
+            yield fan
+
+    def pipeline(self, from_page, to_page, workers=2, max_buffered=4, deadline=None):
+        """
+        以流水线方式获取从第 from_page 页 到第 to_page 页的粉丝 or 关注的用户，
+        后台线程预取后续页面，与调用方的处理过程重叠进行
+        :param from_page: 
+        :param to_page: 
+        :param workers: 抓取线程数
+        :param max_buffered: 最多缓冲的页数，缓冲区满时暂停抓取
+        :param deadline: 可选的 :any:`Deadline`，到期后停止并标记 ``deadline.truncated``
         :return: 
         """
-        for page_num in range(from_page, to_page + 1):
-            for fan in self.page(page_num):
-                yield fan
+        fetch_page = self._fetch_page
+        if deadline is not None:
+            fetch_page = functools.partial(self._fetch_page, deadline=deadline)
+        pages = PagePipeline(fetch_page, range(from_page, to_page + 1), workers, max_buffered)
+        return paginate_pipeline(pages, deadline)
+
+    def _fetch_page(self, page_num, deadline=None):
+        """在独立的对象上获取一页，供多个抓取线程并发调用"""
+        peoples = Peoples(self._id, None, self._session, utype=self._utype)
+        peoples._deadline = deadline
+        return list(peoples.page(page_num))
 
-    def all(self):
+    def all(self, deadline=None):
         """
         获取他的所有粉丝列表，目前看来API只允许获取250页粉丝(5000个)
         or 获取他的所有关注的用户，限制显示10页他关注的用户(200个)
+        :param deadline: 可选的 :any:`Deadline`
         :return: 
         """
-        if self._utype == 'follow':
-            return self.page_from_to(1, self._pages + 1) if self._pages < 10 else self.page_from_to(1, 10)
-        return self.page_from_to(1, self._pages + 1) if self._pages < 250 else self.page_from_to(1, 250)
+        pages = fetch_within(self, deadline, lambda: self._pages)
+        if pages is None:
+            return iter(())
+        max_pages = 10 if self._utype == 'follow' else 250
+        to_page = pages + 1 if pages < max_pages else max_pages
+        return self.page_from_to(1, to_page, deadline)
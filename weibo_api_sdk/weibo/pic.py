@@ -1,10 +1,209 @@
+import os
+import re
+import threading
+from urllib.parse import urlparse
+
 from .base import Base
 
+__all__ = ['Pic', 'MediaPolicy', 'media_filename']
+
+# 新浪图床的尺寸，按宽度从小到大排列，large 为原图
+VARIANTS = (
+    ('thumbnail', 180),
+    ('orj360', 360),
+    ('bmiddle', 440),
+    ('mw690', 690),
+    ('mw1024', 1024),
+    ('mw2000', 2000),
+    ('large', None),
+)
+_VARIANT_WIDTHS = dict(VARIANTS)
+# https://wx1.sinaimg.cn/orj360/006abc.jpg
+_SINAIMG_RE = re.compile(r'^(https?://[^/]+\.sinaimg\.cn/)([^/]+)(/[^/]+)$')
+
+
+def media_filename(url):
+    """
+    图片、视频在本地保存的相对路径，取 URL 路径的最后两段，
+    如 ``https://wx1.sinaimg.cn/large/006abc.jpg`` -> ``large/006abc.jpg``，
+    同一张图片的不同尺寸不会互相覆盖
+    """
+    parts = [p for p in urlparse(url).path.split('/') if p and p not in ('.', '..')]
+    return os.path.join(*parts[-2:]) if parts else 'media'
+
 
 class Pic(Base):
     def __init__(self, id, cache, session):
+        """
+        微博图片
+
+        :param id: 图片 URL
+        :param dict cache: 微博列表中该图片的原始数据（``pics`` 中的一项），可为空
+        :param session: 网络请求 Session
+        """
         super().__init__(id, cache, session)
 
     def _build_url(self):
-        pass
+        return self._id
+
+    @property
+    def url(self):
+        """
+        图片 URL
+        """
+        return self._id
+
+    @property
+    def filename(self):
+        """
+        本地保存的相对路径
+        """
+        return media_filename(self._id)
+
+    @property
+    def width(self):
+        """
+        原图宽度，取自 ``large.geo.width``，未知时为 None
+        """
+        geo = ((self._cache or {}).get('large') or {}).get('geo') or {}
+        try:
+            return int(geo.get('width'))
+        except (TypeError, ValueError):
+            return None
+
+    def variant(self, name):
+        """
+        同一张图片其他尺寸的 URL，不是新浪图床的地址时原样返回
+
+        :param str name: 尺寸，见 ``VARIANTS``，如 ``orj360``、``mw690``、``large``
+        :return: URL
+        """
+        if name not in _VARIANT_WIDTHS:
+            raise ValueError('unknown variant: %r' % name)
+        m = _SINAIMG_RE.match(self._id or '')
+        if m is None:
+            return self._id
+        return m.group(1) + name + m.group(3)
+
+    def select(self, policy=None):
+        """
+        按下载策略选择尺寸
+
+        :param MediaPolicy policy: 默认使用 client 上设置的 ``media_policy``
+        :return: 选中尺寸的 :any:`Pic`，没有策略时返回自身
+        """
+        policy = policy or getattr(self._session, 'media_policy', None)
+        return policy.select(self) if policy is not None else self
+
+    def download(self, directory, **kwargs):
+        """
+        下载到 directory，参数见 :any:`MediaDownloader`
+
+        :return: 下载结果，见 :any:`MediaDownloader.download`
+        """
+        from ..crawler.media import MediaDownloader
+        return MediaDownloader(self._session, directory, **kwargs).download(self)
+
+
+class MediaPolicy:
+    def __init__(self, min_width=None, max_bytes=None, timeout=10):
+        """
+        图片尺寸选择策略：在满足要求的尺寸中选择最小的一个，减少下载流量。
+
+        - ``min_width``：选择宽度不小于 min_width 的最小尺寸；原图本身更窄时，
+          宽度不小于原图的尺寸与原图相同，同样满足要求
+        - ``max_bytes``：用 HEAD 请求探测文件大小，选择不超过 max_bytes 的最大尺寸，
+          同时设置 min_width 时不会超过按宽度选出的尺寸。先探测最大的候选尺寸，
+          超出时在其余尺寸中二分查找，每张图片最多探测 4 次
+
+        ``stats`` 记录各尺寸被选中的次数、HEAD 请求数，以及相比原图（``large``）节省的字节数。
+        节省的字节数只在选中尺寸和原图的大小都已知时计入：只设置 ``min_width`` 时不发出 HEAD 请求，
+        不计入节省的字节数。文件大小按图片 ID 和尺寸缓存，同一张图片在不同的 wx1~wx4 域名上只探测一次。
+
+        :param int min_width: 最小宽度（像素）
+        :param int max_bytes: 单张图片的最大字节数
+        :param float timeout: HEAD 请求的超时时间（秒）
+        """
+        self.min_width = min_width
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sizes = {}
+        self.stats = {'selected': {}, 'probes': 0, 'bytes_saved': 0}
+
+    def _candidates(self, pic):
+        """满足宽度要求的尺寸，从大到小"""
+        names = [name for name, _ in VARIANTS]
+        if self.min_width is None:
+            return names[::-1]
+        original = pic.width
+        for i, (name, width) in enumerate(VARIANTS):
+            if width is None or width >= self.min_width or (original is not None and width >= original):
+                return names[i::-1]
+        return names[::-1]
+
+    @staticmethod
+    def _size_key(url):
+        """新浪图床的地址按 (尺寸, 图片 ID) 缓存大小，忽略域名"""
+        m = _SINAIMG_RE.match(url or '')
+        return (m.group(2), m.group(3)) if m is not None else url
+
+    def known_size(self, url):
+        """
+        :return: 已探测到的文件大小，未探测过或大小未知时为 None
+        """
+        with self._lock:
+            return self._sizes.get(self._size_key(url))
+
+    def probe(self, session, url):
+        """
+        用 HEAD 请求获取文件大小，结果会被缓存
+
+        :return: 字节数，响应中没有 Content-Length 时为 None
+        """
+        key = self._size_key(url)
+        with self._lock:
+            if key in self._sizes:
+                return self._sizes[key]
+        res = session.request('HEAD', url=url, allow_redirects=True, timeout=self.timeout)
+        try:
+            size = int(res.headers.get('Content-Length'))
+        except (TypeError, ValueError):
+            size = None
+        with self._lock:
+            self.stats['probes'] += 1
+            self._sizes[key] = size
+        return size
+
+    def _fits(self, pic, name):
+        size = self.probe(pic._session, pic.variant(name))
+        return size is not None and size <= self.max_bytes
 
+    def select(self, pic):
+        """
+        :param Pic pic: 图片
+        :return: 选中尺寸的 :any:`Pic`
+        """
+        candidates = self._candidates(pic)
+        name = candidates[0]
+        if self.max_bytes is not None and not self._fits(pic, name):
+            # 尺寸越小文件越小，在其余尺寸中二分查找第一个（最大的）不超过 max_bytes 的；
+            # 都超过时选最小的
+            lo, hi = 1, len(candidates) - 1
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._fits(pic, candidates[mid]):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            name = candidates[lo]
+        saved = 0
+        size = self.known_size(pic.variant(name))
+        original = self.known_size(pic.variant('large'))
+        if size is not None and original is not None:
+            saved = max(0, original - size)
+        with self._lock:
+            self.stats['selected'][name] = self.stats['selected'].get(name, 0) + 1
+            self.stats['bytes_saved'] += saved
+        url = pic.variant(name)
+        return pic if url == pic.url else Pic(url, pic._cache, pic._session)
@@ -1,8 +1,15 @@
+import functools
 import math
 
+from ..utils.deadline import fetch_within, paginate, paginate_pipeline
+from ..utils.entities import extract_entities
 from ..utils.normal import normal_attr
+from ..utils.pipeline import PagePipeline
 from ..utils.streaming import streaming
+from ..utils.timeparse import parse_created_at
 from .base import Base
+from .pic import Pic
+from .video import Video
 from ..config.urls import (
     STATUS_DETAIL_URL,
     ORI_WEIBO_LIST_URL,
@@ -10,6 +17,16 @@ from ..config.urls import (
 )
 
 
+def _video_of(raw_data, session):
+    """微博卡片中的视频，没有视频时返回 None"""
+    page_info = raw_data.get('page_info') or {}
+    if page_info.get('type') != 'video':
+        return None
+    media_info = page_info.get('media_info') or {}
+    url = media_info.get('stream_url_hd') or media_info.get('stream_url')
+    return Video(url, page_info, session) if url else None
+
+
 class Status(Base):
     """
     微博详情
@@ -45,6 +62,14 @@ class Status(Base):
     def reposts_count(self):
         return 0
 
+    @property
+    def entities(self):
+        """
+        正文中的纯文本、@用户、话题、链接和头条文章 ID，见 :any:`extract_entities`
+        :return: dict
+        """
+        return extract_entities(getattr(self, 'text', None))
+
 
 class Statuses(Base):
     """
@@ -108,6 +133,7 @@ class Statuses(Base):
             status = Status(mblog.id, None, self._session)
             status.text = raw_data.get('text')
             status.created_at = raw_data.get('created_at')
+            status.created_timestamp = parse_created_at(status.created_at)
             status.source = raw_data.get('mblog.source')
             status.thumbnail_pic = raw_data.get('thumbnail_pic')
             status.bmiddle_pic = raw_data.get('bmiddle_pic')
@@ -115,23 +141,52 @@ class Statuses(Base):
             status.is_paid = raw_data.get('is_paid')
             status.user = People(mblog.user.id, None, self._session)
             status.pic_urls = [pic.get('url') for pic in raw_data.get('pics', [])]
+            status.pics = [Pic(pic.get('url'), pic, self._session) for pic in raw_data.get('pics', [])]
+            status.video = _video_of(raw_data, self._session)
             yield status
 
-    def page_from_to(self, from_page, to_page):
+    def page_from_to(self, from_page, to_page, deadline=None):
         """
         获取从第from_page页到第to_page页的所有微博
         :param from_page: 
         :param to_page: 
+        :param deadline: 可选的 :any:`Deadline`，到期后停止并标记 ``deadline.truncated``
         :return: 
         """
-        for page_num in range(from_page, to_page+1):
-            for status in self.page(page_num):
-                yield status
+        for status in paginate(self, range(from_page, to_page + 1), deadline):
+            yield status
 
-    def all(self):
+    def pipeline(self, from_page, to_page, workers=2, max_buffered=4, deadline=None):
+        """
+        以流水线方式获取从第from_page页到第to_page页的所有微博，
+        后台线程预取后续页面，与调用方的处理过程重叠进行
+        :param from_page: 
+        :param to_page: 
+        :param workers: 抓取线程数
+        :param max_buffered: 最多缓冲的页数，缓冲区满时暂停抓取
+        :param deadline: 可选的 :any:`Deadline`，到期后停止并标记 ``deadline.truncated``
+        :return: 
+        """
+        fetch_page = self._fetch_page
+        if deadline is not None:
+            fetch_page = functools.partial(self._fetch_page, deadline=deadline)
+        pages = PagePipeline(fetch_page, range(from_page, to_page + 1), workers, max_buffered)
+        return paginate_pipeline(pages, deadline)
+
+    def _fetch_page(self, page_num, deadline=None):
+        """在独立的对象上获取一页，供多个抓取线程并发调用"""
+        statuses = Statuses(self._id, None, self._session, original=self._original)
+        statuses._deadline = deadline
+        return list(statuses.page(page_num))
+
+    def all(self, deadline=None):
         """
         获取用户的所有微博
+        :param deadline: 可选的 :any:`Deadline`
         :return: 
         """
-        return self.page_from_to(1, self._pages + 1)
+        pages = fetch_within(self, deadline, lambda: self._pages)
+        if pages is None:
+            return iter(())
+        return self.page_from_to(1, pages + 1, deadline)
 
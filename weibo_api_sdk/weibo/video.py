@@ -1,10 +1,42 @@
 from .base import Base
+from .pic import media_filename
+
+__all__ = ['Video']
 
 
 class Video(Base):
     def __init__(self, id, cache, session):
+        """
+        微博视频
+
+        :param id: 视频地址（``page_info.media_info`` 中的 ``stream_url``）
+        :param dict cache: 微博列表中的 ``page_info`` 原始数据，可为空
+        :param session: 网络请求 Session
+        """
         super().__init__(id, cache, session)
 
     def _build_url(self):
-        pass
+        return self._id
+
+    @property
+    def url(self):
+        """
+        视频地址
+        """
+        return self._id
+
+    @property
+    def filename(self):
+        """
+        本地保存的相对路径
+        """
+        return media_filename(self._id)
+
+    def download(self, directory, **kwargs):
+        """
+        下载到 directory，参数见 :any:`MediaDownloader`
 
+        :return: 下载结果，见 :any:`MediaDownloader.download`
+        """
+        from ..crawler.media import MediaDownloader
+        return MediaDownloader(self._session, directory, **kwargs).download(self)